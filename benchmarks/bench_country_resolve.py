@@ -0,0 +1,73 @@
+"""Compare import + conversion time for country codes: coco.convert vs the ecostyles resolver.
+
+Each path runs in a fresh interpreter, as a newly spawned worker would. It times the import
+(for the resolver, including the ``ecostyles`` package) and one conversion of a column of N
+country identifiers (ISO3 codes and English names for 200 economies, in random order).
+Peak RSS is reported as well.
+
+    uv run python benchmarks/bench_country_resolve.py          # 1,000 rows
+    uv run python benchmarks/bench_country_resolve.py 5000
+
+``coco.convert`` runs its regexes per row, so keep N modest for the "coco" path.
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+SETUP = """
+import json, logging, random, resource, sys, time
+logging.disable(logging.WARNING)
+names = json.loads(sys.argv[1])
+column = [random.Random(0).choice(names) for _ in range(int(sys.argv[2]))]
+start = time.perf_counter()
+"""
+
+PATHS = {
+    "coco": SETUP + """
+import country_converter as coco
+imported = time.perf_counter()
+coco.convert(column, to="ISO3", not_found=None)
+""",
+    "resolver": SETUP + """
+from ecostyles.utils.countries import to_iso3
+imported = time.perf_counter()
+to_iso3(column)
+""",
+}
+
+REPORT = """
+end = time.perf_counter()
+print(imported - start, end - imported, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def sample_names() -> list[str]:
+    """200 economies, half as ISO3 codes and half as their short names."""
+    from ecostyles.utils.countries import _bundled_index
+
+    index = _bundled_index()
+    codes = sorted({iso for iso in index.values() if iso})[:200]
+    by_code = {}
+    for key, iso in index.items():
+        if iso in codes and len(key) > 3:
+            by_code.setdefault(iso, key)
+    return [code if i % 2 else by_code.get(code, code) for i, code in enumerate(codes)]
+
+
+def main(argv: list[str]) -> None:
+    rows = int(argv[0]) if argv else 1_000
+    names = json.dumps(sample_names())
+    print(f"{'path':<10}{'rows':>9}{'import (s)':>12}{'convert (s)':>13}{'peak RSS (MiB)':>16}")
+    for label, code in PATHS.items():
+        out = subprocess.run([sys.executable, "-c", code + REPORT, names, str(rows)],
+                             check=True, capture_output=True, text=True).stdout
+        imported, converted, rss_kib = out.split()
+        print(f"{label:<10}{rows:>9}{float(imported):>12.3f}{float(converted):>13.3f}"
+              f"{int(rss_kib) / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
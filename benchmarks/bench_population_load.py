@@ -0,0 +1,41 @@
+"""Compare cold-start loads of the bundled population snapshot: binary (mmap) vs CSV.
+
+Each load runs in a fresh interpreter, as a newly spawned worker would, and only the
+``_load_bundled_*`` call itself is timed (not interpreter start-up or imports).
+
+    uv run python benchmarks/bench_population_load.py         # 20 runs each
+    uv run python benchmarks/bench_population_load.py 50
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+
+SNIPPET = """
+import time
+import ecostyles.utils.population as pop
+start = time.perf_counter()
+table, _ = pop._load_bundled_{kind}()
+table["GBR", 2023]
+print(time.perf_counter() - start)
+"""
+
+
+def cold_load(kind: str) -> float:
+    out = subprocess.run([sys.executable, "-c", SNIPPET.format(kind=kind)],
+                         check=True, capture_output=True, text=True).stdout
+    return float(out)
+
+
+def main(argv: list[str]) -> None:
+    runs = int(argv[0]) if argv else 20
+    print(f"{'source':<8}{'median (ms)':>13}{'min (ms)':>11}")
+    for kind in ("csv", "binary"):
+        times = [cold_load(kind) * 1000 for _ in range(runs)]
+        print(f"{kind:<8}{statistics.median(times):>13.2f}{min(times):>11.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,65 @@
+"""Compare the single-pass spec serialiser with the old save_chart round trip.
+
+The old path was ``to_dict -> dumps(indent=2) -> loads -> dumps(minified) -> regex``; the
+new one applies dimensions and date stripping to the dict and serialises once. Reports
+wall time and peak traced memory for each, on every chart in ``datasets.FRAMES`` (line,
+scatter and heatmap) with N inline rows.
+
+    uv run python benchmarks/bench_serialise.py               # 10k and 100k rows
+    uv run python benchmarks/bench_serialise.py 1000000       # custom sizes
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import altair as alt
+
+from ecostyles.utils.file_operations import (
+    _spec_for_save, _strip_midnight_timestamps, modify_dimensions,
+)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from datasets import FRAMES, chart  # noqa: E402
+
+alt.data_transformers.disable_max_rows()
+
+
+def legacy_spec_for_save(chart, width, height, strip_timestamps) -> str:
+    """The save path as it was before the single-pass serialiser."""
+    spec = json.dumps(json.loads(modify_dimensions(chart, width, height)),
+                      separators=(",", ":"))
+    return _strip_midnight_timestamps(spec) if strip_timestamps else spec
+
+
+def measure(fn, chart) -> tuple[float, float, int]:
+    """Return (seconds, peak MiB, output length) for one call of ``fn``."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    out = fn(chart, 350, 280, True)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, len(out)
+
+
+def main(argv: list[str]) -> None:
+    sizes = [int(a) for a in argv] or [10_000, 100_000]
+    print(f"{'chart':<12}{'rows':>9}  {'path':<12}{'time (s)':>10}{'peak (MiB)':>12}"
+          f"{'bytes':>12}")
+    for name in FRAMES:
+        for rows in sizes:
+            built = chart(name, rows)
+            for label, fn in (("legacy", legacy_spec_for_save),
+                              ("single-pass", _spec_for_save)):
+                elapsed, peak, size = measure(fn, built)
+                print(f"{name:<12}{rows:>9}  {label:<12}{elapsed:>10.3f}{peak:>12.1f}"
+                      f"{size:>12}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
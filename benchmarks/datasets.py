@@ -0,0 +1,93 @@
+"""Synthetic datasets for the benchmark suite, shaped like the chart gallery's.
+
+The gallery (``specs/gallery.py``) builds small, theme-agnostic charts. Here the same
+charts are fed generated frames of any length with the same columns, so the suite times
+the real encodings at 1k, 100k and 1M rows. All data is seeded, so runs are comparable.
+
+    from datasets import FRAMES, SIZES, chart, panel
+    chart("line_multi", SIZES["100k"])      # the gallery line chart, 100,000 rows
+    list(FRAMES)                            # the charts that have a generator
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "specs"))
+from gallery import GALLERY  # noqa: E402
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+# Economies for the enrichment frames: ISO3 codes and names, as real inputs mix them.
+COUNTRIES = ["GBR", "France", "DEU", "United States", "JPN", "Italy", "CAN", "Spain",
+             "KOR", "Brazil", "IND", "Mexico", "AUS", "Netherlands", "CHE", "Sweden",
+             "POL", "Turkey", "ZAF", "Indonesia"]
+
+
+def _rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+
+def timeseries(rows: int) -> pd.DataFrame:
+    """``line_multi``'s columns: two hourly series (``date``, ``series``, ``value``)."""
+    per = -(-rows // 2)
+    dates = pd.date_range("2000-01-01", periods=per, freq="h")
+    return pd.DataFrame({
+        "date": np.tile(dates, 2)[:rows],
+        "series": np.repeat(["UK", "US"], per)[:rows],
+        "value": 100 + _rng().normal(0, 1, rows).cumsum(),
+    })
+
+
+def scatter(rows: int) -> pd.DataFrame:
+    """``scatter``'s columns: GDP per capita against life expectancy, by region."""
+    rng = _rng()
+    gdp = rng.uniform(5, 70, rows)
+    return pd.DataFrame({
+        "gdp_per_capita": gdp,
+        "life_expectancy": 66 + 0.28 * gdp - 0.0016 * gdp ** 2 + rng.normal(0, 1.5, rows),
+        "region": rng.choice(["Europe", "Asia", "Americas"], rows),
+    })
+
+
+def heatmap(rows: int) -> pd.DataFrame:
+    """``heatmap``'s columns: an ``intensity`` per ``month`` and three-hourly ``hour``."""
+    rng = _rng()
+    month = rng.integers(1, 13, rows)
+    hour = rng.integers(0, 8, rows) * 3
+    return pd.DataFrame({
+        "month": month,
+        "hour": hour,
+        "intensity": np.abs(np.sin(month / 2) * np.cos(hour / 6)) * 100
+                     + rng.normal(0, 5, rows),
+    })
+
+
+def panel(rows: int) -> pd.DataFrame:
+    """A country-year panel (``country``, ``year``, ``value``) for the enrichment helpers.
+
+    Years fall within the bundled population snapshot, so enriching it needs no network.
+    """
+    rng = _rng()
+    return pd.DataFrame({
+        "country": rng.choice(COUNTRIES, rows),
+        "year": rng.integers(1990, 2023, rows),
+        "value": rng.normal(0, 1, rows),
+    })
+
+
+#: Gallery charts with a generator for their data.
+FRAMES = {"line_multi": timeseries, "scatter": scatter, "heatmap": heatmap}
+
+
+def chart(name: str, rows: int) -> alt.Chart:
+    """The gallery chart ``name``, with its data replaced by ``rows`` generated rows."""
+    built = GALLERY[name]()
+    built.data = FRAMES[name](rows)
+    return built
@@ -0,0 +1,340 @@
+"""Benchmark suite for the hot paths: saving, enrichment, theming and start-up.
+
+Runs offline on synthetic data (see ``datasets.py``) and writes the timings to a JSON
+file. A later run can then be compared with a saved baseline, and any case that has
+slowed down by more than a threshold is flagged (and the command exits non-zero).
+
+    uv run python benchmarks/suite.py run --baseline        # -> benchmarks/results/baseline.json
+    # ... make a change ...
+    uv run python benchmarks/suite.py run                   # -> benchmarks/results/latest.json
+    uv run python benchmarks/suite.py compare               # baseline vs latest, 10% threshold
+
+    uv run python benchmarks/suite.py run --sizes 1k 100k --only save_chart add_
+    uv run python benchmarks/suite.py compare old.json new.json --threshold 0.25
+
+or through nox: ``nox -s bench_baseline``, then ``nox -s bench`` (runs and compares).
+
+Cases:
+    import_ecostyles              ``import ecostyles`` in a fresh interpreter
+    load_bundled.cold             first population-snapshot load in a fresh interpreter
+    save_chart.<stage>[chart.size]
+                                  spec / serialise / render / write, and total (save_chart)
+                                  for each gallery chart in ``datasets.FRAMES`` (line,
+                                  scatter, heatmap), themed and downsampled where it applies;
+                                  scatter and heatmap render only at 1k rows
+    add_population[size]          offline enrichment of a country-year panel
+    add_colour[size]              colour assignment on the same panel
+    render.<theme>                rendering every gallery chart under one theme (warm)
+
+Each case is timed ``--repeat`` times after a warm-up call, within a time budget; cases
+whose warm-up alone exceeds the budget (e.g. 1M rows) are timed once. Results are
+machine-specific: compare runs from the same machine and Python.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS = Path(__file__).resolve().parent / "results"
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from datasets import SIZES  # noqa: E402
+
+# Label -> (theme name, dark mode), as in scripts/render_themes.py.
+THEMES = {
+    "article": ("article", False),
+    "cotd": ("cotd", False),
+    "cotd_dark": ("cotd", True),
+    "newsletter": ("newsletter", False),
+}
+
+# Charts whose marks save_chart downsamples. The others keep every row, and rendering
+# 100k points or rects takes minutes, so they are only rendered up to MAX_RENDER_ROWS.
+DOWNSAMPLED = {"line_multi"}
+MAX_RENDER_ROWS = 10_000
+
+# Timed in a fresh interpreter; each prints its own duration in seconds.
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import ecostyles
+print(time.perf_counter() - start)
+"""
+
+LOAD_BUNDLED_SNIPPET = """
+import time
+import ecostyles.utils.population as pop
+start = time.perf_counter()
+table, _ = pop._load_bundled()
+table["GBR", 2023]
+print(time.perf_counter() - start)
+"""
+
+
+class Case(NamedTuple):
+    """One benchmark: ``fn`` is timed; ``external`` ones return their own duration."""
+
+    name: str
+    fn: Callable[[], object]
+    rows: int | None = None
+    external: bool = False
+
+
+def _fresh_interpreter(snippet: str) -> Callable[[], float]:
+    def run() -> float:
+        out = subprocess.run([sys.executable, "-c", snippet], check=True,
+                             capture_output=True, text=True).stdout
+        return float(out)
+    return run
+
+
+# --------------------------------------------------------------------------- cases
+def startup_cases() -> Iterator[Case]:
+    yield Case("import_ecostyles", _fresh_interpreter(IMPORT_SNIPPET), external=True)
+    yield Case("load_bundled.cold", _fresh_interpreter(LOAD_BUNDLED_SNIPPET), external=True)
+
+
+def save_cases(sizes: dict[str, int], out_dir: Path) -> Iterator[Case]:
+    from datasets import FRAMES, chart
+
+    from ecostyles.utils.file_operations import (
+        _dumps, _render, _spec_dict_for_save, _write_if_changed, save_chart,
+    )
+
+    options = {"theme": "article", "downsample": True}
+    for name in FRAMES:
+        for label, rows in sizes.items():
+            built = chart(name, rows)
+            spec_dict = _spec_dict_for_save(built, 350, 280, True, **options)
+            spec = _dumps(spec_dict)
+            key = f"{name}.{label}"
+            yield Case(f"save_chart.spec[{key}]",
+                       lambda c=built: _spec_dict_for_save(c, 350, 280, True, **options), rows)
+            yield Case(f"save_chart.serialise[{key}]", lambda d=spec_dict: _dumps(d), rows)
+            if name not in DOWNSAMPLED and rows > MAX_RENDER_ROWS:
+                continue
+            png = _render(spec)["png"][4]
+            target = out_dir / key
+
+            def write(spec=spec, png=png, target=target) -> None:
+                shutil.rmtree(target, ignore_errors=True)  # a fresh save, not an unchanged one
+                target.mkdir()
+                _write_if_changed(str(target / "bench.json"), spec)
+                _write_if_changed(str(target / "bench.png"), png)
+
+            def total(c=built, target=target) -> None:
+                shutil.rmtree(target, ignore_errors=True)
+                save_chart(c, str(target), "bench", **options)
+
+            yield Case(f"save_chart.render[{key}]", lambda s=spec: _render(s), rows)
+            yield Case(f"save_chart.write[{key}]", write, rows)
+            yield Case(f"save_chart.total[{key}]", total, rows)
+
+
+def enrichment_cases(sizes: dict[str, int]) -> Iterator[Case]:
+    from datasets import panel
+
+    from ecostyles import EcoStyles
+    from ecostyles.utils.population import add_population
+
+    styles = EcoStyles()
+    for label, rows in sizes.items():
+        df = panel(rows)
+        yield Case(f"add_population[{label}]",
+                   lambda df=df: add_population(df, "country", year_column="year",
+                                                allow_fetch=False), rows)
+        yield Case(f"add_colour[{label}]", lambda df=df: styles.add_colour(df, "country"), rows)
+
+
+def render_cases() -> Iterator[Case]:
+    from gallery import build_all
+
+    from ecostyles.utils.file_operations import _render, themed
+
+    charts = list(build_all().values())
+    for label, (name, dark) in THEMES.items():
+        specs = [json.dumps(themed(c, name, dark)) for c in charts]
+        yield Case(f"render.{label}", lambda specs=specs: [_render(s) for s in specs],
+                   len(specs))
+
+
+def all_cases(sizes: dict[str, int], out_dir: Path) -> Iterator[Case]:
+    yield from startup_cases()
+    yield from save_cases(sizes, out_dir)
+    yield from enrichment_cases(sizes)
+    yield from render_cases()
+
+
+# --------------------------------------------------------------------------- run
+def measure(case: Case, repeat: int, budget: float) -> dict:
+    """Time ``case``: a warm-up call, then up to ``repeat`` runs within ``budget`` seconds."""
+    def once() -> float:
+        start = time.perf_counter()
+        out = case.fn()
+        return out if case.external else time.perf_counter() - start
+
+    times = [once()]
+    if times[0] < budget:  # cheap enough: discard the warm-up, time properly
+        times, deadline = [], time.perf_counter() + budget
+        while len(times) < repeat and (not times or time.perf_counter() < deadline):
+            times.append(once())
+    result = {"median": statistics.median(times), "min": min(times), "runs": len(times)}
+    if case.rows:
+        result["rows"] = case.rows
+        result["rows_per_s"] = case.rows / result["median"]
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    """What the timings depend on, to tell whether two runs are comparable."""
+    from importlib.metadata import version
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        **{name: version(dist) for name, dist in (
+            ("ecostyles", "ecostyles"), ("altair", "altair"), ("pandas", "pandas"),
+            ("numpy", "numpy"), ("vl_convert", "vl-convert-python"))},
+        "commit": _git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def run(args) -> None:
+    from ecostyles import EcoStyles
+
+    unknown = [s for s in args.sizes if s not in SIZES]
+    if unknown:
+        raise SystemExit(f"Unknown size(s) {unknown}. Choose from {list(SIZES)}")
+    sizes = {label: SIZES[label] for label in args.sizes}
+    warnings.simplefilter("ignore")  # e.g. the row-budget warning for 1M-row charts
+    # Set up as a user would (fonts, data transformer), and time warm renders: the cold
+    # start is its own concern.
+    EcoStyles(warm=True).warmup.wait()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for case in all_cases(sizes, Path(tmp)):
+            if args.only and not any(part in case.name for part in args.only):
+                continue
+            results[case.name] = measure(case, args.repeat, args.budget)
+            print(f"{case.name:<40}{results[case.name]['median'] * 1000:>12.2f} ms"
+                  f"  ({results[case.name]['runs']} run(s))", flush=True)
+
+    out = Path(args.output) if args.output else RESULTS / ("baseline.json" if args.baseline
+                                                            else "latest.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"environment": environment(), "results": results}, indent=2))
+    print(f"wrote {out}")
+
+
+# --------------------------------------------------------------------------- compare
+def compare_results(baseline: dict, current: dict, threshold: float,
+                    min_delta: float) -> tuple[list[tuple], list[str]]:
+    """Compare two result sets case by case.
+
+    A case regresses when its median is more than ``threshold`` (a fraction) slower than
+    the baseline's *and* at least ``min_delta`` seconds slower, so sub-millisecond noise
+    on quick cases isn't flagged.
+
+    Returns:
+        ``(rows, regressions)``: ``(name, baseline s, current s, change)`` for every case
+        in both, and the names of the regressed cases.
+    """
+    rows, regressions = [], []
+    for name in baseline.keys() & current.keys():
+        old, new = baseline[name]["median"], current[name]["median"]
+        change = new / old - 1
+        rows.append((name, old, new, change))
+        if change > threshold and new - old >= min_delta:
+            regressions.append(name)
+    order = list(baseline) + [name for name in current if name not in baseline]
+    rows.sort(key=lambda row: order.index(row[0]))
+    return rows, regressions
+
+
+def compare(args) -> None:
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    before, after = baseline["environment"], current["environment"]
+    for key in ("python", "machine", "cpus", "vl_convert"):
+        if before.get(key) != after.get(key):
+            print(f"warning: {key} differs ({before.get(key)} vs {after.get(key)}); "
+                  f"timings may not be comparable")
+
+    rows, regressions = compare_results(baseline["results"], current["results"],
+                                        args.threshold, args.min_delta)
+    print(f"{'case':<40}{'baseline (ms)':>15}{'current (ms)':>15}{'change':>9}")
+    for name, old, new, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<40}{old * 1000:>15.2f}{new * 1000:>15.2f}{change:>+9.1%}{flag}")
+    missing = sorted(baseline["results"].keys() - current["results"].keys())
+    added = sorted(current["results"].keys() - baseline["results"].keys())
+    if missing:
+        print(f"not in the current run: {', '.join(missing)}")
+    if added:
+        print(f"new, no baseline: {', '.join(added)}")
+
+    if regressions:
+        raise SystemExit(f"{len(regressions)} case(s) regressed by more than "
+                         f"{args.threshold:.0%}: {', '.join(regressions)}")
+    print(f"no regressions beyond {args.threshold:.0%}")
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite and save the timings")
+    run_parser.add_argument("--sizes", nargs="+", default=list(SIZES),
+                            help=f"dataset sizes (default: all of {list(SIZES)})")
+    run_parser.add_argument("--only", nargs="+", metavar="TEXT",
+                            help="run only cases whose name contains one of these")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (default 5)")
+    run_parser.add_argument("--budget", type=float, default=2.0,
+                            help="seconds of timed runs per case (default 2)")
+    run_parser.add_argument("--baseline", action="store_true",
+                            help="save as the baseline (results/baseline.json)")
+    run_parser.add_argument("-o", "--output", help="write the results here instead")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline", nargs="?", default=str(RESULTS / "baseline.json"))
+    compare_parser.add_argument("current", nargs="?", default=str(RESULTS / "latest.json"))
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="slow-down that counts as a regression (default 0.10)")
+    compare_parser.add_argument("--min-delta", type=float, default=0.005,
+                                help="ignore slow-downs smaller than this, in seconds "
+                                     "(default 0.005)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
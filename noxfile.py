@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import nox
 
 # Use uv to create the per-version virtualenvs (fast, and matches our dev workflow).
@@ -8,3 +10,24 @@ nox.options.default_venv_backend = "uv"
 def test(session):
     session.install("-e", ".[test]")
     session.run("pytest", "-q")
+
+
+# Benchmarks run on the current interpreter: baselines are only comparable on one machine
+# and Python. Everything runs offline. Extra arguments go to `suite.py run`, e.g.
+# `nox -s bench -- --sizes 1k 100k`. See benchmarks/suite.py.
+@nox.session
+def bench(session):
+    """Run the benchmark suite and compare it with the saved baseline."""
+    session.install("-e", ".")
+    session.run("python", "benchmarks/suite.py", "run", *session.posargs)
+    if Path("benchmarks/results/baseline.json").exists():
+        session.run("python", "benchmarks/suite.py", "compare")
+    else:
+        session.log("No baseline to compare with yet: run `nox -s bench_baseline` first.")
+
+
+@nox.session
+def bench_baseline(session):
+    """Run the benchmark suite and save the timings as the baseline."""
+    session.install("-e", ".")
+    session.run("python", "benchmarks/suite.py", "run", "--baseline", *session.posargs)
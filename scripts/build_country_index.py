@@ -0,0 +1,97 @@
+"""Build the bundled country index used by ``ecostyles.utils.countries``.
+
+Most inputs to ``add_colour``/``add_population`` are ISO3 or ISO2 codes, or a country's
+standard English name. This script precomputes their ISO3 codes into a flat JSON lookup,
+so the hot path is a dict lookup and ``country_converter`` (slow to import and to run)
+is only needed for anything else. Every entry is checked against ``country_converter``,
+so the index gives exactly the answers ``coco.convert`` would.
+
+Keys are the ISO2, ISO3, short and official names from ``country_converter``'s own table,
+plus a few common aliases (``ALIASES``). The ``EcoStyles.country_groups`` labels map to
+null: they are known not to be countries, so add_colour matches them literally without
+running coco's regexes.
+
+Run this after upgrading country_converter:
+
+    uv run python scripts/build_country_index.py
+
+Output: src/ecostyles/data/countries/country_index.json
+    {"coco_version": "...", "iso3": {"GBR": "GBR", "United Kingdom": "GBR", "OECD": null, ...}}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+import country_converter as coco
+
+from ecostyles import EcoStyles
+
+OUT = Path(__file__).resolve().parent.parent / "src/ecostyles/data/countries/country_index.json"
+
+# Everyday spellings not in country_converter's name columns (kept only if coco agrees).
+ALIASES = [
+    "UK", "U.K.", "Britain", "Great Britain", "US", "U.S.", "USA", "U.S.A.",
+    "United States of America", "America", "South Korea", "Korea", "North Korea", "Russia",
+    "Czech Republic", "Czechia", "Turkey", "Türkiye", "Vietnam", "Viet Nam", "Iran", "Syria",
+    "Laos", "Ivory Coast", "Côte d'Ivoire", "Cote d'Ivoire", "DR Congo", "Congo",
+    "Democratic Republic of the Congo", "Republic of the Congo", "North Macedonia",
+    "Macedonia", "Bolivia", "Venezuela", "Tanzania", "Moldova", "Taiwan", "Hong Kong",
+    "Macau", "Macao", "Palestine", "Brunei", "Cape Verde", "Cabo Verde", "Eswatini",
+    "Swaziland", "Burma", "Myanmar", "East Timor", "Timor-Leste", "Holland", "Netherlands",
+    "The Netherlands", "The Gambia", "Gambia", "The Bahamas", "Bahamas", "Kosovo",
+    "Micronesia", "St Lucia", "Saint Lucia", "UAE", "United Arab Emirates",
+]
+
+
+def candidate_keys(data) -> dict[str, str]:
+    """Return ``{key: expected ISO3}`` from coco's table, before verification."""
+    keys: dict[str, str] = {}
+    for row in data.itertuples(index=False):
+        for key in (row.ISO3, row.ISO2, row.name_short, row.name_official):
+            if isinstance(key, str) and key.strip():
+                keys.setdefault(key.strip(), row.ISO3)
+    return keys
+
+
+def main() -> None:
+    logging.disable(logging.WARNING)  # coco logs every non-match
+    converter = coco.CountryConverter()
+    not_found = "\0not found"
+
+    expected = candidate_keys(converter.data)
+    aliases = [a for a in ALIASES if a not in expected]
+    groups = EcoStyles(compact_data=False).country_groups
+    labels = sorted({*groups, *groups.values()})
+
+    names = list(expected) + aliases + labels
+    converted = dict(zip(names, converter.convert(names, to="ISO3", not_found=not_found)))
+
+    index: dict[str, str | None] = {}
+    skipped = []
+    for key, iso3 in expected.items():
+        if converted[key] == iso3:
+            index[key] = iso3
+        else:  # ambiguous in coco (e.g. a name shared by two rows): leave to coco
+            skipped.append(key)
+    for key in aliases:
+        if converted[key] != not_found:
+            index[key] = converted[key]
+        else:
+            skipped.append(key)
+    for key in labels:
+        if converted[key] == not_found:
+            index[key] = None
+
+    OUT.parent.mkdir(parents=True, exist_ok=True)
+    OUT.write_text(json.dumps({"coco_version": coco.__version__,
+                               "iso3": dict(sorted(index.items()))},
+                              ensure_ascii=False, indent=0) + "\n", encoding="utf-8")
+    print(f"wrote {OUT.relative_to(OUT.parents[3])}: {len(index)} keys "
+          f"({len(skipped)} left to country_converter: {', '.join(skipped) or 'none'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,23 +4,34 @@ Downloads the full ``SP.POP.TOTL`` ("Population, total") series for every econom
 single zip, reshapes the wide World Bank CSV into a compact long CSV, and writes it to the
 package data directory.
 
+Alongside the CSV it writes a binary form that ``_load_bundled`` memory-maps for an O(1)
+cold start: an int64 country x year matrix plus a small JSON index of its rows and years.
+
 Run this to refresh the bundle (e.g. once a year when the World Bank updates):
 
     uv run python scripts/fetch_population.py
+    uv run python scripts/fetch_population.py --from-csv   # rebuild binary from the CSV
 
-Output: src/ecostyles/data/population/population.csv  (columns: iso3,year,population)
+Output, in src/ecostyles/data/population/:
+    population.csv          long CSV (columns: iso3,year,population)
+    population.npy          int64 matrix, one row per economy, one column per year (-1 = missing)
+    population_index.json   {"codes": [...], "first_year": ..., "last_year": ...}
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
 import io
+import json
 import urllib.request
 import zipfile
 from pathlib import Path
 
 URL = "https://api.worldbank.org/v2/en/indicator/SP.POP.TOTL?downloadformat=csv"
 OUT = Path(__file__).resolve().parent.parent / "src/ecostyles/data/population/population.csv"
+OUT_MATRIX = OUT.with_suffix(".npy")
+OUT_INDEX = OUT.with_name("population_index.json")
 
 
 def _download_rows() -> list[list[str]]:
@@ -57,18 +68,50 @@ def reshape(rows: list[list[str]]) -> list[tuple[str, int, int]]:
     return records
 
 
-def main() -> None:
-    records = reshape(_download_rows())
+def read_csv() -> list[tuple[str, int, int]]:
+    """Read the existing long CSV back into (iso3, year, population) records."""
+    with OUT.open(newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # skip header
+        return [(iso3, int(year), int(value)) for iso3, year, value in reader]
+
+
+def write_binary(records: list[tuple[str, int, int]]) -> None:
+    """Write the memory-mappable matrix and its index (see ``PopulationTable``)."""
+    import numpy as np
 
-    OUT.parent.mkdir(parents=True, exist_ok=True)
-    with OUT.open("w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["iso3", "year", "population"])
-        writer.writerows(records)
+    from ecostyles.utils.population import PopulationTable
+
+    iso3, years, values = zip(*records)
+    table = PopulationTable.from_arrays(list(iso3), years, values)
+    np.save(OUT_MATRIX, np.ascontiguousarray(table.values, dtype="<i8"))
+    OUT_INDEX.write_text(json.dumps({
+        "codes": list(table.codes),
+        "first_year": table.first_year,
+        "last_year": table.first_year + table.values.shape[1] - 1,
+    }) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from-csv", action="store_true",
+                        help="skip the download; rebuild the binary form from the existing CSV")
+    args = parser.parse_args()
+
+    if args.from_csv:
+        records = read_csv()
+    else:
+        records = reshape(_download_rows())
+        OUT.parent.mkdir(parents=True, exist_ok=True)
+        with OUT.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["iso3", "year", "population"])
+            writer.writerows(records)
+    write_binary(records)
 
     years = {r[1] for r in records}
     economies = {r[0] for r in records}
-    print(f"wrote {OUT.relative_to(OUT.parents[3])}: {len(records)} rows, "
+    print(f"wrote {OUT.parent.relative_to(OUT.parents[3])}: {len(records)} rows, "
           f"{len(economies)} economies, years {min(years)}-{max(years)}")
 
 
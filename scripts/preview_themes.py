@@ -14,33 +14,52 @@ Examples
     uv run python scripts/preview_themes.py cotd article        # just these themes
     uv run python scripts/preview_themes.py cotd --dark         # add cotd dark mode
     uv run python scripts/preview_themes.py cotd --compare-ref HEAD   # working cotd vs cotd @HEAD
-    uv run python scripts/preview_themes.py cotd --serve        # live: edit theme, refresh browser
+    uv run python scripts/preview_themes.py cotd --serve        # live: edit a theme, watch it update
 
 Output: renders/preview.html (git-ignored). --serve starts a local server instead.
+
+Rendering is incremental. Every (chart, variant) cell is a PNG cached by spec hash in the
+shared render cache (``ecostyles.utils.cache.RenderCache``), so only cells whose spec
+changed are rendered again, in a process pool. A ``--compare-ref`` is resolved to its commit
+once, and that commit's theme is read once, so its column comes from the cache on every
+later run. ``--serve`` watches the sources (with ``watchfiles`` when installed, otherwise by
+polling), re-renders just the affected cells and pushes them to the open page over
+server-sent events: no refresh, and no rebuild of the rest of the page.
 """
 
 from __future__ import annotations
 
 import argparse
 import base64
+import hashlib
+import html
 import inspect
 import json
+import multiprocessing
+import os
+import queue
 import subprocess
 import sys
+import threading
+import time
 import webbrowser
-from functools import partial
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Callable, NamedTuple
 
 import vl_convert as vlc
 
 ROOT = Path(__file__).resolve().parent.parent
 SPECS = ROOT / "specs"
+THEME_DIR = ROOT / "src" / "ecostyles" / "themes"
 # THEMES = ["article", "cotd", "newsletter"]
 THEMES = ["article", "cotd"]
 
 sys.path.insert(0, str(SPECS))
-from ecostyles import EcoStyles  # noqa: E402  (registers the bundled fonts)
+from ecostyles import EcoStyles, warmup  # noqa: E402  (registers the bundled fonts)
+from ecostyles.utils.cache import RenderCache  # noqa: E402
 
 EcoStyles()
 
@@ -66,10 +85,25 @@ def load_charts() -> list[tuple[str, dict]]:
     return charts
 
 
+
+
 # --------------------------------------------------------------------------- themes
+class Variant(NamedTuple):
+    """One column of the preview: a theme, light or dark, from the working tree or a commit."""
+
+    label: str
+    name: str
+    dark: bool = False
+    ref: str | None = None  # commit SHA; None for the working tree
+
+
+def _theme_path(name: str) -> Path:
+    return THEME_DIR / f"{name}.py"
+
+
 def _get_theme_fn(name: str, ref: str | None):
     """Return a theme's get_theme() callable, from the working tree or a git ref."""
-    rel = f"src/ecostyles/themes/{name}.py"
+    rel = _theme_path(name).relative_to(ROOT).as_posix()
     if ref:
         source = subprocess.check_output(["git", "show", f"{ref}:{rel}"], text=True, cwd=ROOT)
     else:
@@ -86,42 +120,225 @@ def theme_config(name: str, dark: bool = False, ref: str | None = None) -> dict:
     return (fn(dark) if accepts_dark else fn())["config"]
 
 
-def build_variants(names: list[str], dark: bool, compare_ref: str | None) -> list[tuple[str, dict]]:
-    """Build the ordered list of (label, config) columns to render."""
-    variants: list[tuple[str, dict]] = []
+@lru_cache(maxsize=None)
+def _commit_theme_config(name: str, dark: bool, sha: str) -> dict:
+    """A theme as of a commit: it can never change, so it is read once per process."""
+    return theme_config(name, dark, sha)
+
+
+def resolve_ref(ref: str) -> str:
+    """Return the commit SHA a git ref names (pinned for the life of the process)."""
+    return subprocess.check_output(["git", "rev-parse", "--verify", f"{ref}^{{commit}}"],
+                                   text=True, cwd=ROOT).strip()
+
+
+def variant_config(variant: Variant) -> dict:
+    if variant.ref:
+        return _commit_theme_config(variant.name, variant.dark, variant.ref)
+    return theme_config(variant.name, variant.dark)
+
+
+def build_variants(names: list[str], dark: bool, compare_ref: str | None) -> list[Variant]:
+    """Build the ordered list of columns to render."""
+    sha = resolve_ref(compare_ref) if compare_ref else None
+    variants: list[Variant] = []
     for name in names:
-        if compare_ref:
-            variants.append((f"{name} @{compare_ref}", theme_config(name, ref=compare_ref)))
-            variants.append((f"{name} (working)", theme_config(name)))
+        if sha:
+            variants.append(Variant(f"{name} @{compare_ref}", name, ref=sha))
+            variants.append(Variant(f"{name} (working)", name))
         else:
-            variants.append((name, theme_config(name)))
+            variants.append(Variant(name, name))
         if dark and name == "cotd":
-            variants.append((f"{name} (dark)", theme_config(name, dark=True)))
+            variants.append(Variant(f"{name} (dark)", name, dark=True))
     return variants
 
 
 # --------------------------------------------------------------------------- render
-def render_png(spec: dict, config: dict, scale: float) -> bytes:
-    return vlc.vegalite_to_png(vl_spec=json.dumps({**spec, "config": config}), scale=scale)
-
-
-def _img(png: bytes) -> str:
-    return f'<img loading="lazy" src="data:image/png;base64,{base64.b64encode(png).decode()}">'
-
-
-def build_html(variants: list[tuple[str, dict]], charts: list[tuple[str, dict]], scale: float) -> str:
-    head = "".join(f"<th>{label}</th>" for label, _ in variants)
-    rows = []
-    for chart_name, spec in charts:
-        cells = [f"<th class='name'>{chart_name}</th>"]
-        for _, config in variants:
+def render_png(spec: str, scale: float) -> bytes:
+    """Render one themed Vega-Lite spec (JSON text) to PNG (run in a worker process)."""
+    return vlc.vegalite_to_png(vl_spec=spec, scale=scale)
+
+
+class Cell(NamedTuple):
+    """A rendered cell: the cache key of its PNG, or the error it failed with."""
+
+    key: str | None = None
+    error: str | None = None
+
+
+PENDING = Cell()
+
+
+class Preview:
+    """The charts x variants grid, kept up to date cell by cell.
+
+    Each cell is identified by the cache key of its themed spec, so after any edit only
+    cells whose key changed are rendered. PNGs come from the shared render cache when they
+    can; misses are rendered in a (spawned, reused) process pool of ``workers`` processes.
+
+    Args:
+        variants: The columns.
+        scale: Render scale.
+        workers: Render processes (default: one per CPU; 1 renders in this process).
+    """
+
+    def __init__(self, variants: list[Variant], scale: float, workers: int | None = None) -> None:
+        self.variants = variants
+        self.scale = scale
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = RenderCache()
+        self.charts: list[tuple[str, dict]] = []
+        self.cells: dict[tuple[str, str], Cell] = {}
+        self.images: dict[str, bytes] = {}  # PNGs of the current cells, by key
+        self.lock = threading.RLock()  # guards cells/charts against the server threads
+        self._configs: dict[str, dict | Exception] = {}
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def layout(self) -> str:
+        """Fingerprint of the grid's shape; a page built for another shape must reload."""
+        names = [name for name, _ in self.charts] + [v.label for v in self.variants]
+        return hashlib.sha256("\0".join(names).encode()).hexdigest()[:12]
+
+    def cell_id(self, chart: str, label: str) -> str:
+        row = next(i for i, (name, _) in enumerate(self.charts) if name == chart)
+        return f"c{row}-{[v.label for v in self.variants].index(label)}"
+
+    def update(self, changed: set[Path] | None = None,
+               on_cell: Callable[[str, str], None] | None = None) -> int:
+        """Re-render what ``changed`` source files affect (everything when None).
+
+        Working-tree variants re-read their theme only when its module changed, and charts
+        are reloaded only when a gallery source changed; then every cell whose spec is new
+        is rendered. ``on_cell(chart, label)`` is called as each changed cell lands.
+
+        Returns:
+            The number of cells that changed.
+        """
+        for variant in self.variants:
+            stale = changed is None or (variant.ref is None and _theme_path(variant.name) in changed)
+            if stale or variant.label not in self._configs:
+                try:
+                    self._configs[variant.label] = variant_config(variant)
+                except Exception as exc:  # noqa: BLE001 - a half-edited theme; show it inline
+                    self._configs[variant.label] = exc
+        if changed is None or any(path.parent != THEME_DIR for path in changed):
             try:
-                cells.append(f"<td>{_img(render_png(spec, config, scale))}</td>")
-            except Exception as exc:  # noqa: BLE001 - show render errors inline, keep going
-                cells.append(f"<td class='err'>{type(exc).__name__}: {exc}</td>")
-        rows.append(f"<tr>{''.join(cells)}</tr>")
-
-    return f"""<!doctype html>
+                charts = load_charts()
+            except Exception as exc:  # noqa: BLE001 - keep the last good gallery
+                print(f"gallery failed to load, keeping the previous one: {exc!r}")
+            else:
+                with self.lock:
+                    self.charts = charts
+                    self.cells = {k: v for k, v in self.cells.items()
+                                  if any(k[0] == name for name, _ in charts)}
+
+        # Each cell's target: an error, or (cache key, themed spec) to look up or render.
+        wanted: dict[tuple[str, str], Cell | tuple[str, str]] = {}
+        for chart, spec in self.charts:
+            for variant in self.variants:
+                config = self._configs[variant.label]
+                if isinstance(config, Exception):
+                    wanted[chart, variant.label] = Cell(error=f"{type(config).__name__}: {config}")
+                    continue
+                text = json.dumps({**spec, "config": config})
+                wanted[chart, variant.label] = (self.cache.key(text, "png", self.scale), text)
+
+        todo: dict[str, list[tuple[str, str]]] = {}
+        texts: dict[str, str] = {}
+        count = 0
+        for cell, want in wanted.items():
+            if isinstance(want, Cell):
+                count += self._set(cell, want, on_cell)
+                continue
+            key, text = want
+            if key not in self.images:
+                png = self.cache.get(key)
+                if png is None:
+                    todo.setdefault(key, []).append(cell)
+                    texts[key] = text
+                    continue
+                self.images[key] = png
+            count += self._set(cell, Cell(key), on_cell)
+
+        for key, result in self._render({key: texts[key] for key in todo}):
+            if isinstance(result, bytes):
+                self.cache.put(key, result)
+                self.images[key] = result
+                done = Cell(key)
+            else:
+                done = Cell(error=f"{type(result).__name__}: {result}")
+            for cell in todo[key]:
+                count += self._set(cell, done, on_cell)
+
+        live = {cell.key for cell in self.cells.values()}
+        for key in [key for key in self.images if key not in live]:
+            del self.images[key]
+        return count
+
+    def _set(self, cell: tuple[str, str], value: Cell, on_cell) -> int:
+        with self.lock:
+            if self.cells.get(cell) == value:
+                return 0
+            self.cells[cell] = value
+            if on_cell is not None:
+                on_cell(*cell)
+        return 1
+
+    def _render(self, specs: dict[str, str]):
+        """Yield ``(key, png or exception)`` for each spec, in completion order."""
+        if len(specs) <= 1 or self.workers <= 1:  # a pool would only add its start-up time
+            for key, text in specs.items():
+                try:
+                    yield key, render_png(text, self.scale)
+                except Exception as exc:  # noqa: BLE001 - show render errors inline, keep going
+                    yield key, exc
+            return
+        if self._pool is None:
+            # Spawn, not fork: a forked child inherits vl-convert's runtime without its worker
+            # thread, and its first render blocks forever. The pool is kept, so its workers
+            # stay warm between edits.
+            self._pool = ProcessPoolExecutor(self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        futures = {self._pool.submit(render_png, text, self.scale): key
+                   for key, text in specs.items()}
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], future.result() if error is None else error
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    # ----------------------------------------------------------------------- html
+    def cell_html(self, chart: str, label: str, inline: bool = False) -> str:
+        cell = self.cells.get((chart, label), PENDING)
+        if cell.error:
+            return f"<div class='err'>{html.escape(cell.error)}</div>"
+        if cell.key is None:
+            return "<div class='pending'>rendering&hellip;</div>"
+        if inline:
+            src = f"data:image/png;base64,{base64.b64encode(self.images[cell.key]).decode()}"
+        else:
+            src = f"/img/{cell.key}.png"
+        return f'<img loading="lazy" src="{src}">'
+
+    def html(self, live: bool = False) -> str:
+        """The whole page: PNGs inlined for a file, or served by URL and live-updated."""
+        with self.lock:
+            head = "".join(f"<th>{html.escape(v.label)}</th>" for v in self.variants)
+            rows = []
+            for chart, _ in self.charts:
+                cells = [f"<th class='name'>{html.escape(chart)}</th>"]
+                for variant in self.variants:
+                    cells.append(f"<td id='{self.cell_id(chart, variant.label)}'>"
+                                 f"{self.cell_html(chart, variant.label, inline=not live)}</td>")
+                rows.append(f"<tr>{''.join(cells)}</tr>")
+            layout = self.layout
+        status = "live: updates as you edit" if live else "re-run to re-render"
+        script = LIVE_SCRIPT.replace("__LAYOUT__", layout) if live else ""
+        return f"""<!doctype html>
 <html><head><meta charset="utf-8"><title>ecostyles theme preview</title>
 <style>
   body {{ font-family: -apple-system, system-ui, sans-serif; margin: 24px; background: #fff; color: #122b39; }}
@@ -134,14 +351,30 @@ def build_html(variants: list[tuple[str, dict]], charts: list[tuple[str, dict]],
   tbody tr {{ border-bottom: 1px solid #f0f0f0; }}
   img {{ max-width: 460px; height: auto; display: block; }}
   .err {{ color: #e6224b; font-family: monospace; font-size: 12px; max-width: 320px; }}
+  .pending {{ color: #676a86; font-size: 12px; }}
 </style></head><body>
 <h1>ecostyles theme preview</h1>
-<div class="meta">{len(charts)} charts &times; {len(variants)} variants &middot; refresh to re-render</div>
+<div class="meta">{len(self.charts)} charts &times; {len(self.variants)} variants &middot;
+<span id="status">{status}</span></div>
 <table><thead><tr><th class="name">chart</th>{head}</tr></thead>
-<tbody>{''.join(rows)}</tbody></table>
+<tbody>{''.join(rows)}</tbody></table>{script}
 </body></html>"""
 
 
+# On connecting, the server replays every cell, so nothing rendered between building the
+# page and subscribing is lost; a page built for a different grid reloads instead.
+LIVE_SCRIPT = """
+<script>
+const events = new EventSource("/events");
+events.onmessage = (e) => {
+  const msg = JSON.parse(e.data);
+  if (msg.layout && msg.layout !== "__LAYOUT__") return location.reload();
+  if (msg.cell) document.getElementById(msg.cell).innerHTML = msg.html;
+  if (msg.status) document.getElementById("status").textContent = msg.status;
+};
+</script>"""
+
+
 # --------------------------------------------------------------------------- modes
 def write_file(html: str, open_browser: bool) -> Path:
     out = ROOT / "renders" / "preview.html"
@@ -152,48 +385,162 @@ def write_file(html: str, open_browser: bool) -> Path:
     return out
 
 
-def _sources_mtime(themes: list[str]) -> float:
-    """Latest mtime across the files a render depends on (themes + gallery specs)."""
-    paths = [ROOT / f"src/ecostyles/themes/{t}.py" for t in themes]
+def _source_paths(themes: list[str]) -> list[Path]:
+    """The files a render depends on (themes + gallery specs)."""
+    paths = [_theme_path(t) for t in themes]
     paths.append(SPECS / "gallery.py")
     paths += list((SPECS / "gallery").glob("*.json"))
-    return max((p.stat().st_mtime for p in paths if p.exists()), default=0.0)
+    return paths
+
+
+def watch_sources(themes: list[str], interval: float = 0.25):
+    """Yield each batch of changed source files, as a set of absolute paths.
+
+    Uses ``watchfiles`` (inotify, FSEvents or ReadDirectoryChangesW) when it is installed,
+    else polls mtimes every ``interval`` seconds.
+    """
+    try:
+        from watchfiles import watch
+    except ImportError:
+        watch = None
+
+    if watch is not None:
+        wanted = {p.resolve() for p in _source_paths(themes)}
+        gallery_dir = (SPECS / "gallery").resolve()
+
+        def relevant(_change, path: str) -> bool:
+            path = Path(path).resolve()
+            return path in wanted or (path.parent == gallery_dir and path.suffix == ".json")
+
+        dirs = [d for d in (THEME_DIR, SPECS) if d.exists()]
+        for changes in watch(*dirs, watch_filter=relevant):
+            yield {Path(path).resolve() for _, path in changes}
+        return
+
+    def mtimes() -> dict[Path, float]:
+        return {p.resolve(): p.stat().st_mtime for p in _source_paths(themes) if p.exists()}
+
+    seen = mtimes()
+    while True:
+        time.sleep(interval)
+        now = mtimes()
+        changed = {p for p in seen.keys() | now.keys() if seen.get(p) != now.get(p)}
+        seen = now
+        if changed:
+            yield changed
+
+
+class Events:
+    """Fans server-sent events out to every open page."""
+
+    def __init__(self) -> None:
+        self._clients: set[queue.Queue] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        q: queue.Queue = queue.Queue()
+        with self._lock:
+            self._clients.add(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._lock:
+            self._clients.discard(q)
+
+    def publish(self, message: dict) -> None:
+        with self._lock:
+            for q in self._clients:
+                q.put(message)
 
 
 def serve(args, port: int) -> None:
-    # Cache the rendered page; only re-render when a source file changes. This makes plain
-    # refreshes instant and shrinks the window in which a mid-render refresh drops the
-    # connection (the cause of BrokenPipeError).
-    cache: dict = {"mtime": -1.0, "html": b""}
-
-    def current_html() -> bytes:
-        mtime = _sources_mtime(args.themes)
-        if mtime != cache["mtime"]:
-            variants = build_variants(args.themes, args.dark, args.compare_ref)
-            cache["html"] = build_html(variants, load_charts(), args.scale).encode()
-            cache["mtime"] = mtime
-        return cache["html"]
+    warmup()  # start vl-convert now, so the first edit renders warm in this process
+    preview = Preview(build_variants(args.themes, args.dark, args.compare_ref), args.scale,
+                      args.workers)
+    events = Events()
+
+    def cell_message(chart: str, label: str) -> dict:
+        return {"cell": preview.cell_id(chart, label), "html": preview.cell_html(chart, label)}
 
     class Handler(BaseHTTPRequestHandler):
         def do_GET(self):
             try:
-                body = current_html()
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html; charset=utf-8")
-                self.send_header("Content-Length", str(len(body)))
-                self.end_headers()
-                self.wfile.write(body)
+                if self.path == "/events":
+                    return self._events()
+                if self.path.startswith("/img/"):
+                    png = preview.images.get(self.path[5:].removesuffix(".png"))
+                    if png is None:
+                        return self.send_error(404)
+                    # Content-addressed: a given URL always means the same PNG.
+                    return self._send(png, "image/png", "max-age=31536000, immutable")
+                if self.path != "/":
+                    return self.send_error(404)
+                self._send(preview.html(live=True).encode(), "text/html; charset=utf-8", "no-store")
             except (BrokenPipeError, ConnectionResetError):
                 pass  # browser refreshed / navigated away mid-response — safe to ignore
 
+        def _send(self, body: bytes, content_type: str, cache_control: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _events(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            with preview.lock:  # no cell can change between the replay and subscribing
+                q = events.subscribe()
+                q.put({"layout": preview.layout})
+                for chart, label in list(preview.cells):
+                    q.put(cell_message(chart, label))
+            try:
+                while True:
+                    try:
+                        message = q.get(timeout=15)
+                        self.wfile.write(f"data: {json.dumps(message)}\n\n".encode())
+                    except queue.Empty:
+                        self.wfile.write(b": keep-alive\n\n")  # also notices closed pages
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                events.unsubscribe(q)
+
         def log_message(self, *_):  # quiet
             pass
 
+    server = ThreadingHTTPServer(("localhost", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
     url = f"http://localhost:{port}/"
-    print(f"Serving theme preview at {url} — edit a theme and refresh "
-          f"(re-renders only when a source file changes; Ctrl+C to stop).")
-    webbrowser.open(url)
-    HTTPServer(("localhost", port), Handler).serve_forever()
+    print(f"Serving theme preview at {url} — edit a theme or gallery spec and the page updates "
+          f"itself (Ctrl+C to stop).")
+    if not args.no_open:
+        webbrowser.open(url)
+
+    def update(changed: set[Path] | None) -> None:
+        start = time.perf_counter()
+        layout = preview.layout
+        n = preview.update(changed, on_cell=lambda c, v: events.publish(cell_message(c, v)))
+        if preview.layout != layout:
+            events.publish({"layout": preview.layout})
+        status = f"{n} cell(s) updated in {time.perf_counter() - start:.2f}s"
+        events.publish({"status": status})
+        print(status)
+
+    try:
+        update(None)
+        for changed in watch_sources(args.themes):
+            update(changed)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        preview.close()
 
 
 def main(argv: list[str]) -> None:
@@ -205,6 +552,8 @@ def main(argv: list[str]) -> None:
     parser.add_argument("--scale", type=float, default=2.0, help="render scale (default 2)")
     parser.add_argument("--serve", action="store_true", help="serve a live-reloading page instead of writing a file")
     parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="render processes (default: one per CPU)")
     parser.add_argument("--no-open", action="store_true", help="don't open a browser")
     args = parser.parse_args(argv)
 
@@ -216,9 +565,17 @@ def main(argv: list[str]) -> None:
         serve(args, args.port)
         return
 
-    variants = build_variants(args.themes, args.dark, args.compare_ref)
-    out = write_file(build_html(variants, load_charts(), args.scale), not args.no_open)
-    print(f"wrote {out.relative_to(ROOT)} ({len(variants)} variants)")
+    start = time.perf_counter()
+    preview = Preview(build_variants(args.themes, args.dark, args.compare_ref), args.scale,
+                      args.workers)
+    try:
+        preview.update()
+    finally:
+        preview.close()
+    out = write_file(preview.html(), not args.no_open)
+    print(f"wrote {out.relative_to(ROOT)} ({len(preview.variants)} variants, "
+          f"{time.perf_counter() - start:.1f}s; cache: {preview.cache.hits} hits, "
+          f"{preview.cache.misses} misses)")
 
 
 if __name__ == "__main__":
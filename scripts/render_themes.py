@@ -7,15 +7,24 @@ looks across chart types, side by side, in one PNG per theme.
     uv run python scripts/render_themes.py cotd        # just one theme
 
 Output goes to ``renders/<theme>.png`` (git-ignored).
+
+Each (theme, chart) tile is rendered to SVG on its own, in a process pool, and cached by
+spec hash in the shared render cache (see ``ecostyles.utils.cache.RenderCache``). A sheet
+is then composed from its tiles as one SVG and rasterised once. Editing one theme only
+re-renders that theme's tiles; an unchanged sheet comes straight from the cache.
 """
 
 from __future__ import annotations
 
+import json
+import multiprocessing
+import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import altair as alt
-from altair import theme
 import vl_convert as vlc
 
 # Make specs/ importable and ensure fonts are registered with vl-convert.
@@ -23,34 +32,95 @@ ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "specs"))
 from gallery import build_all  # noqa: E402
 
-from ecostyles import EcoStyles  # noqa: E402
-from ecostyles.themes import article, cotd, newsletter  # noqa: E402
-
-EcoStyles()  # side effect: registers the Circular Std fonts
+from ecostyles.themes import get_theme  # noqa: E402
+from ecostyles.utils.cache import RenderCache  # noqa: E402
+from ecostyles.utils.file_operations import themed  # noqa: E402
+from ecostyles.utils.fonts import setup_fonts  # noqa: E402
 
-# label -> theme config dict
+# label -> (theme name, dark mode)
 THEMES = {
-    "article": article.get_theme(),
-    "cotd": cotd.get_theme(),
-    "cotd_dark": cotd.get_theme(dark_mode=True),
-    "newsletter": newsletter.get_theme(),
+    "article": ("article", False),
+    "cotd": ("cotd", False),
+    "cotd_dark": ("cotd", True),
+    "newsletter": ("newsletter", False),
 }
 
 COLUMNS = 3
+SPACING = 24
+SCALE = 2
 
-
-def _grid() -> alt.VConcatChart:
-    """Arrange all gallery charts into a grid (COLUMNS per row)."""
-    charts = list(build_all().values())
-    rows = [alt.hconcat(*charts[i:i + COLUMNS]) for i in range(0, len(charts), COLUMNS)]
-    return alt.vconcat(*rows).properties(spacing=24)
+_SIZE_RE = re.compile(r'<svg\b[^>]*?\bwidth="([\d.]+)"[^>]*?\bheight="([\d.]+)"')
+_ID_RE = re.compile(r'\bid="([^"]+)"')
 
 
-def render(label: str, config: dict, out_dir: Path) -> Path:
-    # Register + enable this theme so Altair injects its config at serialisation time.
-    theme.register(label, enable=True)(lambda cfg=config: cfg)
-    spec = _grid().to_json()
-    png = vlc.vegalite_to_png(vl_spec=spec, scale=2)
+def tile_specs(labels: list[str]) -> dict[str, list[str]]:
+    """Return ``{label: [spec JSON per gallery chart]}``, each themed without global state."""
+    charts = list(build_all().values())
+    return {label: [json.dumps(themed(chart, *THEMES[label])) for chart in charts]
+            for label in labels}
+
+
+def render_tile(spec: str) -> str:
+    """Render one Vega-Lite spec to SVG (run in a worker process)."""
+    setup_fonts()
+    return vlc.vega_to_svg(vlc.vegalite_to_vega(spec))
+
+
+def render_tiles(specs: list[str], cache: RenderCache) -> list[str]:
+    """SVG for each spec: from the cache, rendering only the misses in a process pool."""
+    keys = [cache.key(spec, "svg") for spec in specs]
+    tiles = {key: cache.get(key) for key in dict.fromkeys(keys)}
+    misses = {key: spec for key, spec in zip(keys, specs) if tiles[key] is None}
+    workers = min(len(misses), os.cpu_count() or 1)
+    if workers <= 1:  # a single worker would only add its start-up time
+        rendered = [render_tile(spec) for spec in misses.values()]
+    else:
+        # Spawn, not fork: a forked child inherits vl-convert's runtime without its worker
+        # thread, and its first render blocks forever.
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            rendered = list(pool.map(render_tile, misses.values()))
+    for key, svg in zip(misses, rendered):
+        tiles[key] = svg.encode()
+        cache.put(key, tiles[key])
+    return [tiles[key].decode() for key in keys]
+
+
+def _scope_ids(svg: str, prefix: str) -> str:
+    """Prefix the ids in one tile's SVG (e.g. Vega's ``gradient_0``) so tiles can't clash."""
+    for name in set(_ID_RE.findall(svg)):
+        svg = (svg.replace(f'id="{name}"', f'id="{prefix}{name}"')
+                  .replace(f"url(#{name})", f"url(#{prefix}{name})")
+                  .replace(f'href="#{name}"', f'href="#{prefix}{name}"'))
+    return svg
+
+
+def compose(tiles: list[str], background: str = "white") -> str:
+    """Lay tile SVGs out in a grid (COLUMNS per row) as one nested SVG document."""
+    sizes = [tuple(float(v) for v in _SIZE_RE.search(tile).groups()) for tile in tiles]
+    parts, y, width = [], 0.0, 0.0
+    for row in range(0, len(tiles), COLUMNS):
+        x = 0.0
+        for i in range(row, min(row + COLUMNS, len(tiles))):
+            tile = _scope_ids(tiles[i], f"t{i}-")
+            parts.append(tile.replace("<svg", f'<svg x="{x:g}" y="{y:g}"', 1))
+            x += sizes[i][0] + SPACING
+        width = max(width, x - SPACING)
+        y += max(h for _, h in sizes[row:row + COLUMNS]) + SPACING
+    height = y - SPACING
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"'
+            f' width="{width:g}" height="{height:g}" viewBox="0 0 {width:g} {height:g}">'
+            f'<rect width="100%" height="100%" fill="{background}"/>{"".join(parts)}</svg>')
+
+
+def render(label: str, tiles: list[str], out_dir: Path, cache: RenderCache) -> Path:
+    """Compose ``label``'s tiles into a sheet and write it as a PNG (cached as a whole)."""
+    background = get_theme(*THEMES[label])["config"].get("background") or "white"
+    sheet = compose(tiles, background)
+    key = cache.key(sheet, "png", SCALE)
+    png = cache.get(key)
+    if png is None:
+        png = vlc.svg_to_png(sheet, scale=SCALE)
+        cache.put(key, png)
     out = out_dir / f"{label}.png"
     out.write_bytes(png)
     return out
@@ -62,11 +132,21 @@ def main(argv: list[str]) -> None:
     if unknown:
         raise SystemExit(f"Unknown theme(s) {unknown}. Choose from {list(THEMES)}")
 
+    start = time.perf_counter()
+    setup_fonts()
+    cache = RenderCache()
+    specs = tile_specs(wanted)
+    # All themes' tiles go through one pool, so its workers start once.
+    flat = render_tiles([spec for label in wanted for spec in specs[label]], cache)
+
     out_dir = ROOT / "renders"
     out_dir.mkdir(exist_ok=True)
-    for label in wanted:
-        path = render(label, THEMES[label], out_dir)
+    for i, label in enumerate(wanted):
+        n = len(specs[label])
+        path = render(label, flat[i * n:(i + 1) * n], out_dir, cache)
         print(f"wrote {path.relative_to(ROOT)}")
+    print(f"{len(flat)} tiles in {time.perf_counter() - start:.1f}s "
+          f"(cache: {cache.hits} hits, {cache.misses} misses)")
 
 
 if __name__ == "__main__":
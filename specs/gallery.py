@@ -3,7 +3,7 @@
 Each builder returns a plain ``alt.Chart`` with **no theme/config applied**, so the
 active ``ecostyles`` theme decides the styling. The set covers the mark types our themes
 configure (line, bar, point/scatter, area, rect/heatmap, geoshape) plus common cases
-(multi-series colour, temporal axes, faceting).
+(multi-series colour, temporal axes, faceting, pre-binned dense scatters).
 
 Used by:
 - ``tests/test_theme_rendering.py`` — smoke-renders every theme x chart (regression guard).
@@ -17,8 +17,11 @@ from __future__ import annotations
 import math
 
 import altair as alt
+import numpy as np
 import pandas as pd
 
+from ecostyles.utils.binning import binned_heatmap
+
 
 # --------------------------------------------------------------------------- data
 def _timeseries() -> pd.DataFrame:
@@ -66,6 +69,14 @@ def _heatmap() -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+def _dense_scatter() -> pd.DataFrame:
+    """Many correlated points: too dense for one mark each."""
+    rng = np.random.default_rng(0)
+    income = rng.lognormal(3.2, 0.5, 50_000)
+    return pd.DataFrame({"income": income,
+                         "spending": 0.7 * income + rng.normal(0, 4, income.size)})
+
+
 def _geo() -> dict:
     """A tiny hand-made GeoJSON FeatureCollection (offline, no vega_datasets)."""
     def square(x, y, s):
@@ -142,6 +153,12 @@ def heatmap() -> alt.Chart:
     )
 
 
+def scatter_binned() -> alt.Chart:
+    """Dense scatter pre-binned into a rect heatmap (theme ``range.heatmap``)."""
+    return binned_heatmap(_dense_scatter(), "income", "spending", width=240, height=180,
+                          x_title="Income (000s)", y_title="Spending (000s)")
+
+
 def geoshape() -> alt.Chart:
     """Choropleth using an inline (offline) GeoJSON."""
     data = alt.Data(values=_geo(), format=alt.DataFormat(property="features", type="json"))
@@ -160,6 +177,7 @@ GALLERY = {
     "scatter": scatter,
     "area_stacked": area_stacked,
     "heatmap": heatmap,
+    "scatter_binned": scatter_binned,
     "geoshape": geoshape,
 }
 
@@ -2,9 +2,40 @@
 ecostyles - Custom Altair themes and styling utilities
 
 This package provides custom Altair themes and styling utilities for data visualisation.
+
+``import ecostyles`` is cheap: :class:`EcoStyles` (and with it Altair and pandas) and
+``__version__`` (read from the package metadata) are only imported on first access, and
+``ecostyles.themes`` has no heavy dependencies at all.
 """
 
-from .styles import EcoStyles
-from ._version import __version__
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ._version import __version__
+    from .styles import EcoStyles
+    from .utils.warmup import warmup
+
+__all__ = ["EcoStyles", "warmup", "__version__"]
+
+
+def __getattr__(name):
+    if name == "EcoStyles":
+        from .styles import EcoStyles
+
+        globals()["EcoStyles"] = EcoStyles
+        return EcoStyles
+    if name == "warmup":
+        from .utils.warmup import warmup
+
+        globals()["warmup"] = warmup
+        return warmup
+    if name == "__version__":
+        from ._version import __version__
+
+        globals()["__version__"] = __version__
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-__all__ = ["EcoStyles", "__version__"]
\ No newline at end of file
+def __dir__():
+    return sorted({*globals(), *__all__})
@@ -1,24 +1,49 @@
-"""Core styling functionality for Economics Observatory visualisations."""
+"""Core styling functionality for Economics Observatory visualisations.
+
+Altair, pandas, NumPy and the heavier utils are imported inside the methods that need
+them, so creating an ``EcoStyles(compact_data=False)`` for its colours and palettes stays
+cheap.
+"""
+
+from __future__ import annotations
 
 import json
 from importlib import resources
+from typing import TYPE_CHECKING
 
-import altair as alt
-from altair import theme
-import pandas as pd
-import country_converter as coco
 from . import themes
-from .utils.file_operations import save_chart, add_source
-from .utils.population import add_population
-from .utils.palette import swatches
 from .utils.fonts import setup_fonts
 
+if TYPE_CHECKING:
+    import altair as alt
+    import pandas as pd
+
 class EcoStyles:
-    """Main class for Economics Observatory visualisation styling."""
+    """Main class for Economics Observatory visualisation styling.
+
+    Args:
+        compact_data: Enable the ``"ecostyles"`` Altair data transformer, which compacts
+            the data embedded in chart specs (see ``utils.data_transformer``). True for the
+            defaults, a dict of transformer options (e.g. ``{"max_rows": 200_000}``), or
+            False to leave Altair's active transformer alone.
+        warm: Start warming up vl-convert in a background thread (see
+            ``utils.warmup``), so the first ``save`` doesn't pay its start-up cost. Runs
+            once per process; the run is kept as ``self.warmup``.
+    """
     
-    def __init__(self) -> None:
+    def __init__(self, compact_data=True, warm=False) -> None:
         # Set up fonts first
         self._font_dir = setup_fonts()
+        self.warmup = None
+        if warm:
+            from .utils.warmup import warmup
+
+            self.warmup = warmup()
+
+        if compact_data:
+            from .utils import data_transformer
+
+            data_transformer.enable(**(compact_data if isinstance(compact_data, dict) else {}))
 
         self.eco_colours = {
             "pink": "#e6224b",                     # ECO pink (categorical #2)
@@ -144,6 +169,8 @@ class EcoStyles:
             which: 'eco', 'national', 'national_eco', or a custom dict/list of colours.
             **kwargs: forwarded to the swatch renderer (e.g. columns, size, title).
         """
+        from .utils.palette import swatches
+
         groups = {
             "eco": (self.eco_colours, "ECO colours"),
             "category": (self.category_palette, "ECO categorical palette"),
@@ -163,6 +190,9 @@ class EcoStyles:
 
         Shows the category / diverging / heatmap / ordinal palettes the theme defines.
         """
+        import altair as alt
+        from .utils.palette import swatches
+
         theme_getters = {
             "article": themes.article.get_theme,
             "cotd": themes.cotd.get_theme,
@@ -177,6 +207,9 @@ class EcoStyles:
 
     def register_and_enable_theme(self, theme_name: str="article", dark_mode: bool=False):
         """Register and enable a custom theme.
+
+        This changes Altair's process-wide active theme. To style one chart (e.g. from
+        several threads at once), use :meth:`themed` or ``save(..., theme=...)`` instead.
         
         Args:
             theme_name: One of 'cotd', 'article', or 'newsletter'
@@ -185,6 +218,8 @@ class EcoStyles:
         if theme_name not in ['cotd', 'article', 'newsletter']:
             raise ValueError("theme_name must be 'cotd', 'article', or 'newsletter'")
         
+        from altair import theme
+
         # def theme_function():
         #     if theme_name == "cotd":
         #         return themes.cotd.get_theme(dark_mode)
@@ -208,6 +243,40 @@ class EcoStyles:
                 return themes.newsletter.get_theme()
 
 
+    def _assign_colours(self, values, colour_map=None, default=None, palette=None):
+        """Assign a colour to each distinct country in ``values`` (see :meth:`add_colour`).
+
+        Works on the distinct values only: each is resolved to ISO3 once, and the palette
+        or ``colour_map`` is applied per country rather than per row.
+
+        Returns:
+            ``(codes, uniques, colours)``: ``codes`` maps each row to its position in
+            ``uniques`` (-1 where missing), and ``colours[i]`` is the colour of ``uniques[i]``.
+        """
+        import numpy as np
+        import pandas as pd
+        from .utils.countries import to_iso3
+
+        default = default or self.eco_colours["grey"]
+        palette = list(palette) if palette is not None else list(self.category_palette)
+
+        codes, uniques = pd.factorize(values)
+        labels = [str(value) for value in uniques]
+        # Effective key per value: ISO3 when resolvable, else the original label (groups).
+        keys = [iso or label for iso, label in zip(to_iso3(labels), labels)]
+
+        if colour_map:
+            map_labels = [str(label) for label in colour_map]
+            normalised = {iso or label: colour for iso, label, colour
+                          in zip(to_iso3(map_labels), map_labels, colour_map.values())}
+            colours = [normalised.get(k, default) for k in keys]
+        else:
+            # Values are in order of first appearance, so palette order is too. Spellings
+            # of the same country ("GBR", "United Kingdom") share a key, hence a colour.
+            key_codes, _ = pd.factorize(np.array(keys, dtype=object))
+            colours = [palette[code % len(palette)] for code in key_codes]
+        return codes, uniques, colours
+
     def add_colour(self, df: pd.DataFrame, country_column: str, colour_map: dict = None, *,
                    default: str = None, palette=None, colour_column: str = "colour") -> pd.DataFrame:
         """Add a colour column mapping each country to a standard colour.
@@ -227,8 +296,11 @@ class EcoStyles:
           from ``palette`` (the ECO categorical palette by default) in order of first
           appearance, so every country has a consistent colour within the frame.
 
+        For long frames, :meth:`colour_scale` gives the same colours as a scale instead of
+        a per-row column, which keeps saved specs much smaller.
+
         Args:
-            df: Input dataframe (copied, not mutated).
+            df: Input dataframe (not mutated).
             country_column: Column of country names / codes.
             colour_map: Optional ``{country: colour}`` overrides.
             default: Colour for unmapped countries (default: ECO grey).
@@ -236,35 +308,50 @@ class EcoStyles:
             colour_column: Name of the colour column to add (default ``"colour"``).
 
         Returns:
-            A copy of ``df`` with ``colour_column`` added. Use it in a chart via, e.g.,
+            A new frame (sharing ``df``'s columns) with ``colour_column`` added as a
+            categorical of colour strings. Use it in a chart via, e.g.,
             ``alt.Color(f"{colour_column}:N", scale=None)``.
         """
-        df = df.copy()
+        import numpy as np
+        import pandas as pd
+
         default = default or self.eco_colours["grey"]
-        palette = list(palette) if palette is not None else list(self.category_palette)
+        codes, _, colours = self._assign_colours(df[country_column], colour_map, default, palette)
+        # The distinct colours become categories, and each row takes its country's code,
+        # so no per-row strings are built. Rows with a missing country get the default.
+        colour_codes, categories = pd.factorize(np.array(colours + [default], dtype=object))
+        column = pd.Categorical.from_codes(colour_codes[codes], categories=categories)
+
+        df = df.copy(deep=False)  # adds a column only: the input's data is shared, not copied
+        df[colour_column] = column.remove_unused_categories()
+        return df
 
-        originals = df[country_column].astype(str).tolist()
-        converted = coco.convert(originals, to="ISO3", not_found=None)
-        if isinstance(converted, str):  # coco returns a bare string for a single input
-            converted = [converted]
-        # Effective key per row: ISO3 when resolvable, else the original label (groups).
-        keys = [iso or orig for iso, orig in zip(converted, originals)]
+    def colour_scale(self, df: pd.DataFrame, country_column: str, colour_map: dict = None, *,
+                     default: str = None, palette=None) -> alt.Scale:
+        """Return an Altair colour scale giving each country its standard colour.
 
-        if colour_map:
-            normalised = {}
-            for label, colour in colour_map.items():
-                iso = coco.convert(str(label), to="ISO3", not_found=None)
-                normalised[iso or str(label)] = colour
-            colours = [normalised.get(k, default) for k in keys]
-        else:
-            assigned = {}
-            for k in keys:
-                if k not in assigned:
-                    assigned[k] = palette[len(assigned) % len(palette)]
-            colours = [assigned[k] for k in keys]
+        The same country -> colour assignment as :meth:`add_colour` (explicit
+        ``colour_map`` or automatic palette, matched via ISO3), but as a scale: the
+        colours live once in the spec instead of in every row, so a long panel stays
+        small and Vega does one scale lookup per mark.
 
-        df[colour_column] = colours
-        return df
+        Use it on the country field itself, e.g.
+        ``alt.Color("country:N", scale=styles.colour_scale(df, "country"))``.
+
+        Args:
+            df: Dataframe whose countries make up the scale's domain (not mutated).
+            country_column: Column of country names / codes.
+            colour_map, default, palette: As for :meth:`add_colour`.
+
+        Returns:
+            alt.Scale: ``domain`` is the distinct values of ``country_column`` as they
+            appear in the data (first-appearance order), ``range`` their colours.
+        """
+        import altair as alt
+
+        _, uniques, colours = self._assign_colours(df[country_column], colour_map, default,
+                                                   palette)
+        return alt.Scale(domain=list(uniques), range=colours)
 
     def get_recessions(self, region: str = "uk") -> pd.DataFrame:
         """Return recession periods for a region as a dataframe.
@@ -276,6 +363,8 @@ class EcoStyles:
             DataFrame with datetime 'start' and 'end' columns, one row per recession.
             Pass it straight to ``add_shaded_area(periods=...)``.
         """
+        import pandas as pd
+
         key = region.lower()
         if key not in ("uk", "us"):
             raise ValueError("region must be 'uk' or 'us'")
@@ -309,6 +398,9 @@ class EcoStyles:
             color: Optional fill colour override.
             opacity: Optional opacity override.
         """
+        import altair as alt
+        import pandas as pd
+
         if periods is not None:
             data = periods
         else:
@@ -331,6 +423,7 @@ class EcoStyles:
     
     def update_y_axis_title(self, chart: alt.Chart, title: str):
         """Update y-axis title of an Altair chart."""
+        import altair as alt
 
         spec = chart.to_dict()
         if 'encoding' in spec and 'y' in spec['encoding']:
@@ -351,6 +444,8 @@ class EcoStyles:
     
     def display(self, chart, title, subtitle, y_title):
         """Display two versions of a chart with different titles."""
+        import altair as alt
+
         title_params = alt.TitleParams(
             text=title,
             subtitle=subtitle,
@@ -364,14 +459,38 @@ class EcoStyles:
         return chart_title, chart_y_title
 
     # Delegate file operations to utils module
+    def themed(self, *args, **kwargs):
+        """Chart spec in a given theme, without global state. See utils.file_operations.themed."""
+        from .utils.file_operations import themed
+
+        return themed(*args, **kwargs)
+
     def save(self, *args, **kwargs):
         """Save chart to file(s). See utils.file_operations.save_chart for details."""
+        from .utils.file_operations import save_chart
+
         return save_chart(*args, **kwargs)
+
+    def save_many(self, *args, **kwargs):
+        """Save many charts in parallel. See utils.file_operations.save_many for details."""
+        from .utils.file_operations import save_many
+
+        return save_many(*args, **kwargs)
     
     def add_source(self, *args, **kwargs):
         """Add source attribution to chart. See utils.file_operations.add_source for details."""
+        from .utils.file_operations import add_source
+
         return add_source(*args, **kwargs)
 
     def add_population(self, *args, **kwargs):
         """Add a population column via the World Bank API. See utils.population.add_population."""
-        return add_population(*args, **kwargs)
\ No newline at end of file
+        from .utils.population import add_population
+
+        return add_population(*args, **kwargs)
+
+    def binned_heatmap(self, *args, **kwargs):
+        """Heatmap of a dense scatter, pre-binned in NumPy. See utils.binning.binned_heatmap."""
+        from .utils.binning import binned_heatmap
+
+        return binned_heatmap(*args, **kwargs)
@@ -1,7 +1,35 @@
 """Theme configurations for Economics Observatory visualisations."""
 
+from functools import lru_cache
+
 from . import cotd
 from . import article
 from . import newsletter
 
-__all__ = ['cotd', 'article', 'newsletter']
\ No newline at end of file
+NAMES = ('article', 'cotd', 'newsletter')
+
+
+@lru_cache(maxsize=None)
+def get_theme(name: str, dark_mode: bool = False) -> dict:
+    """Return a theme's configuration by name, built once per ``(name, dark_mode)``.
+
+    The dict is shared between callers, so treat it as read-only: copy it before
+    changing it (``utils.file_operations.themed`` and Altair's registry both do).
+
+    Args:
+        name: One of 'article', 'cotd' or 'newsletter'.
+        dark_mode: Dark-mode variant (currently only 'cotd' honours this).
+
+    Returns:
+        dict: Theme configuration
+    """
+    if name == 'cotd':
+        return cotd.get_theme(dark_mode)
+    if name == 'article':
+        return article.get_theme()
+    if name == 'newsletter':
+        return newsletter.get_theme()
+    raise ValueError(f"theme must be one of {list(NAMES)}, got {name!r}")
+
+
+__all__ = ['cotd', 'article', 'newsletter', 'get_theme', 'NAMES']
@@ -7,7 +7,12 @@ larger and higher-contrast axis labels, a bigger narrative title, and a more fee
 default size. Distilled from `specs/cotd_example.json`.
 """
 
-from altair import theme
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # annotation only: importing a theme stays free of altair
+    from altair import theme
 
 
 def get_theme(dark_mode: bool = False) -> theme.ThemeConfig:
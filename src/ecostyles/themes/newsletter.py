@@ -1,6 +1,13 @@
 """Newsletter chart theme configuration."""
 
-from altair import theme
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # annotation only: importing a theme stays free of altair
+    from altair import theme
+
+
 def get_theme() -> theme.ThemeConfig:
     """Returns a theme suitable for Economics Observatory newsletter charts.
 
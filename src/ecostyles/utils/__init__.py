@@ -1,6 +1,36 @@
-"""Utility functions for Economics Observatory visualisations."""
+"""Utility functions for Economics Observatory visualisations.
 
-from .file_operations import save_chart, add_source, modify_dimensions
-from .population import add_population
+Re-exports are imported on first access, so ``import ecostyles.utils`` (and its light
+modules, e.g. ``fonts`` and ``cache``) doesn't pay for Altair, pandas or vl-convert.
+"""
 
-__all__ = ['save_chart', 'add_source', 'modify_dimensions', 'add_population']
\ No newline at end of file
+from importlib import import_module
+
+# Eager, and cheap: the function would otherwise be shadowed by its own submodule once
+# anything imported ``ecostyles.utils.downsample``.
+from .downsample import downsample
+
+_LAZY = {
+    'save_chart': 'file_operations', 'save_many': 'file_operations',
+    'add_source': 'file_operations', 'modify_dimensions': 'file_operations',
+    'prune_unused_columns': 'file_operations', 'dedupe_datasets': 'file_operations',
+    'externalise_data': 'file_operations', 'themed': 'file_operations', 'bin2d': 'binning',
+    'binned_heatmap': 'binning', 'add_population': 'population',
+}
+
+__all__ = ['save_chart', 'save_many', 'add_source', 'modify_dimensions', 'prune_unused_columns',
+           'dedupe_datasets', 'externalise_data', 'themed', 'downsample', 'bin2d',
+           'binned_heatmap', 'add_population']
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
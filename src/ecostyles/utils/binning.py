@@ -0,0 +1,165 @@
+"""Pre-aggregated 2D binning for dense scatter and heatmap charts.
+
+Every row of a scatter plot becomes its own Vega mark, so a 500k-point chart takes a long
+time to render and embeds every point in the spec. Binning the points into a grid at (or
+near) the chart's pixel resolution first, then drawing one ``rect`` per non-empty cell,
+bounds both render time and spec size by the resolution rather than the row count.
+
+:func:`bin2d` does the binning in NumPy; :func:`binned_heatmap` wraps it in a chart that
+takes its colours from the active theme's ``range.heatmap`` palette.
+"""
+
+from __future__ import annotations
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+STATISTICS = ("count", "sum", "mean")
+
+
+def _as_float(values) -> tuple[np.ndarray, bool]:
+    """Return ``values`` as float64 (datetimes as epoch ns) and whether they were datetimes."""
+    s = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        s = s.dt.tz_convert(None) if getattr(s.dt, "tz", None) is not None else s
+        ns = s.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+        ns[s.isna().to_numpy()] = np.nan
+        return ns, True
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64", na_value=np.nan), False
+
+
+def _limits(lim, is_time: bool):
+    """Return an extent pair on the binned values' scale: floats, or epoch ns for datetimes."""
+    if lim is None:
+        return None
+    if is_time:
+        return tuple(_as_float(pd.Series(pd.to_datetime(list(lim))))[0])
+    return float(lim[0]), float(lim[1])
+
+
+def _edges(values: np.ndarray, n: int, lim) -> np.ndarray:
+    lo, hi = lim if lim is not None else (np.min(values), np.max(values))
+    if hi <= lo:  # a single value: give it a unit-wide cell
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, n + 1)
+
+
+def bin2d(x, y, values=None, *, bins=(87, 70), extent=None, statistic: str = "count",
+          x_name: str = "x", y_name: str = "y", value_name: str | None = None) -> pd.DataFrame:
+    """Bin points into a regular 2D grid and return one row per non-empty cell.
+
+    Args:
+        x, y: Point coordinates (array-likes or Series; numeric or datetime).
+        values: Optional weights for ``"sum"``/``"mean"``.
+        bins: Number of cells along x and y: an int for both, or an ``(nx, ny)`` pair.
+        extent: Optional ``((xmin, xmax), (ymin, ymax))``; either pair may be None. Points
+            outside it are dropped. Limits for a datetime axis may be datetimes or date
+            strings. Defaults to the data's extent.
+        statistic: ``"count"`` (default), ``"sum"`` or ``"mean"`` of ``values``.
+        x_name, y_name: Base names for the cell edge columns.
+        value_name: Name of the statistic column (default: ``statistic``).
+
+    Returns:
+        DataFrame with ``x_name``/``{x_name}2`` and ``y_name``/``{y_name}2`` cell edges
+        (datetimes if the input was) and the statistic column. Rows with a missing
+        coordinate (or value, for sum/mean) are ignored.
+    """
+    if statistic not in STATISTICS:
+        raise ValueError(f"statistic must be one of {list(STATISTICS)}")
+    if statistic != "count" and values is None:
+        raise ValueError(f"statistic={statistic!r} requires values")
+    nx, ny = (bins, bins) if np.isscalar(bins) else bins
+    xlim, ylim = extent if extent is not None else (None, None)
+
+    xv, x_is_time = _as_float(x)
+    yv, y_is_time = _as_float(y)
+    xlim, ylim = _limits(xlim, x_is_time), _limits(ylim, y_is_time)
+    ok = ~(np.isnan(xv) | np.isnan(yv))
+    if statistic != "count":  # a count doesn't depend on the values
+        vv = _as_float(values)[0]
+        ok &= ~np.isnan(vv)
+    xv, yv = xv[ok], yv[ok]
+    value_name = value_name or statistic
+
+    if not len(xv):
+        columns = [x_name, f"{x_name}2", y_name, f"{y_name}2", value_name]
+        return pd.DataFrame(columns=columns)
+
+    xe, ye = _edges(xv, nx, xlim), _edges(yv, ny, ylim)
+    # Cell index per point; the top edge belongs to the last cell (as in np.histogram2d).
+    ix = np.clip(np.searchsorted(xe, xv, side="right") - 1, 0, nx - 1)
+    iy = np.clip(np.searchsorted(ye, yv, side="right") - 1, 0, ny - 1)
+    inside = (xv >= xe[0]) & (xv <= xe[-1]) & (yv >= ye[0]) & (yv <= ye[-1])
+    flat = (ix * ny + iy)[inside]
+
+    counts = np.bincount(flat, minlength=nx * ny)
+    cells = np.flatnonzero(counts)
+    if statistic == "count":
+        stat = counts[cells]
+    else:
+        sums = np.bincount(flat, weights=vv[ok][inside], minlength=nx * ny)[cells]
+        stat = sums if statistic == "sum" else sums / counts[cells]
+
+    cx, cy = np.divmod(cells, ny)
+    out = pd.DataFrame({x_name: xe[cx], f"{x_name}2": xe[cx + 1],
+                        y_name: ye[cy], f"{y_name}2": ye[cy + 1], value_name: stat})
+    for name, is_time in ((x_name, x_is_time), (y_name, y_is_time)):
+        if is_time:
+            for col in (name, f"{name}2"):
+                out[col] = pd.to_datetime(out[col].round().astype("int64"))
+    return out
+
+
+def binned_heatmap(df: pd.DataFrame, x: str, y: str, *, value: str | None = None,
+                   statistic: str = "count", width: int = 350, height: int = 280,
+                   cell_size: int = 4, extent=None, x_title=None, y_title=None,
+                   color_title=None) -> alt.Chart:
+    """Return a heatmap of ``df``'s points, pre-binned to the chart's pixel grid.
+
+    A drop-in for a dense ``mark_point`` scatter: the points are binned with
+    :func:`bin2d` into cells of ``cell_size`` pixels, and each non-empty cell is drawn as
+    a ``rect`` coloured by the theme's ``range.heatmap`` palette. At most
+    ``(width / cell_size) * (height / cell_size)`` marks are embedded, however many rows
+    ``df`` has.
+
+    Args:
+        df: Dataframe of points.
+        x, y: Coordinate columns (numeric or datetime).
+        value: Column to aggregate for ``"sum"``/``"mean"``.
+        statistic: ``"count"`` (default), ``"sum"`` or ``"mean"``.
+        width, height: Chart size in pixels.
+        cell_size: Cell size in pixels (1 for full pixel resolution).
+        extent: Optional ``((xmin, xmax), (ymin, ymax))`` binning extent.
+        x_title, y_title, color_title: Axis/legend titles (default: column names and
+            the statistic).
+
+    Returns:
+        alt.Chart: A ``mark_rect`` chart with its width and height set.
+    """
+    bins = (max(1, int(width // cell_size)), max(1, int(height // cell_size)))
+    value_name = statistic if statistic == "count" else f"{statistic}_{value}"
+    cells = bin2d(df[x], df[y], None if value is None else df[value], bins=bins, extent=extent,
+                  statistic=statistic, x_name=x, y_name=y, value_name=value_name)
+
+    def position(channel, col, title):
+        # Zero isn't forced into quantitative scales, so cells keep their pixel size.
+        if pd.api.types.is_datetime64_any_dtype(cells[col].dtype):
+            return channel(col, type="temporal", title=title)
+        return channel(col, type="quantitative", title=title, scale=alt.Scale(zero=False))
+
+    if color_title is None:
+        color_title = "Count" if statistic == "count" else f"{statistic.capitalize()} of {value}"
+    return (
+        alt.Chart(cells)
+        .mark_rect()
+        .encode(
+            x=position(alt.X, x, x if x_title is None else x_title),
+            x2=alt.X2(f"{x}2"),
+            y=position(alt.Y, y, y if y_title is None else y_title),
+            y2=alt.Y2(f"{y}2"),
+            color=alt.Color(value_name, type="quantitative", title=color_title,
+                            scale=alt.Scale(range="heatmap")),
+        )
+        .properties(width=width, height=height)
+    )
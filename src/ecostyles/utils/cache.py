@@ -0,0 +1,300 @@
+"""Persistent, content-addressed caches shared across processes.
+
+Everything lives under one cache directory (see :func:`default_cache_dir`), so a fleet of
+workers on one machine shares results. Writes go to a temporary file that is atomically
+renamed into place, and readers treat a vanished file as a miss, so concurrent processes
+need no lock to share a cache safely. Live-fetched indicator values go to a SQLite database
+(:class:`IndicatorCache`) in write-ahead-log mode, which handles concurrent readers and
+writers itself.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def default_cache_dir(*parts: str) -> Path:
+    """Return the ecostyles cache directory (or a subdirectory of it), creating it.
+
+    ``$ECOSTYLES_CACHE_DIR`` wins; otherwise ``$XDG_CACHE_HOME/ecostyles``, falling back to
+    ``~/.cache/ecostyles``.
+    """
+    root = os.environ.get("ECOSTYLES_CACHE_DIR")
+    if not root:
+        xdg = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        root = os.path.join(xdg, "ecostyles")
+    path = Path(root, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def atomic_write(path, data: bytes) -> None:
+    """Write ``data`` to ``path`` via a temporary file and an atomic rename."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path, timeout: float = 30.0, stale: float = 60.0):
+    """Hold an exclusive, cross-process lock on ``path`` (via a ``<path>.lock`` file).
+
+    For short read-modify-write sections, e.g. updating a shared manifest. A lock file
+    older than ``stale`` seconds is assumed to be left over from a crashed process and is
+    broken. Raises TimeoutError if the lock can't be taken within ``timeout`` seconds.
+    """
+    lock = f"{os.fspath(path)}.lock"
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > stale:
+                    os.unlink(lock)
+                    continue
+            except FileNotFoundError:
+                continue  # released meanwhile: try again straight away
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"timed out waiting for {lock}") from None
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        try:
+            os.unlink(lock)
+        except FileNotFoundError:
+            pass
+
+
+class RenderCache:
+    """Size-bounded, on-disk LRU cache of rendered chart outputs (PNG/SVG/PDF bytes).
+
+    Entries are keyed by :meth:`key`, a hash of everything that determines the rendered
+    bytes: the spec text, the output format and scale, the vl-convert version and the
+    registered fonts. Recency is tracked with file mtimes (bumped on every hit), and once
+    the cache outgrows ``max_bytes`` the least recently used entries are evicted.
+
+    Args:
+        directory: Where to keep entries (default: ``default_cache_dir("renders")``).
+        max_bytes: Size budget for the cache (default 512 MiB).
+    """
+
+    def __init__(self, directory=None, max_bytes: int = 512 * 1024 ** 2) -> None:
+        self.directory = Path(directory) if directory is not None else default_cache_dir("renders")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size: int | None = None  # running estimate; other processes' writes aren't seen
+
+    def __getstate__(self) -> dict:
+        # Picklable for process pools (e.g. ``save_many``); each worker counts separately.
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(spec: str, fmt: str, scale: float | None = None) -> str:
+        """Return the cache key for rendering ``spec`` to ``fmt`` at ``scale``."""
+        import vl_convert as vlc
+        from .fonts import font_fingerprint
+
+        digest = hashlib.sha256()
+        for part in (vlc.__version__, font_fingerprint(), fmt, repr(scale)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        digest.update(spec.encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached bytes for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:  # never cached, or evicted by another process
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key``, then evict old entries if over budget."""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        atomic_write(path, data)
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data)
+        if self._size is None or self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        entries = []
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for entry in os.scandir(sub.path):
+                if entry.name.startswith("."):
+                    continue  # another process's in-flight temporary file
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:  # already evicted by a concurrent process
+                pass
+            total -= size
+        with self._lock:
+            self._size = total
+
+    @property
+    def stats(self) -> dict:
+        """Hit/miss counters for this cache instance."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class IndicatorCache:
+    """On-disk cache of live-fetched indicator values, keyed by ``(indicator, iso3, year)``.
+
+    Backed by a SQLite database in WAL mode, so many processes can read and write it at
+    once. Answers of "no data" (a None value) are cached too, with a shorter TTL, so a year
+    the World Bank hasn't published yet isn't re-requested on every call but still shows up
+    soon after it is.
+
+    Args:
+        path: Database file (default: ``default_cache_dir("worldbank")/indicators.sqlite3``,
+            resolved on first use).
+        ttl: Seconds a fetched value stays fresh (default 30 days).
+        negative_ttl: Seconds a "no data" answer stays fresh (default 1 day).
+    """
+
+    def __init__(self, path=None, *, ttl: float = 30 * 86400,
+                 negative_ttl: float = 86400) -> None:
+        self._path = os.fspath(path) if path is not None else None
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._ready = False
+
+    @property
+    def path(self) -> str:
+        if self._path is None:
+            self._path = os.fspath(default_cache_dir("worldbank") / "indicators.sqlite3")
+        return self._path
+
+    @contextmanager
+    def _connect(self):
+        """Yield a connection inside a transaction (committed on success)."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._ready:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS indicator_values ("
+                    " indicator TEXT NOT NULL, iso3 TEXT NOT NULL, year INTEGER NOT NULL,"
+                    " value REAL, fetched_at REAL NOT NULL,"
+                    " PRIMARY KEY (indicator, year, iso3)) WITHOUT ROWID")
+                self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, indicator: str, pairs, stale: bool = False) -> dict[tuple[str, int], float | None]:
+        """Return cached values for the ``(iso3, year)`` pairs that have one.
+
+        Args:
+            indicator: World Bank indicator code, e.g. ``"SP.POP.TOTL"``.
+            pairs: ``(iso3, year)`` pairs to look up.
+            stale: Also return entries past their TTL (for offline replay).
+
+        Returns:
+            ``{(iso3, year): value}`` for the pairs found; None values are cached "no data".
+        """
+        wanted = {(str(c), int(y)) for c, y in pairs}
+        if not wanted:
+            return {}
+        if not self._ready and not os.path.exists(self.path):
+            with self._lock:  # nothing cached yet; reading creates no file
+                self.misses += len(wanted)
+            return {}
+        years = sorted({y for _, y in wanted})
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT iso3, year, value, fetched_at FROM indicator_values"
+                f" WHERE indicator = ? AND year IN ({', '.join('?' * len(years))})",
+                [indicator, *years]).fetchall()
+        found = {}
+        for iso3, year, value, fetched_at in rows:
+            ttl = self.ttl if value is not None else self.negative_ttl
+            if (iso3, year) in wanted and (stale or now - fetched_at < ttl):
+                found[(iso3, year)] = value
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put(self, indicator: str, values: dict[tuple[str, int], float | None]) -> None:
+        """Store fetched ``{(iso3, year): value}`` results (None for "no data")."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO indicator_values VALUES (?, ?, ?, ?, ?)",
+                [(indicator, str(c), int(y), v, now) for (c, y), v in values.items()])
+
+    def clear(self, indicator: str | None = None) -> None:
+        """Delete cached values, for one indicator or (by default) all of them."""
+        with self._connect() as conn:
+            if indicator is None:
+                conn.execute("DELETE FROM indicator_values")
+            else:
+                conn.execute("DELETE FROM indicator_values WHERE indicator = ?", (indicator,))
+
+    @property
+    def stats(self) -> dict:
+        """Hit/miss counters (per ``(iso3, year)`` pair) for this cache instance."""
+        return {"hits": self.hits, "misses": self.misses}
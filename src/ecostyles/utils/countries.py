@@ -0,0 +1,171 @@
+"""Resolve country identifiers (names, ISO2, ISO3) to ISO3 codes, fast.
+
+``coco.convert`` builds a new converter and runs its regex matching for every value it is
+given, so converting a panel column row by row repeats the same work once per row. The
+resolver here factorises the column and resolves only the distinct values:
+
+1. from a bundled index (``data/countries/country_index.json``, built by
+   ``scripts/build_country_index.py``) of ISO2/ISO3 codes, standard names and the
+   ``country_groups`` labels — a plain dict lookup;
+2. from a bounded in-process LRU memo, optionally persisted to disk across runs;
+3. only then through a single shared ``CountryConverter``, imported on first use.
+
+Public entry point: :func:`to_iso3`. :func:`configure` adjusts the shared resolver.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from importlib import metadata, resources
+
+import numpy as np
+import pandas as pd
+
+from .cache import atomic_write, default_cache_dir, file_lock
+
+# Returned by coco for values it can't match (``not_found=None`` would echo the input).
+_NOT_FOUND = "\0not found"
+
+
+@lru_cache(maxsize=None)
+def _bundled_index() -> dict[str, str | None]:
+    """Load the precomputed ``{identifier: ISO3 or None}`` index shipped in the package."""
+    # Chained single-arg joinpath: multi-arg joinpath on a namespace-package
+    # MultiplexedPath is only supported from Python 3.12.
+    index = resources.files("ecostyles.data").joinpath("countries").joinpath("country_index.json")
+    try:
+        return json.loads(index.read_text(encoding="utf-8"))["iso3"]
+    except FileNotFoundError:
+        return {}
+
+
+class CountryResolver:
+    """Memoising, batch converter from country identifiers to ISO3.
+
+    Args:
+        cache_size: Most distinct identifiers kept in the in-process LRU memo.
+        persist: Also keep answers on disk across runs: True for the default cache file
+            (under ``default_cache_dir("countries")``), a file path, or None/False for
+            in-memory only. The file is keyed by the ``country_converter`` version.
+    """
+
+    def __init__(self, cache_size: int = 4096, persist=None) -> None:
+        self.cache_size = cache_size
+        if persist is True:
+            version = metadata.version("country_converter")
+            persist = default_cache_dir("countries") / f"iso3-coco-{version}.json"
+        self.persist_path = os.fspath(persist) if persist else None
+        self._memo: OrderedDict[str, str | None] = OrderedDict()
+        self._disk: dict[str, str | None] | None = None
+        self._converter = None
+        self._lock = threading.Lock()
+
+    def _convert(self, names: list[str]) -> list[str | None]:
+        """Run the real (regex) conversion on ``names``, all in one call."""
+        if self._converter is None:
+            import country_converter as coco  # slow import: only needed for index misses
+
+            self._converter = coco.CountryConverter()
+        out = self._converter.convert(names, to="ISO3", not_found=_NOT_FOUND)
+        if isinstance(out, str):  # coco returns a bare string for a single input
+            out = [out]
+        return [None if iso == _NOT_FOUND else iso for iso in out]
+
+    def _load_disk(self) -> dict:
+        if self._disk is None:
+            try:
+                with open(self.persist_path) as f:
+                    self._disk = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._disk = {}
+        return self._disk
+
+    def _save_disk(self, new: dict) -> None:
+        os.makedirs(os.path.dirname(self.persist_path) or ".", exist_ok=True)
+        with file_lock(self.persist_path):
+            self._disk = None  # another process may have added entries meanwhile
+            merged = {**self._load_disk(), **new}
+            atomic_write(self.persist_path, json.dumps(merged, sort_keys=True).encode())
+            self._disk = merged
+
+    def resolve(self, names) -> list[str | None]:
+        """Return the ISO3 code (or None) for each distinct name in ``names``."""
+        names = list(names)
+        index = _bundled_index()
+        found = {name: index[name] for name in names if name in index}
+        if len(found) == len(names):
+            return [found[n] for n in names]
+        with self._lock:
+            for name in names:
+                if name in found:
+                    continue
+                if name in self._memo:
+                    self._memo.move_to_end(name)
+                    found[name] = self._memo[name]
+            misses = [n for n in names if n not in found]
+            if misses and self.persist_path:
+                disk = self._load_disk()
+                found.update((n, disk[n]) for n in misses if n in disk)
+                misses = [n for n in misses if n not in found]
+            if misses:
+                converted = dict(zip(misses, self._convert(misses)))
+                found.update(converted)
+                if self.persist_path:
+                    self._save_disk(converted)
+            for name in names:
+                if name not in index:
+                    self._memo[name] = found[name]
+                    self._memo.move_to_end(name)
+            while len(self._memo) > self.cache_size:
+                self._memo.popitem(last=False)
+        return [found[n] for n in names]
+
+    def to_iso3(self, values) -> np.ndarray:
+        """Convert an array-like of identifiers to an object array of ISO3 codes.
+
+        Values are compared as strings. Each distinct value is converted once; missing
+        and unresolvable values map to None.
+        """
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object).astype(str))
+        # A trailing None catches factorize's -1 code for missing values.
+        return np.array(self.resolve(uniques) + [None], dtype=object)[codes]
+
+    def clear(self) -> None:
+        """Forget the in-process memo (the on-disk cache is kept)."""
+        with self._lock:
+            self._memo.clear()
+            self._disk = None
+
+
+_default = CountryResolver()
+
+
+def configure(cache_size: int = 4096, persist=None) -> CountryResolver:
+    """Replace the shared resolver used by ``add_colour`` and ``add_population``.
+
+    Args:
+        cache_size, persist: As for :class:`CountryResolver`; e.g.
+            ``configure(persist=True)`` to reuse conversions across runs.
+
+    Returns:
+        CountryResolver: The new shared resolver.
+    """
+    global _default
+    _default = CountryResolver(cache_size=cache_size, persist=persist)
+    return _default
+
+
+def to_iso3(values) -> np.ndarray:
+    """Convert country names / ISO2 / ISO3 codes to ISO3 with the shared resolver.
+
+    Args:
+        values: Array-like (list, Series, column) of country identifiers.
+
+    Returns:
+        Object array of ISO3 codes, None where a value couldn't be resolved.
+    """
+    return _default.to_iso3(values)
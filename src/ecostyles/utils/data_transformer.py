@@ -0,0 +1,131 @@
+"""An Altair data transformer that compacts the data embedded in chart specs.
+
+Altair's default transformer embeds DataFrames verbatim: full ISO datetimes for date-only
+data, whole numbers as ``1.0``, and columns that are entirely null. The ``"ecostyles"``
+transformer tidies each frame before it is embedded, so every saved spec is smaller
+without changing any data value. Rounding floats (e.g. ``0.30000000000000004 -> 0.3``)
+does change values, so it is opt-in: pass ``significant_digits`` or ``decimals``.
+
+``EcoStyles()`` enables it; call :func:`enable` to switch it on (or change its options)
+directly.
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import altair as alt
+import numpy as np
+import pandas as pd
+from altair.utils.data import limit_rows, to_values
+
+NAME = "ecostyles"
+
+# Largest magnitude a float64 holds exactly as an integer (JavaScript's safe-integer limit).
+_MAX_EXACT_INT = 2 ** 53
+
+
+def _round_significant(values: np.ndarray, digits: int) -> np.ndarray:
+    """Round an array of floats to ``digits`` significant digits.
+
+    Scales by an exact power of ten, rounds, and scales back, so the result is the double
+    nearest the rounded decimal and prints without noise (``0.30000000000000004 -> 0.3``).
+    """
+    out = values.copy()
+    mask = np.isfinite(values) & (values != 0)
+    v = values[mask]
+    decimals = digits - 1 - np.floor(np.log10(np.abs(v))).astype(int)
+    ok = np.abs(decimals) <= 300  # leave subnormals / extremes alone (10**d would overflow)
+    scale = 10.0 ** np.abs(np.where(ok, decimals, 0))
+    rounded = np.where(decimals >= 0, np.round(v * scale) / scale, np.round(v / scale) * scale)
+    out[mask] = np.where(ok, rounded, v)
+    return out
+
+
+def compact_dataframe(df: pd.DataFrame, *, significant_digits: int | None = None,
+                      decimals: dict | None = None) -> pd.DataFrame:
+    """Return a compacted copy of ``df`` for embedding in a chart spec.
+
+    - Columns that are entirely null are dropped.
+    - Timezone-naive datetime columns whose values all fall on midnight become
+      ``"YYYY-MM-DD"`` strings.
+    - Float columns are rounded only on request: to ``decimals[column]`` places (pick a
+      resolution to suit the axis), or to ``significant_digits`` significant digits.
+      Float columns that hold only whole numbers are emitted as integers.
+
+    Args:
+        df: Input dataframe (not mutated).
+        significant_digits: Significant digits to keep in float columns. None (the
+            default) leaves them unrounded, so no value changes.
+        decimals: Optional ``{column: decimal places}`` overrides.
+
+    Returns:
+        A new dataframe; unchanged columns share data with ``df``.
+    """
+    decimals = decimals or {}
+    out = {}
+    for name, col in df.items():
+        if len(df) and col.isna().all():
+            continue
+        if pd.api.types.is_datetime64_dtype(col.dtype):
+            valid = col.dropna()
+            if (valid == valid.dt.normalize()).all():
+                col = col.dt.strftime("%Y-%m-%d")  # NaT -> NaN, which Altair emits as null
+        elif pd.api.types.is_float_dtype(col.dtype):
+            values = col.to_numpy(dtype="float64", na_value=np.nan)
+            if name in decimals:
+                values = np.round(values, decimals[name])
+            elif significant_digits is not None:
+                values = _round_significant(values, significant_digits)
+            finite = values[np.isfinite(values)]
+            if (finite.size and np.all(finite == np.round(finite))
+                    and np.all(np.abs(finite) < _MAX_EXACT_INT)
+                    and not np.isinf(values).any()):
+                col = pd.Series(values, index=col.index).astype("Int64")
+            else:
+                col = pd.Series(values, index=col.index)
+        out[name] = col
+    return pd.DataFrame(out, index=df.index)
+
+
+def compact_data_transformer(data=None, max_rows: int | None = 50_000,
+                             significant_digits: int | None = None, decimals: dict | None = None):
+    """Altair data transformer: compact DataFrames, then embed them as inline values.
+
+    Unlike Altair's default, exceeding ``max_rows`` doesn't raise ``MaxRowsError``; it
+    warns, as a nudge towards aggregating or downsampling. Non-DataFrame data (dicts,
+    GeoJSON) passes through as Altair would embed it.
+
+    Args:
+        data: The chart data (Altair calls the transformer with it).
+        max_rows: Row budget above which a warning is emitted (None to never warn).
+        significant_digits, decimals: Opt-in float rounding; see :func:`compact_dataframe`.
+    """
+    if data is None:
+        def pipe(data, /):
+            return compact_data_transformer(data, max_rows=max_rows,
+                                            significant_digits=significant_digits,
+                                            decimals=decimals)
+        return pipe
+
+    if isinstance(data, pd.DataFrame):
+        if max_rows is not None and len(data) > max_rows:
+            warnings.warn(
+                f"Embedding {len(data):,} rows in the chart spec (budget {max_rows:,}); "
+                "consider aggregating or downsampling the data first."
+            )
+        data = compact_dataframe(data, significant_digits=significant_digits,
+                                 decimals=decimals)
+    return to_values(limit_rows(data, max_rows=None))
+
+
+def enable(**options) -> None:
+    """Make the ``"ecostyles"`` transformer Altair's active data transformer.
+
+    Keyword arguments are passed to :func:`compact_data_transformer` (``max_rows``,
+    ``significant_digits``, ``decimals``).
+    """
+    alt.data_transformers.enable(NAME, **options)
+
+
+alt.data_transformers.register(NAME, compact_data_transformer)
@@ -1,10 +1,28 @@
 """Utility functions for file operations with Altair charts."""
 
+import csv
+import hashlib
+import io
 import os
 import re
 import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+
 import vl_convert as vlc
 import altair as alt
+from altair.utils import update_nested
+
+from ..themes import get_theme
+from .cache import RenderCache, atomic_write, file_lock
+from .downsample import downsample_spec
+from .fonts import setup_fonts
+
+try:  # optional fast JSON backend
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson isn't installed
+    orjson = None
 
 # Matches an exact-midnight time component of an ISO datetime, e.g. the "T00:00:00"
 # (optionally with fractional seconds and/or a trailing Z) in "2020-01-01T00:00:00".
@@ -18,10 +36,26 @@ def _strip_midnight_timestamps(spec_json: str) -> str:
     JSON with text that carries no information for date-level charts. Where the time is
     exactly midnight we drop it, leaving ``"2020-01-01"``. Non-midnight times (which do
     carry information) are left untouched.
+
+    This works on an already-serialised spec; ``save_chart`` strips dates on the spec's
+    data values before serialising instead, which avoids scanning the whole string.
     """
     return _MIDNIGHT_RE.sub("", spec_json)
 
 
+# A whole ISO datetime value that falls exactly on midnight, e.g. "2020-01-01T00:00:00".
+_MIDNIGHT_VALUE_RE = re.compile(r"\d{4}-\d{2}-\d{2}T00:00:00(?:\.0+)?Z?")
+
+
+def _set_dimensions(spec: dict, width, height) -> dict:
+    """Set ``width``/``height`` on a spec dict in place (falsy values leave them unset)."""
+    if width:
+        spec['width'] = width
+    if height:
+        spec['height'] = height
+    return spec
+
+
 def modify_dimensions(chart: alt.Chart, width: int, height: int) -> str:
     """Modify the width and height of a chart.
 
@@ -33,25 +67,571 @@ def modify_dimensions(chart: alt.Chart, width: int, height: int) -> str:
     Returns:
         str: Modified Vega-Lite specification as JSON
     """
-    chart_dict = chart.to_dict()
-    if width:
-        chart_dict['width'] = width
-    if height:
-        chart_dict['height'] = height
+    return json.dumps(_set_dimensions(chart.to_dict(), width, height), indent=2)
+
+
+def _inline_data_slots(spec: dict):
+    """Yield ``(container, key)`` for every inline list of records in a spec.
+
+    Covers the top-level ``datasets`` and any ``data: {"values": [...]}`` in nested views
+    or transforms, so callers can swap in a transformed list via ``container[key] = ...``.
+    Records lists can be the chart's own objects (Altair doesn't copy them), so replace
+    them rather than mutating them in place.
+    """
+    for name, values in spec.get('datasets', {}).items():
+        if isinstance(values, list):
+            yield spec['datasets'], name
+    stack = [spec]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            data = node.get('data')
+            if isinstance(data, dict) and isinstance(data.get('values'), list):
+                yield data, 'values'
+            stack.extend(v for k, v in node.items()
+                         if k not in ('data', 'datasets') and isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+
+
+def _strip_midnight_values(records: list) -> list:
+    """Return ``records`` with exact-midnight ISO datetime values cut to their date.
+
+    Every value is decided on its own, so leading nulls or earlier non-midnight times in
+    a column don't stop later dates from being stripped. A slice comparison screens out
+    other strings before the regex runs. Unchanged input is returned as is (not copied).
+    """
+    changed_any = False
+
+    def strip(record):
+        nonlocal changed_any
+        if not isinstance(record, dict):
+            return record
+        changed = {k: v[:10] for k, v in record.items()
+                   if isinstance(v, str) and v[10:19] == "T00:00:00"
+                   and _MIDNIGHT_VALUE_RE.fullmatch(v)}
+        if not changed:
+            return record
+        changed_any = True
+        return {**record, **changed}
+
+    out = [strip(r) for r in records]
+    return out if changed_any else records
+
+
+# Keys holding child views (their own encodings/data) rather than properties of this view.
+_CHILD_VIEW_KEYS = ("layer", "hconcat", "vconcat", "concat", "spec")
+# Keys whose contents never reference data fields.
+_NON_FIELD_KEYS = ("data", "datasets", "config", "$schema", "usermeta")
+# `datum.field` / `datum["field"]` references inside Vega expression strings.
+_DATUM_RE = re.compile(r"""datum\s*(?:\.\s*([A-Za-z_$][\w$]*)|\[\s*(['"])(.*?)\2\s*\])""")
+# Field path separators (`a.b`, `a[0]`) that aren't backslash-escaped.
+_FIELD_PATH_RE = re.compile(r"(?<!\\)[.\[]")
+
+
+def _collect_names(node, names: set) -> None:
+    """Add every string that could name a field in this view (not its child views).
+
+    Deliberately over-inclusive: each string value is taken as a possible field name,
+    along with the root of a field path (``"a.b" -> "a"``) and any ``datum.x`` reference in
+    expressions. A column is only pruned if nothing in the view could refer to it.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in _NON_FIELD_KEYS or key in _CHILD_VIEW_KEYS:
+                continue
+            _collect_names(value, names)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_names(value, names)
+    elif isinstance(node, str):
+        names.add(node)
+        names.add(node.replace("\\", ""))
+        names.add(_FIELD_PATH_RE.split(node, 1)[0].replace("\\", ""))
+        for match in _DATUM_RE.finditer(node):
+            names.add(match.group(1) or match.group(3))
+
+
+def _shows_every_field(node: dict) -> bool:
+    """True if a view or mark config shows all fields (``tooltip: true`` / content data)."""
+    mark = node.get("mark")
+    for tooltip in (mark.get("tooltip") if isinstance(mark, dict) else None,
+                    node.get("tooltip")):
+        if tooltip is True or (isinstance(tooltip, dict) and tooltip.get("content") == "data"):
+            return True
+    return False
+
+
+def _data_key(data):
+    """Identify a view's data source: a named dataset or a specific inline values list."""
+    if not isinstance(data, dict):
+        return None
+    if "name" in data:
+        return ("name", data["name"])
+    if isinstance(data.get("values"), list):
+        return ("inline", id(data))
+    return None
+
+
+def _data_usage(spec: dict) -> dict:
+    """Map each data source in a spec to the names its views could reference.
+
+    A value of None means "every field": the source feeds a view that shows all fields,
+    or is used somewhere other than as a view's data (e.g. a ``lookup`` transform).
+    Child views inherit their parent's data and its references (e.g. a layer's shared
+    encoding), mirroring Vega-Lite's own inheritance.
+    """
+    usage: dict = {}
+    config = spec.get("config", {})
+    shows_all = any(_shows_every_field({"mark": v}) for v in config.values() if isinstance(v, dict))
+
+    def walk(node, inherited_key, inherited_names):
+        key = _data_key(node.get("data")) or inherited_key
+        names = set(inherited_names)
+        _collect_names(node, names)
+        for transform in node.get("transform", []):
+            lookup_data = transform.get("from", {}).get("data") if isinstance(transform, dict) else None
+            if _data_key(lookup_data):
+                usage[_data_key(lookup_data)] = None
+        if key is not None and usage.get(key, set()) is not None:
+            usage[key] = None if (shows_all or _shows_every_field(node)) else usage.get(key, set()) | names
+        for child_key in _CHILD_VIEW_KEYS:
+            children = node.get(child_key)
+            for child in children if isinstance(children, list) else [children]:
+                if isinstance(child, dict):
+                    walk(child, key, names)
+
+    walk(spec, None, set())
+    return usage
+
+
+def prune_unused_columns(spec: dict) -> dict:
+    """Drop inline-data columns that no view of the spec references.
+
+    Works out which fields each view's encodings, transforms, tooltips, params and layers
+    could use (conservatively; see ``_collect_names``) and strips the other columns from
+    the inline datasets those views draw on. Charts built from wide DataFrames often embed
+    many times more data than they render. Data shown wholesale (``tooltip: true``) or
+    used by a ``lookup`` is left intact, as is data loaded from a URL.
 
-    return json.dumps(chart_dict, indent=2)
+    Args:
+        spec: A Vega-Lite spec dict, e.g. from ``chart.to_dict()``. Updated in place
+            (records lists are replaced, never mutated, as they may be the chart's own).
+
+    Returns:
+        dict: The same spec, for chaining.
+    """
+    usage = _data_usage(spec)
+    for container, slot in _inline_data_slots(spec):
+        key = ("name", slot) if container is spec.get("datasets") else ("inline", id(container))
+        names = usage.get(key)
+        records = container[slot]
+        if names is None or not all(isinstance(r, dict) for r in records):
+            continue  # unused here (leave as is), needs every field, or not tabular
+        columns = set().union(*records) if records else set()
+        if columns <= names:
+            continue
+        keep = [c for c in dict.fromkeys(k for r in records[:1] for k in r) if c in names]
+        keep += sorted((columns & names) - set(keep))
+        container[slot] = [{k: r[k] for k in keep if k in r} for r in records]
+    return spec
+
+
+def _hash_records(records: list) -> str:
+    """Stable content hash of a records list (key order within records doesn't matter)."""
+    if orjson is not None:
+        blob = orjson.dumps(records, option=orjson.OPT_SORT_KEYS)
+    else:
+        blob = json.dumps(records, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _map_data_refs(node, fn) -> None:
+    """Replace every ``data: {"name": ...}`` (views and lookups) with ``fn(data)``.
+
+    ``fn`` returns the replacement dict, or None to leave that reference alone.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "datasets":
+                continue
+            if key == "data" and isinstance(value, dict) and "name" in value:
+                replacement = fn(value)
+                if replacement is not None:
+                    node[key] = replacement
+            else:
+                _map_data_refs(value, fn)
+    elif isinstance(node, list):
+        for value in node:
+            _map_data_refs(value, fn)
 
 
-def _spec_for_save(chart, width, height, strip_timestamps) -> str:
+def _rename_data_refs(node, mapping: dict) -> None:
+    """Point every ``data: {"name": old}`` reference at ``mapping[old]``."""
+    _map_data_refs(node, lambda data: ({**data, "name": mapping[data["name"]]}
+                                       if data["name"] in mapping else None))
+
+
+def _is_column_subset(small: list, big: list) -> bool:
+    """True if ``small`` is ``big`` restricted to some of its columns, row for row."""
+    if len(small) != len(big) or not all(isinstance(r, dict) for r in small + big):
+        return False
+    columns = set().union(*small) if small else set()
+    if not columns < (set().union(*big) if big else set()):
+        return False
+    return all(all(k in b and b[k] == v for k, v in a.items()) for a, b in zip(small, big))
+
+
+def dedupe_datasets(spec: dict, merge_subsets: bool = True) -> dict:
+    """Store each distinct inline dataset once, referenced by name from every view.
+
+    Inline ``data.values`` are hoisted into the top-level ``datasets``; datasets with
+    identical content (e.g. the same frame in several layers or concatenated views, or
+    frames that only differed in columns pruned away) collapse into one entry. With
+    ``merge_subsets``, a dataset that is exactly another one minus some columns is
+    replaced by the larger one, unless a view shows its data wholesale (where the extra
+    columns would appear). Smaller JSON, and less data for Vega to parse.
+
+    Args:
+        spec: A Vega-Lite spec dict. Updated in place.
+        merge_subsets: Also merge datasets that are strict column subsets of another.
+
+    Returns:
+        dict: The same spec, for chaining.
+    """
+    datasets = spec.setdefault("datasets", {})
+
+    # Hoist inline values into named datasets (named by content, like Altair's own).
+    for container, slot in list(_inline_data_slots(spec)):
+        if container is datasets or "name" in container:
+            continue
+        name = f"data-{_hash_records(container[slot])[:32]}"
+        datasets.setdefault(name, container[slot])
+        del container[slot]
+        container["name"] = name
+
+    # Collapse identical datasets onto the first name seen.
+    canonical: dict = {}
+    mapping: dict = {}
+    for name, values in datasets.items():
+        first = canonical.setdefault(_hash_records(values), name)
+        if first != name:
+            mapping[name] = first
+
+    if merge_subsets:
+        _rename_data_refs(spec, mapping)
+        usage = _data_usage(spec)
+        distinct = [n for n in datasets if n not in mapping]
+        for small in distinct:
+            if usage.get(("name", small), set()) is None:
+                continue  # shown wholesale or used by a lookup: extra columns would leak
+            for big in distinct:
+                if big != small and big not in mapping and _is_column_subset(datasets[small],
+                                                                             datasets[big]):
+                    mapping[small] = big
+                    break
+        # Resolve chains (a -> b -> c) so every reference lands on a surviving dataset.
+        for name in mapping:
+            while mapping[name] in mapping:
+                mapping[name] = mapping[mapping[name]]
+
+    _rename_data_refs(spec, mapping)
+    for name in mapping:
+        del datasets[name]
+    if not datasets:
+        del spec["datasets"]
+    return spec
+
+
+# Data file formats for externalised datasets: file extension and Vega-Lite format type.
+_DATA_FORMATS = {"json": "json", "csv": "csv", "arrow": "arrow"}
+
+
+def _csv_cell(value):
+    """CSV text for a value: empty reads back as null, booleans as Vega parses them."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _encode_records(records: list, fmt: str) -> bytes | None:
+    """Serialise a records list as a data file, or None if ``fmt`` can't represent it."""
+    if fmt == "json":
+        return _dumps(records).encode()
+    if not all(isinstance(r, dict) for r in records):
+        return None
+    if fmt == "csv":
+        columns = list(dict.fromkeys(k for r in records for k in r))
+        if any(isinstance(v, (dict, list)) for r in records for v in r.values()):
+            return None  # nested values have no CSV form
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(columns)
+        for r in records:
+            writer.writerow(_csv_cell(r.get(k)) for k in columns)
+        return out.getvalue().encode()
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("data_format='arrow' requires pyarrow (pip install pyarrow)") from None
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pylist(records)
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _update_manifest(data_dir: str, entries: dict, chart) -> None:
+    """Record data files (and which chart uses them) in ``data_dir/manifest.json``."""
+    manifest_path = os.path.join(data_dir, "manifest.json")
+    with file_lock(manifest_path):
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = {"files": {}}
+        files = manifest.setdefault("files", {})
+        for filename, entry in entries.items():
+            record = files.setdefault(filename, {**entry, "charts": []})
+            if chart is not None and chart not in record["charts"]:
+                record["charts"] = sorted([*record["charts"], chart])
+        atomic_write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+
+def externalise_data(spec: dict, data_dir, base_url: str = "", fmt: str = "json", *,
+                     chart=None, manifest: bool = True) -> list[str]:
+    """Move a spec's inline datasets into content-addressed data files referenced by URL.
+
+    Each distinct dataset is written to ``data_dir/<hash>.<fmt>``, named by its content,
+    and every view using it gets ``data: {"url": base_url + filename}`` instead. Charts
+    that share data (the same recessions frame, the same indicator panel) point at one
+    file that browsers can cache across pages, and re-publishing unchanged data writes
+    nothing. Files are listed in ``data_dir/manifest.json`` with the charts using them.
+
+    Args:
+        spec: A Vega-Lite spec dict. Updated in place.
+        data_dir: Directory for the data files (created if missing).
+        base_url: Prefix for the data URLs, e.g. ``"/data/"`` or a CDN URL.
+        fmt: ``"json"`` (default), ``"csv"`` or ``"arrow"``. Arrow needs pyarrow to write
+            and a Vega loader with Arrow support to read. Datasets CSV can't represent
+            (nested values) are written as JSON instead.
+        chart: Optional chart name to record against the files in the manifest.
+        manifest: False to skip updating the manifest.
+
+    Returns:
+        list[str]: The data file names the spec now references.
+    """
+    if fmt not in _DATA_FORMATS:
+        raise ValueError(f"fmt must be one of {list(_DATA_FORMATS)}")
+    os.makedirs(data_dir, exist_ok=True)
+    dedupe_datasets(spec, merge_subsets=False)  # hoist inline values; one file per dataset
+
+    urls: dict = {}
+    entries: dict = {}
+    for name, records in spec.get("datasets", {}).items():
+        file_fmt, blob = fmt, _encode_records(records, fmt)
+        if blob is None:
+            file_fmt, blob = "json", _encode_records(records, "json")
+        filename = f"{hashlib.sha256(blob).hexdigest()[:20]}.{file_fmt}"
+        file_path = os.path.join(data_dir, filename)
+        if not os.path.exists(file_path):  # content-addressed: existing means identical
+            atomic_write(file_path, blob)
+        urls[name] = {"url": f"{base_url}{filename}", "format": {"type": _DATA_FORMATS[file_fmt]}}
+        entries[filename] = {"format": file_fmt, "bytes": len(blob)}
+
+    def to_url(data):
+        if data["name"] not in urls:
+            return None
+        return {**urls[data["name"]], **{k: v for k, v in data.items() if k not in ("name", "format")}}
+
+    _map_data_refs(spec, to_url)
+    spec.pop("datasets", None)
+    if manifest and entries:
+        _update_manifest(os.fspath(data_dir), entries, chart)
+    return list(entries)
+
+
+def themed(chart, theme: str, dark_mode: bool = False) -> dict:
+    """Return a chart's spec dict styled with an ecostyles theme, leaving global state alone.
+
+    ``register_and_enable_theme`` changes Altair's process-wide active theme, so threads
+    rendering different themes at once can pick up each other's config. Here the theme is
+    merged into this one spec instead: its config (cached per ``(theme, dark_mode)``) is the
+    base and the chart's own ``configure_*`` settings override it, as with a registered
+    theme. The globally active theme's config is discarded.
+
+    Args:
+        chart: Altair chart object
+        theme: 'article', 'cotd' or 'newsletter'
+        dark_mode: Dark-mode variant (currently only 'cotd' honours this)
+
+    Returns:
+        dict: The Vega-Lite spec, with the theme applied.
+    """
+    config = get_theme(theme, dark_mode)["config"]
+    spec = chart.to_dict()
+    own = getattr(chart, "config", alt.Undefined)
+    own = {} if own is alt.Undefined else own.to_dict()
+    spec["config"] = update_nested(config, own, copy=True)
+    return spec
+
+
+def _spec_dict_for_save(chart, width, height, strip_timestamps, *, prune_columns=False,
+                        dedupe_data=False, downsample=False, theme=None,
+                        dark_mode=False) -> dict:
+    """Return the chart's spec dict with dimensions applied and midnight dates stripped.
+
+    With ``theme``, the spec is styled via :func:`themed` rather than the active theme.
+    Optional optimisations run in order: column pruning, downsampling, date stripping
+    (which can make more datasets identical), then dataset deduplication.
+    """
+    spec = themed(chart, theme, dark_mode) if theme else chart.to_dict()
+    spec = _set_dimensions(spec, width, height)
+    if prune_columns:
+        prune_unused_columns(spec)
+    if downsample:
+        downsample_spec(spec, width, method="lttb" if downsample is True else downsample)
+    if strip_timestamps:
+        for container, key in _inline_data_slots(spec):
+            container[key] = _strip_midnight_values(container[key])
+    if dedupe_data:
+        dedupe_datasets(spec)
+    return spec
+
+
+def _dumps(spec: dict) -> str:
+    """Serialise a spec dict to minified JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(spec).decode()
+    return json.dumps(spec, separators=(",", ":"))
+
+
+def dump_spec(chart, fp, width=None, height=None, strip_timestamps=True, **options) -> None:
+    """Write a chart's minified Vega-Lite spec straight to an open file handle.
+
+    This is the same spec ``save_chart`` saves, produced in a single serialisation pass:
+    dimensions and date stripping are applied to the spec dict, and the JSON is streamed
+    to ``fp`` (binary or text) without building intermediate strings. orjson is used when
+    installed (it writes UTF-8 directly rather than ``\\u`` escapes).
+
+    Args:
+        chart: Altair chart object
+        fp: File object opened for writing, in binary or text mode.
+        width, height: Optional dimensions in pixels (falsy leaves them unset).
+        strip_timestamps: True (default) to cut exact-midnight datetimes to dates.
+        **options: Spec optimisations, as for ``save_chart`` (e.g. ``prune_columns``).
+    """
+    spec = _spec_dict_for_save(chart, width, height, strip_timestamps, **options)
+    binary = not isinstance(fp, io.TextIOBase)
+    if orjson is not None:
+        data = orjson.dumps(spec)
+        fp.write(data if binary else data.decode())
+    elif binary:
+        for chunk in json.JSONEncoder(separators=(",", ":")).iterencode(spec):
+            fp.write(chunk.encode())
+    else:
+        json.dump(spec, fp, separators=(",", ":"))
+
+
+def _spec_for_save(chart, width, height, strip_timestamps, **options) -> str:
     """Serialise a chart to a minified spec string, optionally stripping midnight times."""
-    spec = json.dumps(json.loads(modify_dimensions(chart, width, height)),
-                      separators=(",", ":"))
-    return _strip_midnight_timestamps(spec) if strip_timestamps else spec
+    return _dumps(_spec_dict_for_save(chart, width, height, strip_timestamps, **options))
+
+
+def _render(spec: str, scales=(4,), svg=False, pdf=False) -> dict:
+    """Render a Vega-Lite spec to every requested format from a single compilation.
+
+    The spec is compiled to Vega once and the Vega dataflow runs once, producing an SVG;
+    each PNG scale and the PDF are rasterised from that SVG rather than re-rendered.
+    (vl-convert's own ``vega_to_png`` renders via the same SVG, so the pixels match.)
+
+    Returns:
+        dict: ``{"png": {scale: bytes}, "svg": str, "pdf": bytes}``, with ``"svg"`` and
+        ``"pdf"`` present only when requested.
+    """
+    svg_text = vlc.vega_to_svg(vlc.vegalite_to_vega(spec))
+    outputs = {"png": {scale: vlc.svg_to_png(svg_text, scale=scale) for scale in scales}}
+    if svg:
+        outputs["svg"] = svg_text
+    if pdf:
+        outputs["pdf"] = vlc.svg_to_pdf(svg_text)
+    return outputs
+
+
+# Shared RenderCache instances, so hit/miss counters accumulate across save_chart calls.
+_RENDER_CACHES: dict = {}
+
+
+def _resolve_cache(cache) -> RenderCache | None:
+    """Turn save_chart's ``cache`` argument into a RenderCache (or None for no caching)."""
+    if cache is None or cache is False:
+        return None
+    if isinstance(cache, RenderCache):
+        return cache
+    directory = None if cache is True else os.fspath(cache)
+    if directory not in _RENDER_CACHES:
+        _RENDER_CACHES[directory] = RenderCache(directory)
+    return _RENDER_CACHES[directory]
+
+
+def _render_cached(spec: str, scales=(4,), svg=False, pdf=False, cache=None) -> dict:
+    """Like ``_render``, but serve outputs from ``cache`` and only render on a miss."""
+    if cache is None:
+        return _render(spec, scales, svg=svg, pdf=pdf)
+
+    wanted = [("png", s) for s in scales] + [("svg", None)] * svg + [("pdf", None)] * pdf
+    keys = {item: cache.key(spec, *item) for item in wanted}
+    found = {item: cache.get(key) for item, key in keys.items()}
+
+    if any(data is None for data in found.values()):
+        rendered = _render(spec, scales, svg=svg, pdf=pdf)
+        for (fmt, s), key in keys.items():
+            if found[(fmt, s)] is None:
+                data = rendered["png"][s] if fmt == "png" else rendered[fmt]
+                found[(fmt, s)] = data.encode() if fmt == "svg" else data
+                cache.put(key, found[(fmt, s)])
+
+    outputs = {"png": {s: found[("png", s)] for s in scales}}
+    if svg:
+        outputs["svg"] = found[("svg", None)].decode()
+    if pdf:
+        outputs["pdf"] = found[("pdf", None)]
+    return outputs
+
+
+def _write_if_changed(path: str, data) -> bool:
+    """Write ``data`` (str or bytes) to ``path`` unless the file already holds exactly it.
+
+    Leaving identical files untouched keeps their mtimes stable, so mtime-based deploys
+    don't republish charts that didn't change. Returns True if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
 
 
 def save_chart(chart, path="", name=None, width=350, height=280, svg=False, source=None,
-               strip_timestamps=True):
-    """Save an Altair chart as minified JSON and PNG (and optionally SVG).
+               strip_timestamps=True, pdf=False, scale=4, cache=None, prune_columns=False,
+               dedupe_data=False, data_dir=None, data_url=None, data_format="json",
+               downsample=False, theme=None, dark_mode=False):
+    """Save an Altair chart as minified JSON and PNG (and optionally SVG/PDF).
+
+    Every output of a spec comes from one Vega compilation and render (see ``_render``),
+    so asking for SVG, PDF or extra PNG scales costs rasterisation only. The ``source``
+    variant is a different spec, so it is rendered once more. With ``cache``, outputs whose
+    spec was rendered before are served from disk instead. Files whose content hasn't
+    changed are never rewritten, so their mtimes stay put.
 
     Args:
         chart: Altair chart object
@@ -66,38 +646,184 @@ def save_chart(chart, path="", name=None, width=350, height=280, svg=False, sour
             additional PNG is written with '_source' appended to the name.
         strip_timestamps: True (default) to drop exact-midnight ``T00:00:00`` time
             components from inline date data, keeping the JSON compact.
+        pdf: True to also save a PDF file.
+        scale: PNG scale factor (default 4), or a sequence of them. The first scale is
+            written to ``name.png`` and each further one to ``name@<scale>x.png``.
+        cache: Optional render cache: True for the default on-disk cache, a directory
+            path, or a :class:`~ecostyles.utils.cache.RenderCache`. Entries are keyed by
+            the saved spec, format, scale, vl-convert version and fonts.
+        prune_columns: True to drop inline-data columns that no encoding, transform or
+            tooltip references (see :func:`prune_unused_columns`).
+        dedupe_data: True to store each distinct inline dataset once, merging datasets
+            that are column subsets of another (see :func:`dedupe_datasets`).
+        data_dir: Optional directory to move the chart's inline data into, as
+            content-addressed files that the saved JSON references by URL (see
+            :func:`externalise_data`). Rendered images still use the inline data.
+        data_url: Base URL for those files (default: their path relative to ``path``).
+        data_format: ``"json"`` (default), ``"csv"`` or ``"arrow"`` for the data files.
+        downsample: True (or ``"lttb"``) to thin long line/area series to about two points
+            per horizontal pixel of ``width``, per colour/detail series; ``"minmax"`` keeps
+            each pixel bucket's extremes instead (see :func:`downsample_spec`).
+        theme: Optional ecostyles theme name ('article', 'cotd', 'newsletter') to style
+            this chart with, instead of Altair's active theme. Touches no global state,
+            so threads can save charts in different themes at once (see :func:`themed`).
+        dark_mode: With ``theme``, use its dark-mode variant.
 
     Returns:
         None
     """
     if name is None:
         raise ValueError("save_chart requires a 'name' for the output files")
+    scales = list(scale) if isinstance(scale, (list, tuple)) else [scale]
 
     # Only create a directory when an explicit, non-empty path is given.
     if path:
         os.makedirs(path, exist_ok=True)
 
     # One minified (and optionally timestamp-stripped) spec, reused for every output.
-    spec = _spec_for_save(chart, width, height, strip_timestamps)
+    options = {"prune_columns": prune_columns, "dedupe_data": dedupe_data,
+               "downsample": downsample, "theme": theme, "dark_mode": dark_mode}
+    spec_dict = _spec_dict_for_save(chart, width, height, strip_timestamps, **options)
+    spec = _dumps(spec_dict)
+
+    cache = _resolve_cache(cache)
 
-    json_path = os.path.join(path, f'{name}.json')
-    with open(json_path, 'w') as f:
-        f.write(spec)
+    if data_dir is not None:
+        # Only the published JSON points at data files; renders need the data inline.
+        if data_url is None:
+            data_url = os.path.relpath(data_dir, path or os.curdir).replace(os.sep, "/") + "/"
+        externalise_data(spec_dict, data_dir, data_url, data_format, chart=name)
+        _write_if_changed(os.path.join(path, f'{name}.json'), _dumps(spec_dict))
+    else:
+        _write_if_changed(os.path.join(path, f'{name}.json'), spec)
 
-    png_path = os.path.join(path, f'{name}.png')
-    with open(png_path, "wb") as f:
-        f.write(vlc.vegalite_to_png(vl_spec=spec, scale=4))
+    outputs = _render_cached(spec, scales, svg=svg, pdf=pdf, cache=cache)
+    for i, s in enumerate(scales):
+        png_path = os.path.join(path, f'{name}.png' if i == 0 else f'{name}@{s:g}x.png')
+        _write_if_changed(png_path, outputs["png"][s])
 
     if svg:
-        svg_path = os.path.join(path, f'{name}.svg')
-        with open(svg_path, "w") as f:
-            f.write(vlc.vegalite_to_svg(vl_spec=spec))
+        _write_if_changed(os.path.join(path, f'{name}.svg'), outputs["svg"])
+
+    if pdf:
+        _write_if_changed(os.path.join(path, f'{name}.pdf'), outputs["pdf"])
 
     if source:
-        sourced_spec = _spec_for_save(add_source(chart, source), width, height, strip_timestamps)
-        png_path = os.path.join(path, f'{name}_source.png')
-        with open(png_path, "wb") as f:
-            f.write(vlc.vegalite_to_png(vl_spec=sourced_spec, scale=4))
+        sourced_spec = _spec_for_save(add_source(chart, source), width, height, strip_timestamps,
+                                      **options)
+        sourced = _render_cached(sourced_spec, scales[:1], cache=cache)
+        _write_if_changed(os.path.join(path, f'{name}_source.png'), sourced["png"][scales[0]])
+
+
+class SaveResult(NamedTuple):
+    """Outcome of one :func:`save_many` job: where it was saved, or why it failed."""
+
+    name: str | None
+    path: str
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _init_worker(theme_name, theme_config, transformer=None, transformer_options=None) -> None:
+    """Per-worker setup for :func:`save_many`: register fonts, replay the caller's theme
+    and data transformer.
+
+    Worker processes don't share the parent's Altair registries (and a registered theme
+    is usually an unpicklable closure), so the parent passes the resolved theme config
+    dict, and the active data transformer's name and options.
+    """
+    from . import data_transformer  # registers the "ecostyles" transformer
+
+    setup_fonts()
+    if theme_name is not None:
+        alt.theme.register(theme_name, enable=True)(lambda: theme_config)
+    if transformer in alt.data_transformers.names():
+        alt.data_transformers.enable(transformer, **(transformer_options or {}))
+
+
+def _save_job(job, defaults) -> SaveResult:
+    """Run one ``(chart, path, name[, options])`` job, capturing rather than raising errors."""
+    chart, path, name, *rest = job
+    options = {**defaults, **(rest[0] if rest and rest[0] else {})}
+    try:
+        save_chart(chart, path, name, **options)
+    except Exception as exc:  # noqa: BLE001 - reported per job, the batch carries on
+        return SaveResult(name, path, exc)
+    return SaveResult(name, path)
+
+
+def save_many(jobs, *, executor="process", max_workers=None, **defaults) -> list[SaveResult]:
+    """Save many charts in parallel, fanning :func:`save_chart` calls out over a worker pool.
+
+    Each job is a ``(chart, path, name)`` or ``(chart, path, name, options)`` tuple, where
+    ``options`` is a dict of extra :func:`save_chart` keyword arguments for that job. Fonts
+    are registered once per worker, and in process pools the active Altair theme and data
+    transformer are replayed in each worker so the output matches a serial ``save_chart``
+    loop.
+
+    A failing job doesn't stop the batch: its exception is returned in that job's result.
+
+    Process pools use the ``spawn`` start method, so each worker imports the calling
+    script afresh. A script that calls ``save_many`` at module level must do so under an
+    ``if __name__ == "__main__":`` guard, or every worker re-runs it. Put the work in a
+    ``main()`` and guard the call, as ``scripts/render_themes.py`` does::
+
+        def main():
+            save_many(jobs)
+
+        if __name__ == "__main__":
+            main()
+
+    Args:
+        jobs: Iterable of ``(chart, path, name[, options])`` tuples.
+        executor: ``"process"`` (default; rendering is CPU-bound) or ``"thread"``.
+        max_workers: Pool size (default: the number of CPUs). ``1`` saves serially in the
+            calling process, which is handy for debugging.
+        **defaults: ``save_chart`` keyword arguments applied to every job (per-job
+            ``options`` take precedence), e.g. ``svg=True``.
+
+    Returns:
+        list[SaveResult]: One result per job, in input order. Check ``result.ok`` /
+        ``result.error``.
+    """
+    if executor not in ("process", "thread"):
+        raise ValueError("executor must be 'process' or 'thread'")
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    if max_workers == 1:
+        setup_fonts()
+        return [_save_job(job, defaults) for job in jobs]
+
+    if executor == "thread":
+        setup_fonts()  # vl-convert's font registry is process-wide, so once is enough
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        theme_name = alt.theme.active
+        theme_config = alt.theme.get()() if theme_name not in (None, "default") else None
+        # Spawn, not fork: a forked child inherits vl-convert's runtime without its worker
+        # thread, and its first render blocks forever.
+        pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(theme_name if theme_config is not None else None, theme_config,
+                      alt.data_transformers.active, dict(alt.data_transformers.options)),
+        )
+
+    with pool:
+        futures = [pool.submit(_save_job, job, defaults) for job in jobs]
+        results = []
+        for job, future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except Exception as exc:  # noqa: BLE001 - e.g. an unpicklable chart or a dead worker
+                results.append(SaveResult(job[2], job[1], exc))
+    return results
 
 
 def add_source(chart: alt.Chart, source, *, font_size: int = 10,
@@ -1,44 +1,88 @@
 """Font utilities for registering and managing custom fonts."""
 
+import atexit
+import hashlib
+import os
+import shutil
+import threading
+from functools import lru_cache
 from pathlib import Path
 from tempfile import mkdtemp
 from importlib import resources    # stdlib (Python >= 3.10 handles namespace packages)
-import shutil
-import vl_convert as vlc
+
+from .cache import atomic_write, default_cache_dir
 
 _FONT_EXTS = {".ttf", ".otf"}
 
-def setup_fonts():
-    """
-    Set up the Circular Std fonts for use with vl-convert.
-    
-    This function:
-    1. Creates a temporary directory for fonts
-    2. Copies the package's font files to the temporary directory
-    3. Registers the font directory with vl-convert
-    
-    Returns:
-        str: Path to the temporary font directory
-    """
-    # Create a temporary directory for fonts
-    tmp_dir = Path(mkdtemp(prefix="ecostyles_fonts_"))
+# vl-convert's font registry is process-wide, so registering once per process is enough.
+_registered: Path | None = None
+_register_lock = threading.Lock()
 
 
-    # Traversable pointing at …/data/fonts/circular-std
-    circular_std_dir = (
+def _font_files():
+    """Traversable pointing at …/data/fonts/circular-std."""
+    return (
         resources.files("ecostyles.data")
         .joinpath("fonts")
         .joinpath("circular-std")
     )
 
-    # as_file() guarantees a real on-disk path even if we're inside a wheel
-    with resources.as_file(circular_std_dir) as fs_path:
-        # copy *all* font files in that subtree
-        for fp in fs_path.rglob("*"):
-            if fp.suffix.lower() in _FONT_EXTS:
-                shutil.copy2(fp, tmp_dir / fp.name)
-
-    # Tell vl-convert where those fonts live
-    vlc.register_font_directory(str(tmp_dir))
-    
-    return tmp_dir
\ No newline at end of file
+
+def _extract_fonts(source) -> Path:
+    """Copy the font files out of a non-filesystem install (e.g. a zip) to a real directory.
+
+    The copy goes to a stable, fingerprinted cache directory, shared by every process and
+    run with the same fonts. If the cache directory isn't writable, a temporary directory
+    is used instead and removed when the process exits.
+    """
+    fonts = [fp for fp in source.iterdir() if Path(fp.name).suffix.lower() in _FONT_EXTS]
+    try:
+        target = default_cache_dir("fonts", font_fingerprint())
+        for fp in fonts:
+            if not (target / fp.name).is_file():
+                atomic_write(target / fp.name, fp.read_bytes())
+        return target
+    except OSError:
+        target = Path(mkdtemp(prefix="ecostyles_fonts_"))
+        atexit.register(shutil.rmtree, target, ignore_errors=True)
+        for fp in fonts:
+            (target / fp.name).write_bytes(fp.read_bytes())
+        return target
+
+
+def setup_fonts():
+    """
+    Register the Circular Std fonts with vl-convert, once per process.
+
+    Fonts are registered straight from the installed package when it lives on disk, or
+    else from an extracted copy (see ``_extract_fonts``). Later calls, from any thread,
+    return at once.
+
+    Returns:
+        Path: The registered font directory
+    """
+    global _registered
+    if _registered is None:
+        with _register_lock:
+            if _registered is None:
+                import vl_convert as vlc
+
+                source = _font_files()
+                directory = source if isinstance(source, Path) else _extract_fonts(source)
+                vlc.register_font_directory(os.fspath(directory))
+                _registered = directory
+    return _registered
+
+@lru_cache(maxsize=None)
+def font_fingerprint() -> str:
+    """Return a short hash of the bundled font files (names and contents).
+
+    Rendered output depends on the fonts, so caches of rendered charts include this in
+    their keys; swapping a font file invalidates them.
+    """
+    digest = hashlib.sha256()
+    for fp in sorted(_font_files().iterdir(), key=lambda fp: fp.name):
+        if Path(fp.name).suffix.lower() in _FONT_EXTS:
+            digest.update(fp.name.encode())
+            digest.update(fp.read_bytes())
+    return digest.hexdigest()[:16]
@@ -9,80 +9,179 @@ Public entry point: :func:`add_population`.
 
 from __future__ import annotations
 
-import csv
+import io
 import json
-import urllib.request
 import warnings
-from functools import lru_cache
 from importlib import resources
+from pathlib import Path
 
-import country_converter as coco
+import numpy as np
 import pandas as pd
 
-_WB_BASE = "https://api.worldbank.org/v2"
+from .countries import to_iso3
+from .worldbank import fetch_indicator
+
 _WB_INDICATOR = "SP.POP.TOTL"
 
-# Lazily-loaded bundled dataset: ({(iso3, year): population}, max_year_available).
-_BUNDLED: dict[tuple[str, int], int] | None = None
+# Lazily-loaded bundled dataset: (PopulationTable, max_year_available).
+_BUNDLED: PopulationTable | None = None
 _BUNDLED_MAX_YEAR: int = 0
 
+# Sentinel for "no value" in the population matrix (populations are never negative).
+_MISSING = -1
+
+
+class PopulationTable:
+    """Populations as a dense ISO3 x year ``int64`` matrix, with vectorised lookups.
+
+    Countries are integer-coded by their row in ``codes`` and years by their offset from
+    ``first_year``; missing values hold ``-1``. Besides :meth:`lookup` (whole columns at
+    once), the table reads like the ``{(iso3, year): population}`` mapping it replaces:
+    ``table["GBR", 2023]``, ``table.get(key)``, ``key in table`` and ``len(table)``.
+
+    Args:
+        codes: ISO3 code of each matrix row.
+        first_year: Year of the first matrix column.
+        values: ``(len(codes), n_years)`` integer array, ``-1`` where missing.
+    """
+
+    __slots__ = ("codes", "first_year", "values", "_index")
+
+    def __init__(self, codes, first_year: int, values: np.ndarray) -> None:
+        self.codes = pd.Index(codes, dtype=object)
+        self.first_year = int(first_year)
+        self.values = values
+        self._index = {code: i for i, code in enumerate(self.codes)}
+
+    @classmethod
+    def from_arrays(cls, iso3, years, values) -> PopulationTable:
+        """Build a table from parallel columns of ISO3 codes, years and populations."""
+        years = np.asarray(years, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        row, codes = pd.factorize(pd.Series(iso3, dtype=object), sort=True)
+        if not len(years):
+            return cls(codes, 0, np.empty((len(codes), 0), dtype=np.int64))
+        first = int(years.min())
+        matrix = np.full((len(codes), int(years.max()) - first + 1), _MISSING, dtype=np.int64)
+        matrix[row, years - first] = values
+        return cls(codes, first, matrix)
+
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> PopulationTable:
+        """Build a table from a ``{(iso3, year): population}`` mapping."""
+        keys = list(mapping)
+        return cls.from_arrays([k[0] for k in keys], [k[1] for k in keys],
+                               [mapping[k] for k in keys])
+
+    @property
+    def last_year(self) -> int:
+        """Latest year with any value (0 for an empty table)."""
+        has_value = np.flatnonzero((self.values != _MISSING).any(axis=0))
+        return self.first_year + int(has_value[-1]) if has_value.size else 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.values != _MISSING))
+
+    def __getitem__(self, key: tuple[str, int]) -> int:
+        iso3, year = key
+        row, col = self._index.get(iso3), int(year) - self.first_year
+        if row is None or not 0 <= col < self.values.shape[1] or self.values[row, col] < 0:
+            raise KeyError(key)
+        return int(self.values[row, col])
+
+    def get(self, key: tuple[str, int], default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def lookup(self, iso3, years) -> np.ndarray:
+        """Return populations for parallel arrays of ISO3 codes and years.
 
-def _load_bundled() -> tuple[dict[tuple[str, int], int], int]:
+        Vectorised: codes are factorised so each distinct code is resolved once, then
+        values are gathered from the matrix in a single ``take``.
+
+        Args:
+            iso3: Array-like of ISO3 codes (None/NaN for unresolved).
+            years: Array-like of integer years, the same length.
+
+        Returns:
+            float64 array, NaN where a code, year or value is missing.
+        """
+        inverse, uniques = pd.factorize(pd.Series(iso3, dtype=object))
+        rows = np.where(inverse >= 0, self.codes.get_indexer(uniques)[inverse], -1)
+        cols = np.asarray(years, dtype=np.int64) - self.first_year
+        n_years = self.values.shape[1]
+        ok = (rows >= 0) & (cols >= 0) & (cols < n_years)
+
+        out = np.full(len(rows), np.nan)
+        found = self.values.take(rows[ok] * n_years + cols[ok])
+        out[ok] = np.where(found >= 0, found, np.nan)
+        return out
+
+
+def _population_file(name: str):
+    # Chained single-arg joinpath: multi-arg joinpath on a namespace-package
+    # MultiplexedPath is only supported from Python 3.12.
+    return resources.files("ecostyles.data").joinpath("population").joinpath(name)
+
+
+def _load_bundled_binary() -> tuple[PopulationTable, int] | None:
+    """Memory-map the binary snapshot, or return None if it isn't shipped.
+
+    ``population.npy`` holds the int64 country x year matrix and
+    ``population_index.json`` its row codes and year range. Mapping the matrix makes the
+    load O(1), and its pages are shared between processes.
+    """
+    matrix, index = _population_file("population.npy"), _population_file("population_index.json")
+    if not (matrix.is_file() and index.is_file()):
+        return None
+    meta = json.loads(index.read_text())
+    if isinstance(matrix, Path):
+        values = np.load(matrix, mmap_mode="r")
+    else:  # e.g. a zipped install: no real file to map
+        values = np.load(io.BytesIO(matrix.read_bytes()))
+    if values.shape != (len(meta["codes"]), meta["last_year"] - meta["first_year"] + 1):
+        return None
+    return PopulationTable(meta["codes"], meta["first_year"], values), meta["last_year"]
+
+
+def _load_bundled_csv() -> tuple[PopulationTable, int]:
+    """Parse the long-format CSV snapshot (the fallback when no binary form is shipped)."""
+    with resources.as_file(_population_file("population.csv")) as path:
+        # keep_default_na=False: ISO3 codes such as "NAM" must stay strings.
+        frame = pd.read_csv(path, dtype={"iso3": str, "year": np.int64, "population": np.int64},
+                            keep_default_na=False)
+    table = PopulationTable.from_arrays(frame["iso3"].to_numpy(), frame["year"].to_numpy(),
+                                        frame["population"].to_numpy())
+    return table, table.last_year
+
+
+def _load_bundled() -> tuple[PopulationTable, int]:
     """Load (and cache) the population snapshot shipped in the package.
 
-    Returns the ``{(iso3, year): population}`` mapping and the latest year it covers.
-    Refresh the underlying file with ``scripts/fetch_population.py``.
+    Returns the :class:`PopulationTable` and the latest year it covers. The memory-mapped
+    binary form is used when present, else the CSV. Refresh both with
+    ``scripts/fetch_population.py``.
     """
     global _BUNDLED, _BUNDLED_MAX_YEAR
     if _BUNDLED is None:
-        data: dict[tuple[str, int], int] = {}
-        # Chained single-arg joinpath: multi-arg joinpath on a namespace-package
-        # MultiplexedPath is only supported from Python 3.12.
-        csv_file = resources.files("ecostyles.data").joinpath("population").joinpath("population.csv")
-        with resources.as_file(csv_file) as path, open(path, newline="") as f:
-            reader = csv.reader(f)
-            next(reader, None)  # skip header
-            for iso3, year, value in reader:
-                data[(iso3, int(year))] = int(value)
-        _BUNDLED = data
-        _BUNDLED_MAX_YEAR = max((y for _, y in data), default=0)
+        _BUNDLED, _BUNDLED_MAX_YEAR = _load_bundled_binary() or _load_bundled_csv()
     return _BUNDLED, _BUNDLED_MAX_YEAR
 
 
-def _build_url(iso3: str, year: int) -> str:
-    # One country, one year: the simplest, most portable World Bank request. (Multi-country
-    # `;` batching and `date=start:end` ranges are documented but blocked by some corporate
-    # networks/proxies, so we keep requests to this robust primitive and cache each result.)
-    return f"{_WB_BASE}/country/{iso3}/indicator/{_WB_INDICATOR}?format=json&date={year}"
+def _fetch_population(pairs, timeout,
+                      allow_fetch: bool = True) -> dict[tuple[str, int], float | None]:
+    """Fetch live population for ``(iso3, year)`` pairs newer than the bundle.
 
-
-def _parse_worldbank_payload(payload) -> dict[tuple[str, int], float | None]:
-    """Turn a World Bank JSON payload into a ``{(iso3, year): value}`` mapping.
-
-    The payload is ``[metadata, rows]``; ``rows`` is ``None`` when nothing matched.
+    Uses the shared World Bank client (pooled, concurrent, batched) and its on-disk cache
+    (see ``utils.worldbank``). Point it elsewhere with ``worldbank.configure(base_url=...)``.
+    With ``allow_fetch=False`` only previously cached values are returned.
     """
-    if not isinstance(payload, list) or len(payload) < 2 or payload[1] is None:
-        return {}
-
-    result: dict[tuple[str, int], float | None] = {}
-    for row in payload[1]:
-        iso3 = row.get("countryiso3code")
-        date = row.get("date")
-        if iso3 and date is not None:
-            result[(iso3, int(date))] = row.get("value")
-    return result
-
-
-@lru_cache(maxsize=4096)
-def _fetch_one(iso3: str, year: int, timeout: int) -> dict[tuple[str, int], float | None]:
-    """Fetch population for a single ISO3 code and year. Cached per unique request."""
-    request = urllib.request.Request(
-        _build_url(iso3, year),
-        headers={"User-Agent": "ecostyles"},
-    )
-    with urllib.request.urlopen(request, timeout=timeout) as response:
-        payload = json.loads(response.read().decode("utf-8"))
-    return _parse_worldbank_payload(payload)
+    return fetch_indicator(pairs, _WB_INDICATOR, timeout, allow_fetch=allow_fetch)
 
 
 def add_population(df: pd.DataFrame, country_column: str, year: int | None = None, *,
@@ -92,18 +191,21 @@ def add_population(df: pd.DataFrame, country_column: str, year: int | None = Non
 
     Population comes from a snapshot **bundled in the package** (offline, fast). If a
     requested year is newer than the bundle covers, it is fetched live from the World Bank
-    API as a fallback (unless ``allow_fetch=False``).
+    API as a fallback (unless ``allow_fetch=False``). Fetched values are kept in an on-disk
+    cache shared by all processes (``worldbank.configure_cache``), so each new year is
+    downloaded once per machine, not once per process.
 
     Args:
         df: Input dataframe (not mutated; a copy is returned).
         country_column: Column of country identifiers. ISO3 codes, names, or ISO2 all work
-            (converted to ISO3 via ``country_converter``).
+            (converted to ISO3 via ``country_converter``, see ``utils.countries``).
         year: A single year to use for every row. Provide this **or** ``year_column``.
         year_column: Column holding a per-row year (for panel/time-series data). Provide
             this **or** ``year``.
         population_column: Name of the column to add (default ``"population"``).
         allow_fetch: If True (default), fetch years newer than the bundle from the live API.
-            Set False to stay fully offline (newer years become NaN instead).
+            Set False to stay fully offline: newer years are replayed from the fetch cache
+            when it has them, and are NaN otherwise.
         timeout: HTTP timeout in seconds for the fallback fetch.
 
     Returns:
@@ -119,40 +221,41 @@ def add_population(df: pd.DataFrame, country_column: str, year: int | None = Non
 
     df = df.copy()
 
-    # Resolve everything to ISO3 (coco accepts ISO3/name/ISO2 and returns ISO3).
-    converted = coco.convert(df[country_column].astype(str).tolist(), to="ISO3", not_found=None)
-    if isinstance(converted, str):  # coco returns a bare string for a single input
-        converted = [converted]
-    iso3 = pd.Series(converted, index=df.index)
+    # Resolve everything to ISO3 (names/ISO2/ISO3; each distinct value converted once).
+    iso3 = pd.Series(to_iso3(df[country_column]), index=df.index, dtype=object)
 
-    # Which years do we need, and what year does each row want?
+    # What year does each row want?
     if year is not None:
-        row_years = pd.Series(int(year), index=df.index)
+        row_years = np.full(len(df), int(year), dtype=np.int64)
     else:
-        row_years = df[year_column].astype(int)
-    years = row_years.tolist()
+        row_years = df[year_column].astype(int).to_numpy(dtype=np.int64)
+    resolved = iso3.notna().to_numpy()
 
-    # Unique (country, year) pairs to fetch — avoids repeat calls; lru_cache does the rest.
-    pairs = {(code, int(yr)) for code, yr in zip(iso3.tolist(), years) if code}
-    if not pairs:
+    if not resolved.any():
         warnings.warn("add_population: no valid country codes resolved; population set to NaN.")
         df[population_column] = pd.NA
         return df
 
+    # Years the bundle covers: one vectorised gather from the snapshot matrix. Years
+    # within its range that it lacks stay NaN (no pointless API call).
     bundled, max_year = _load_bundled()
-    lookup: dict[tuple[str, int], float | None] = {}
-    for code, yr in pairs:
-        if yr <= max_year:
-            lookup[(code, yr)] = bundled.get((code, yr))          # from the bundled snapshot
-        elif allow_fetch:
-            lookup.update(_fetch_one(code, yr, timeout))          # newer year -> live API
-        else:
-            lookup[(code, yr)] = None
-
-    df[population_column] = [
-        lookup.get((code, int(yr))) if code else None
-        for code, yr in zip(iso3, row_years)
-    ]
+    values = bundled.lookup(iso3.to_numpy(), row_years)
+    values[row_years > max_year] = np.nan
+
+    # Newer years: the unique (country, year) pairs, from the fetch cache or the live API.
+    newer = resolved & (row_years > max_year)
+    if newer.any():
+        pairs = pd.DataFrame({"iso3": iso3.to_numpy()[newer], "year": row_years[newer]})
+        fetched = _fetch_population(pairs.drop_duplicates().itertuples(index=False), timeout,
+                                    allow_fetch)
+        keys = pd.MultiIndex.from_frame(pairs)
+        table = pd.Series({k: v for k, v in fetched.items() if v is not None}, dtype="float64")
+        values[newer] = table.reindex(keys).to_numpy() if len(table) else np.nan
+
+    column = pd.Series(values, index=df.index)
+    if not column.isna().any():
+        column = column.astype(np.int64)
+    df[population_column] = column
 
     missing = int(df[population_column].isna().sum())
     if missing:
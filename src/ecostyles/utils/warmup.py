@@ -0,0 +1,136 @@
+"""Pre-warm the vl-convert rendering engine in a background thread.
+
+vl-convert starts its embedded JavaScript runtime and loads the Vega modules lazily, so the
+first render in a process is far slower than later ones (around 0.7 s versus a few tens of
+milliseconds for a small chart). :func:`warmup` pays that cost up front, off the caller's
+thread: it registers the fonts and renders a tiny spec under each ecostyles theme through
+the same code path as ``save_chart``, so the first real save starts warm.
+
+Public entry point: :func:`warmup` (also ``ecostyles.warmup`` and ``EcoStyles(warm=True)``).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Callable
+
+from .. import themes
+from .fonts import setup_fonts
+
+# Small, but with a title, axes and labels, so text layout and font loading are warmed too.
+_TINY_SPEC = {
+    "data": {"values": [{"x": "a", "y": 1}, {"x": "b", "y": 2}]},
+    "mark": "bar",
+    "encoding": {"x": {"field": "x", "type": "nominal"},
+                 "y": {"field": "y", "type": "quantitative"}},
+    "title": {"text": "Warm-up", "subtitle": "ecostyles"},
+    "width": 40,
+    "height": 40,
+}
+
+
+def _theme_configs() -> dict[str, dict]:
+    return {
+        "article": themes.get_theme("article"),
+        "cotd": themes.get_theme("cotd"),
+        "cotd_dark": themes.get_theme("cotd", dark_mode=True),
+        "newsletter": themes.get_theme("newsletter"),
+    }
+
+
+class Warmup(threading.Thread):
+    """The (single, per-process) warm-up run, as a daemon thread.
+
+    Attributes:
+        duration: Seconds the warm-up took, once it has finished successfully.
+        error: The exception it failed with, if any (warm-up failures never propagate
+            to the rendering code; a cold first render still works). A failed run is
+            forgotten, so the next :func:`warmup` call tries again.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(name="ecostyles-warmup", daemon=True)
+        self.duration: float | None = None
+        self.error: BaseException | None = None
+        self._callbacks: list[Callable[[float], None]] = []
+        self._lock = threading.Lock()
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        try:
+            from . import file_operations
+
+            setup_fonts()
+            for config in _theme_configs().values():
+                spec = {**_TINY_SPEC, **config}
+                file_operations._render(json.dumps(spec), scales=(1,))
+        except Exception as exc:
+            self.error = exc
+            _forget(self)
+            return
+        with self._lock:
+            self.duration = time.perf_counter() - start
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self.duration)
+
+    def add_callback(self, callback: Callable[[float], None]) -> None:
+        """Call ``callback(duration)`` when the warm-up finishes (now, if it already has)."""
+        with self._lock:
+            if self.duration is None:
+                self._callbacks.append(callback)
+                return
+        callback(self.duration)
+
+    def wait(self, timeout: float | None = None) -> float | None:
+        """Block until the warm-up finishes; return its duration (None if still running).
+
+        Raises:
+            Exception: Whatever the warm-up failed with.
+        """
+        self.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.duration
+
+
+_current: Warmup | None = None
+_current_lock = threading.Lock()
+
+
+def _forget(failed: Warmup) -> None:
+    """Drop ``failed`` as the process's warm-up, so the next :func:`warmup` retries."""
+    global _current
+    with _current_lock:
+        if _current is failed:
+            _current = None
+
+
+def warmup(callback: Callable[[float], None] | None = None, *,
+           background: bool = True) -> Warmup:
+    """Register fonts and initialise vl-convert, by default in a background thread.
+
+    Runs once per process: later calls return the same :class:`Warmup`. If it fails,
+    the next call starts a new one.
+
+    Args:
+        callback: Hook called with the warm-up duration in seconds once it succeeds, e.g.
+            to record cold-start times in service metrics. Called on the warm-up thread.
+        background: If False, block until the warm-up is done.
+
+    Returns:
+        Warmup: The warm-up thread; ``wait()`` blocks until it is done.
+    """
+    global _current
+    with _current_lock:
+        if _current is None:
+            _current = Warmup()
+            _current.start()
+        current = _current
+    if callback is not None:
+        current.add_callback(callback)
+    if not background:
+        current.wait()
+    return current
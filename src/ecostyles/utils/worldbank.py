@@ -0,0 +1,373 @@
+"""A small, concurrent client for the World Bank Indicators API.
+
+Used by ``add_population`` for years newer than the bundled snapshot. Compared with one
+blocking ``urlopen`` per (country, year), the client:
+
+- reuses keep-alive HTTP connections from a pool instead of a new TLS handshake each time;
+- runs requests on a bounded thread pool, throttled by a shared rate limit;
+- retries transient failures (network errors, HTTP 429 and 5xx) with exponential backoff;
+- batches several countries into one request (``/country/GBR;FRA;DEU/...``) and, if the
+  API rejects that form, falls back to one country per request.
+
+Only a real "no data" answer, or the API rejecting a country code, counts as no value.
+Server errors and network failures that outlast the retries are raised, so they are never
+mistaken for (or cached as) missing data.
+
+The base URL is configurable (argument, :func:`configure`, or ``$ECOSTYLES_WORLDBANK_URL``)
+so tests and benchmarks can point it at a local stand-in server.
+
+:func:`fetch_indicator` also keeps results in a persistent, multi-process
+:class:`~ecostyles.utils.cache.IndicatorCache` (see :func:`configure_cache`), so once any
+process has fetched a year, the others — and later runs — read it from disk.
+
+Public entry points: :class:`WorldBankClient` and :func:`fetch_indicator`.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from .cache import IndicatorCache
+
+DEFAULT_BASE_URL = "https://api.worldbank.org/v2"
+
+# Failures worth retrying: the server or the network may do better next time.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_NETWORK_ERRORS = (OSError, http.client.HTTPException)
+
+
+class WorldBankError(RuntimeError):
+    """A request the World Bank API answered with an error or an unusable payload.
+
+    Attributes:
+        status: The HTTP status, when the API answered with an error status.
+    """
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class WorldBankRejected(WorldBankError):
+    """The API refused the request itself (a 4xx, or an error message instead of rows),
+    e.g. for a country code it doesn't know. Retrying won't help; the answer is "no value".
+    """
+
+
+def parse_payload(payload) -> dict[tuple[str, int], float | None]:
+    """Turn a World Bank JSON payload into a ``{(iso3, year): value}`` mapping.
+
+    The payload is ``[metadata, rows]``; ``rows`` is ``None`` when nothing matched.
+    """
+    if not isinstance(payload, list) or len(payload) < 2 or payload[1] is None:
+        return {}
+
+    result: dict[tuple[str, int], float | None] = {}
+    for row in payload[1]:
+        iso3 = row.get("countryiso3code")
+        date = row.get("date")
+        if iso3 and date is not None:
+            result[(iso3, int(date))] = row.get("value")
+    return result
+
+
+class _RateLimiter:
+    """Spaces out calls to at most ``rate`` per second, across threads."""
+
+    def __init__(self, rate: float | None) -> None:
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class WorldBankClient:
+    """Pooled, concurrent, retrying fetcher for World Bank indicator values.
+
+    Args:
+        base_url: API root (default ``$ECOSTYLES_WORLDBANK_URL`` or the public API).
+        max_workers: Concurrent requests (and pooled connections).
+        rate: Most requests started per second (None for no limit).
+        retries: Retries per request after the first attempt.
+        backoff: Base delay in seconds; attempt ``n`` waits ``backoff * 2**n`` plus jitter.
+        batch_size: Countries per request; 1 disables batching.
+        timeout: Default socket timeout in seconds.
+    """
+
+    def __init__(self, base_url: str | None = None, *, max_workers: int = 8,
+                 rate: float | None = 20.0, retries: int = 3, backoff: float = 0.5,
+                 batch_size: int = 50, timeout: float = 30) -> None:
+        base_url = base_url or os.environ.get("ECOSTYLES_WORLDBANK_URL") or DEFAULT_BASE_URL
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"base_url must be an http(s) URL, got {base_url!r}")
+        self.base_url = base_url
+        self._scheme, self._netloc = parts.scheme, parts.netloc
+        self._prefix = parts.path.rstrip("/")
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        self.requests = 0  # HTTP requests sent, retries included (for tests and benchmarks)
+        self._limiter = _RateLimiter(rate)
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._batching = self.batch_size > 1
+
+    # ------------------------------------------------------------------ connections
+    def _connection(self, timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        """Return a pooled keep-alive connection (or a new one), and whether it was pooled."""
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(self._netloc, timeout=timeout), False
+        return http.client.HTTPConnection(self._netloc, timeout=timeout), False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_workers:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # --------------------------------------------------------------------- requests
+    def _get_once(self, path: str, timeout: float):
+        self._limiter.wait()
+        conn, pooled = self._connection(timeout)
+        with self._lock:
+            self.requests += 1
+        try:
+            conn.request("GET", path, headers={"User-Agent": "ecostyles",
+                                               "Accept": "application/json"})
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if not pooled:
+                raise
+            # The server closed the idle keep-alive connection: not a failed attempt.
+            return self._get_once(path, timeout)
+        except BaseException:
+            conn.close()  # the connection's state is unknown: don't reuse it
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        return response.status, body
+
+    def get_json(self, path: str, params: dict, timeout: float | None = None):
+        """GET ``{base_url}{path}?{params}`` and decode the JSON body, retrying as needed.
+
+        Raises:
+            WorldBankRejected: For a 4xx status other than 429.
+            WorldBankError: For a 5xx or 429 status once retries are exhausted, or a
+                non-JSON body.
+            OSError / http.client.HTTPException: When retries are exhausted.
+        """
+        url = f"{self._prefix}{path}?{urlencode(params, safe=';:')}"
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(self.retries + 1):
+            try:
+                status, body = self._get_once(url, timeout)
+            except _NETWORK_ERRORS:
+                if attempt == self.retries:
+                    raise
+            else:
+                if status == 200:
+                    try:
+                        return json.loads(body.decode("utf-8"))
+                    except ValueError as exc:  # e.g. an HTML/XML error page from a proxy
+                        raise WorldBankError(f"non-JSON response for {url}") from exc
+                if 400 <= status < 500 and status not in _RETRY_STATUSES:
+                    raise WorldBankRejected(f"HTTP {status} for {url}", status)
+                if status not in _RETRY_STATUSES or attempt == self.retries:
+                    raise WorldBankError(f"HTTP {status} for {url}", status)
+            time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    def _fetch_countries(self, codes: list[str], year: int, indicator: str,
+                         timeout: float | None) -> dict[tuple[str, int], float | None]:
+        """One request (plus any extra pages) for ``codes`` in ``year``."""
+        path = f"/country/{';'.join(codes)}/indicator/{indicator}"
+        result: dict[tuple[str, int], float | None] = {}
+        page, pages = 1, 1
+        while page <= pages:
+            payload = self.get_json(path, {"format": "json", "date": year,
+                                           "per_page": 1000, "page": page}, timeout)
+            meta = payload[0] if isinstance(payload, list) and payload else None
+            if not isinstance(meta, dict) or "message" in meta:
+                # The API reports bad requests as a 200 with a message instead of rows.
+                raise WorldBankRejected(f"World Bank error for {path}: {meta}")
+            pages = int(meta.get("pages") or 1)
+            result.update(parse_payload(payload))
+            page += 1
+        return result
+
+    def _fetch_chunk(self, codes: list[str], year: int, indicator: str,
+                     timeout: float | None) -> dict[tuple[str, int], float | None]:
+        batch_rejected = False
+        if len(codes) > 1 and self._batching:
+            try:
+                return self._fetch_countries(codes, year, indicator, timeout)
+            except WorldBankRejected:
+                # Either one code is unknown, or the ';' form itself is blocked (some
+                # networks/proxies do): find out by going one by one.
+                batch_rejected = True
+        result: dict[tuple[str, int], float | None] = {}
+        rejected_codes = False
+        for code in codes:
+            try:
+                result.update(self._fetch_countries([code], year, indicator, timeout))
+            except WorldBankRejected:
+                rejected_codes = True  # a code the API doesn't know: no value
+        if batch_rejected and not rejected_codes:
+            self._batching = False  # every code is fine alone: the batch form is blocked
+        return result
+
+    def fetch(self, pairs, indicator: str = "SP.POP.TOTL",
+              timeout: float | None = None) -> dict[tuple[str, int], float | None]:
+        """Fetch ``indicator`` for each ``(iso3, year)`` pair.
+
+        Pairs are grouped by year and split into country batches, which run concurrently.
+
+        Returns:
+            ``{(iso3, year): value}`` for every requested pair; None where the API has no
+            value.
+
+        Raises:
+            WorldBankError / OSError / http.client.HTTPException: When a request still
+                fails after its retries (server errors, network failures).
+        """
+        by_year: dict[int, list[str]] = defaultdict(list)
+        for code, year in dict.fromkeys((str(c), int(y)) for c, y in pairs):
+            by_year[year].append(code)
+        size = self.batch_size if self._batching else 1
+        chunks = [(codes[i:i + size], year) for year, codes in by_year.items()
+                  for i in range(0, len(codes), size)]
+
+        found: dict[tuple[str, int], float | None] = {}
+        if len(chunks) == 1 or self.max_workers <= 1:
+            for codes, year in chunks:
+                found.update(self._fetch_chunk(codes, year, indicator, timeout))
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+                futures = [pool.submit(self._fetch_chunk, codes, year, indicator, timeout)
+                           for codes, year in chunks]
+                for future in futures:
+                    found.update(future.result())
+        return {(code, year): found.get((code, year))
+                for year, codes in by_year.items() for code in codes}
+
+
+_default: WorldBankClient | None = None
+_default_lock = threading.Lock()
+
+
+def configure(base_url: str | None = None, **options) -> WorldBankClient:
+    """Replace the shared client used by ``add_population`` (see :class:`WorldBankClient`).
+
+    Returns:
+        WorldBankClient: The new shared client.
+    """
+    global _default
+    with _default_lock:
+        if _default is not None:
+            _default.close()
+        _default = WorldBankClient(base_url, **options)
+    return _default
+
+
+def default_client() -> WorldBankClient:
+    """Return the shared client, creating it with default settings on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = WorldBankClient()
+        return _default
+
+
+_cache: IndicatorCache | None = IndicatorCache()
+
+
+def configure_cache(path=True, *, ttl: float = 30 * 86400,
+                    negative_ttl: float = 86400) -> IndicatorCache | None:
+    """Replace the on-disk cache used by :func:`fetch_indicator`.
+
+    Args:
+        path: True for the default database (under ``default_cache_dir("worldbank")``), a
+            file path, or None/False to disable caching.
+        ttl, negative_ttl: As for :class:`~ecostyles.utils.cache.IndicatorCache`.
+
+    Returns:
+        The new cache, or None when disabled.
+    """
+    global _cache
+    if not path:
+        _cache = None
+    else:
+        _cache = IndicatorCache(None if path is True else path, ttl=ttl,
+                                negative_ttl=negative_ttl)
+    return _cache
+
+
+def fetch_indicator(pairs, indicator: str = "SP.POP.TOTL", timeout: float | None = None, *,
+                    allow_fetch: bool = True) -> dict[tuple[str, int], float | None]:
+    """Fetch ``indicator`` for ``(iso3, year)`` pairs with the shared client and cache.
+
+    Pairs with a fresh cached answer (including a cached "no data") aren't requested; the
+    rest are fetched and stored. With ``allow_fetch=False`` nothing is requested: cached
+    values are replayed whatever their age, and uncached pairs map to None.
+
+    A fetch that fails (see :meth:`WorldBankClient.fetch`) raises and caches nothing. A
+    cache that can't be opened (e.g. a read-only or sandboxed home directory) is skipped,
+    as if caching were disabled.
+    """
+    pairs = list(dict.fromkeys((str(c), int(y)) for c, y in pairs))
+    cache = _cache
+    found = {}
+    if cache is not None:
+        try:
+            found = cache.get(indicator, pairs, stale=not allow_fetch)
+        except (OSError, sqlite3.Error):
+            cache = None
+    missing = [pair for pair in pairs if pair not in found]
+    if missing and allow_fetch:
+        fetched = default_client().fetch(missing, indicator, timeout)
+        if cache is not None:
+            try:
+                cache.put(indicator, fetched)
+            except (OSError, sqlite3.Error):
+                pass  # the values are still returned, just not kept
+        found.update(fetched)
+    return {pair: found.get(pair) for pair in pairs}
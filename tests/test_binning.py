@@ -0,0 +1,89 @@
+"""Unit tests for ecostyles.utils.binning."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecostyles import EcoStyles
+from ecostyles.utils.binning import bin2d, binned_heatmap
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return pd.DataFrame({"a": rng.normal(size=n), "b": rng.normal(size=n),
+                         "w": rng.uniform(size=n)})
+
+
+def test_bin2d_counts_match_histogram2d(points):
+    cells = bin2d(points["a"], points["b"], bins=(30, 20))
+    expected, xe, ye = np.histogram2d(points["a"], points["b"], bins=(30, 20))
+    assert cells["count"].sum() == len(points)
+    assert sorted(cells["count"]) == sorted(expected[expected > 0].astype(int))
+    assert cells["x"].min() == xe[0] and cells["x2"].max() == xe[-1]
+
+
+def test_bin2d_mean_and_sum():
+    cells = bin2d([0, 0, 1], [0, 0, 1], [1.0, 3.0, 5.0], bins=2, statistic="mean")
+    assert sorted(cells["mean"]) == [2.0, 5.0]
+    cells = bin2d([0, 0, 1], [0, 0, 1], [1.0, 3.0, 5.0], bins=2, statistic="sum")
+    assert sorted(cells["sum"]) == [4.0, 5.0]
+
+
+def test_bin2d_drops_missing_and_out_of_range():
+    cells = bin2d([0, 1, np.nan, 5], [0, 1, 1, 5], bins=2, extent=((0, 2), None))
+    assert cells["count"].sum() == 2
+
+
+def test_bin2d_count_keeps_rows_with_missing_values():
+    values = [1.0, np.nan, 3.0]
+    assert bin2d([0, 1, 2], [0, 1, 2], values, bins=1)["count"].tolist() == [3]
+    assert bin2d([0, 1, 2], [0, 1, 2], values, bins=1, statistic="sum")["sum"].tolist() == [4.0]
+
+
+def test_bin2d_datetime_axis():
+    dates = pd.Series(pd.date_range("2020-01-01", periods=100, freq="D"))
+    cells = bin2d(dates, np.arange(100), bins=4)
+    assert pd.api.types.is_datetime64_any_dtype(cells["x"])
+    assert cells["x"].min() == dates.min() and cells["x2"].max() == dates.max()
+
+
+def test_bin2d_datetime_extent():
+    dates = pd.Series(pd.date_range("2020-01-01", periods=100, freq="D"))
+    cells = bin2d(dates, np.arange(100), bins=(2, 1),
+                  extent=((pd.Timestamp("2020-01-01"), "2020-01-21"), None))
+    assert cells["x"].tolist() == [pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-11")]
+    assert cells["x2"].iloc[-1] == pd.Timestamp("2020-01-21")
+    assert cells["count"].sum() == 21  # later dates fall outside the extent
+
+
+def test_bin2d_validates_arguments():
+    with pytest.raises(ValueError, match="statistic"):
+        bin2d([1], [1], bins=2, statistic="median")
+    with pytest.raises(ValueError, match="requires values"):
+        bin2d([1], [1], bins=2, statistic="mean")
+
+
+def test_binned_heatmap_is_bounded_by_resolution(points):
+    chart = binned_heatmap(points, "a", "b", width=100, height=80, cell_size=10)
+    spec = chart.to_dict()
+    (records,) = spec["datasets"].values()
+    assert len(records) <= 10 * 8
+    assert spec["mark"]["type"] == "rect"
+    assert spec["encoding"]["color"]["scale"] == {"range": "heatmap"}
+    assert spec["encoding"]["x2"] == {"field": "a2"}
+
+
+def test_binned_heatmap_mean(points):
+    chart = binned_heatmap(points, "a", "b", value="w", statistic="mean", cell_size=20)
+    spec = json.loads(chart.to_json())
+    assert spec["encoding"]["color"]["field"] == "mean_w"
+    assert spec["encoding"]["color"]["title"] == "Mean of w"
+
+
+def test_styles_delegate(points):
+    chart = EcoStyles(compact_data=False).binned_heatmap(points, "a", "b")
+    assert chart.to_dict()["mark"]["type"] == "rect"
@@ -0,0 +1,77 @@
+"""Unit tests for ecostyles.utils.cache."""
+
+import os
+import pickle
+import threading
+import time
+
+from ecostyles.utils.cache import IndicatorCache, RenderCache, default_cache_dir
+
+
+def test_default_cache_dir_honours_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("ECOSTYLES_CACHE_DIR", str(tmp_path / "c"))
+    assert default_cache_dir("renders") == tmp_path / "c" / "renders"
+    assert (tmp_path / "c" / "renders").is_dir()
+
+
+def test_render_cache_roundtrip_and_counters(tmp_path):
+    cache = RenderCache(tmp_path)
+    key = cache.key("{}", "png", 4)
+    assert cache.get(key) is None
+    cache.put(key, b"png-bytes")
+    assert cache.get(key) == b"png-bytes"
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+
+def test_render_cache_key_depends_on_format_and_scale():
+    keys = {RenderCache.key("{}", "png", 1), RenderCache.key("{}", "png", 2),
+            RenderCache.key("{}", "svg"), RenderCache.key("{ }", "svg")}
+    assert len(keys) == 4
+
+
+def test_render_cache_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=35)
+    for i, key in enumerate("abc"):
+        cache.put(key * 64, b"x" * 10)
+        os.utime(cache._path(key * 64), (i, i))  # deterministic recency: a < b < c
+    cache.get("a" * 64)  # touch "a", making "b" the least recently used
+    cache.put("d" * 64, b"x" * 10)
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) is not None and cache.get("d" * 64) is not None
+
+
+def test_render_cache_is_picklable(tmp_path):
+    cache = RenderCache(tmp_path)
+    clone = pickle.loads(pickle.dumps(cache))
+    assert clone.directory == cache.directory
+
+
+def test_indicator_cache_roundtrip_ttl_and_replay(tmp_path, monkeypatch):
+    cache = IndicatorCache(tmp_path / "wb.sqlite3", ttl=100, negative_ttl=10)
+    cache.put("SP.POP.TOTL", {("GBR", 2026): 69_500_000, ("XXX", 2026): None})
+    pairs = [("GBR", 2026), ("XXX", 2026), ("FRA", 2026)]
+    assert cache.get("SP.POP.TOTL", pairs) == {("GBR", 2026): 69_500_000, ("XXX", 2026): None}
+    assert cache.get("OTHER", pairs) == {}
+
+    now = time.time()
+    monkeypatch.setattr("ecostyles.utils.cache.time.time", lambda: now + 50)
+    assert cache.get("SP.POP.TOTL", pairs) == {("GBR", 2026): 69_500_000}  # negative expired
+    assert len(cache.get("SP.POP.TOTL", pairs, stale=True)) == 2
+    assert cache.stats == {"hits": 5, "misses": 7}
+
+
+def test_indicator_cache_concurrent_writers(tmp_path):
+    path = tmp_path / "wb.sqlite3"
+
+    def write(i):
+        # One cache (and connection) per thread, as separate processes would have.
+        IndicatorCache(path).put("X", {(f"C{i:02d}", year): year for year in range(2020, 2030)})
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pairs = [(f"C{i:02d}", year) for i in range(8) for year in range(2020, 2030)]
+    assert len(IndicatorCache(path).get("X", pairs)) == 80
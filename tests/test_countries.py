@@ -0,0 +1,83 @@
+"""Unit tests for ecostyles.utils.countries."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecostyles.utils import countries
+from ecostyles.utils.countries import CountryResolver
+
+
+@pytest.fixture
+def counting(monkeypatch):
+    """Count the names passed to the real converter."""
+    calls = []
+    real = CountryResolver._convert
+
+    def convert(self, names):
+        calls.append(list(names))
+        return real(self, names)
+
+    monkeypatch.setattr(CountryResolver, "_convert", convert)
+    return calls
+
+
+def test_to_iso3_mixed_formats():
+    out = countries.to_iso3(["GBR", "United Kingdom", "FR", "Germany", "Atlantis", np.nan])
+    assert list(out) == ["GBR", "GBR", "FRA", "DEU", None, None]
+
+
+def test_index_hits_skip_the_converter(counting):
+    out = CountryResolver().to_iso3(["GBR", "FR", "Germany", "United States", "OECD"] * 100)
+    assert list(out[:5]) == ["GBR", "FRA", "DEU", "USA", None]
+    assert counting == []
+
+
+def test_converts_each_distinct_miss_once(counting):
+    resolver = CountryResolver()
+    column = pd.Series(["GBR", "france", "GBR", "france"] * 1000)
+    out = resolver.to_iso3(column)
+    assert len(out) == 4000 and out[1] == "FRA"
+    assert counting == [["france"]]
+
+    resolver.to_iso3(["france", "germany"])  # only the new value is converted
+    assert counting[1:] == [["germany"]]
+
+
+def test_memo_is_bounded(counting):
+    resolver = CountryResolver(cache_size=2)
+    resolver.to_iso3(["france", "germany", "japan"])
+    assert list(resolver._memo) == ["germany", "japan"]
+    resolver.to_iso3(["france"])  # evicted, so converted again
+    assert counting[-1] == ["france"]
+
+
+def test_persisted_across_resolvers(tmp_path, counting):
+    path = tmp_path / "iso3.json"
+    CountryResolver(persist=path).to_iso3(["united kingdom", "Atlantis"])
+    assert json.loads(path.read_text()) == {"Atlantis": None, "united kingdom": "GBR"}
+
+    counting.clear()
+    out = CountryResolver(persist=path).to_iso3(["united kingdom", "Atlantis"])
+    assert list(out) == ["GBR", None]
+    assert counting == []
+
+
+def test_configure_replaces_shared_resolver(monkeypatch, tmp_path):
+    monkeypatch.setattr(countries, "_default", countries._default)
+    resolver = countries.configure(cache_size=10, persist=tmp_path / "c.json")
+    assert countries._default is resolver
+    assert list(countries.to_iso3(["japan"])) == ["JPN"]
+    assert (tmp_path / "c.json").exists()
+
+
+def test_bundled_index_agrees_with_country_converter():
+    import country_converter as coco
+
+    index = countries._bundled_index()
+    assert len(index) > 900
+    sample = sorted(index)[::25]
+    expected = coco.convert(sample, to="ISO3", not_found=None)
+    assert [index[k] or k for k in sample] == expected
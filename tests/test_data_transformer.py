@@ -0,0 +1,92 @@
+"""Unit tests for ecostyles.utils.data_transformer."""
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecostyles import EcoStyles
+from ecostyles.utils.data_transformer import (
+    NAME, _round_significant, compact_data_transformer, compact_dataframe,
+)
+
+
+@pytest.mark.parametrize("value,digits,expected", [
+    (0.1 + 0.2, 6, 0.3),
+    (123456789.0, 6, 123457000.0),
+    (-0.000123456789, 3, -0.000123),
+    (0.0, 6, 0.0),
+])
+def test_round_significant(value, digits, expected):
+    assert _round_significant(np.array([value]), digits)[0] == expected
+
+
+def test_round_significant_leaves_non_finite():
+    out = _round_significant(np.array([np.nan, np.inf]), 6)
+    assert np.isnan(out[0]) and np.isinf(out[1])
+
+
+def test_compact_dataframe():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2020-01-01", None, "2020-03-01"]),
+        "stamp": pd.to_datetime(["2020-01-01 12:00", "2020-01-02 00:00", "2020-01-03 00:00"]),
+        "noisy": [0.1 + 0.2, 1.5, None],
+        "whole": [1.0, 2.0, None],
+        "empty": [None, None, None],
+    })
+    values = compact_data_transformer(df)["values"]
+
+    assert values[0] == {"date": "2020-01-01", "stamp": "2020-01-01T12:00:00",
+                         "noisy": 0.1 + 0.2, "whole": 1}
+    assert values[1]["date"] is None and values[2]["whole"] is None
+    assert "empty" not in values[0]
+    assert "date" in df.columns and df["noisy"][0] != 0.3  # input not mutated
+
+
+def test_compact_dataframe_does_not_round_by_default():
+    # A NaN makes an integer column float; its large values must survive exactly.
+    df = pd.DataFrame({"population": [331_578_104, 67_100_000, np.nan],
+                       "share": [0.123456789, 1 / 3, 2.5]})
+    values = compact_data_transformer(df)["values"]
+    assert [v["population"] for v in values] == [331_578_104, 67_100_000, None]
+    assert [v["share"] for v in values] == df["share"].tolist()
+
+
+def test_compact_dataframe_rounds_on_request():
+    df = pd.DataFrame({"noisy": [0.1 + 0.2, 1.5], "big": [331_578_104.0, 2.0]})
+    out = compact_dataframe(df, significant_digits=6)
+    assert out["noisy"].tolist() == [0.3, 1.5]
+    assert out["big"].tolist() == [331_578_000, 2]
+
+
+def test_compact_dataframe_decimals_override():
+    df = pd.DataFrame({"a": [1.23456, 2.5], "b": [1.23456, 2.5]})
+    out = compact_dataframe(df, decimals={"a": 1})
+    assert out["a"].tolist() == [1.2, 2.5]
+    assert out["b"].tolist() == [1.23456, 2.5]
+
+
+def test_row_budget_warns_instead_of_raising():
+    df = pd.DataFrame({"x": range(10)})
+    with pytest.warns(UserWarning, match="budget"):
+        values = compact_data_transformer(df, max_rows=5)["values"]
+    assert len(values) == 10
+
+
+def test_non_dataframe_data_passes_through():
+    assert compact_data_transformer({"values": [{"a": 1}]}) == {"values": [{"a": 1}]}
+
+
+def test_ecostyles_enables_transformer():
+    previous = alt.data_transformers.active
+    try:
+        EcoStyles()
+        assert alt.data_transformers.active == NAME
+        df = pd.DataFrame({"d": pd.to_datetime(["2020-01-01"]), "v": [2.0]})
+        spec = alt.Chart(df).mark_point().encode(x="d:T", y="v:Q").to_dict()
+        assert list(spec["datasets"].values()) == [[{"d": "2020-01-01", "v": 2}]]
+
+        EcoStyles(compact_data={"max_rows": 1})
+        assert alt.data_transformers.options == {"max_rows": 1}
+    finally:
+        alt.data_transformers.enable(previous)
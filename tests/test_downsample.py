@@ -0,0 +1,142 @@
+"""Unit tests for ecostyles.utils.downsample."""
+
+import json
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import pytest
+
+from ecostyles.utils import downsample, save_chart
+from ecostyles.utils.downsample import downsample_spec, lttb_indices, minmax_indices
+
+
+@pytest.fixture
+def long_df():
+    rng = np.random.default_rng(0)
+    n = 3000
+    return pd.DataFrame({
+        "date": np.repeat(pd.date_range("1960-01-01", periods=n // 3, freq="D"), 3),
+        "series": np.tile(["UK", "US", "FR"], n // 3),
+        "value": rng.normal(0, 1, n).cumsum(),
+    })
+
+
+def _spec(chart):
+    return chart.to_dict()
+
+
+def test_lttb_keeps_endpoints_and_count():
+    x = np.arange(1000.0)
+    y = np.sin(x / 50)
+    idx = lttb_indices(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_picks_spike():
+    x = np.arange(1000.0)
+    y = np.zeros(1000)
+    y[437] = 10.0
+    assert 437 in lttb_indices(x, y, 50)
+
+
+def test_minmax_keeps_extremes():
+    x = np.arange(1000.0)
+    y = np.random.default_rng(1).normal(size=1000)
+    idx = minmax_indices(x, y, 100)
+    assert len(idx) <= 100
+    assert y.argmax() in idx and y.argmin() in idx
+
+
+@pytest.mark.parametrize("fn", [lttb_indices, minmax_indices])
+def test_short_series_untouched(fn):
+    x = np.arange(10.0)
+    assert list(fn(x, x, 100)) == list(range(10))
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsample_per_series(long_df, method):
+    out = downsample(long_df, "date", "value", by="series", n_out=100, method=method)
+    sizes = out.groupby("series").size()
+    assert set(sizes.index) == {"UK", "US", "FR"}
+    assert (sizes <= 100).all()
+    # Rows keep their original order and values.
+    assert out.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(out, long_df.loc[out.index])
+
+
+def test_downsample_keeps_gaps(long_df):
+    df = long_df.copy()
+    df.loc[1500, "value"] = np.nan
+    out = downsample(df, "date", "value", by="series", n_out=100)
+    assert 1500 in out.index
+
+
+def test_downsample_rejects_unknown_method(long_df):
+    with pytest.raises(ValueError, match="method"):
+        downsample(long_df, "date", "value", method="nope")
+
+
+def test_downsample_spec_line_chart(long_df):
+    spec = _spec(alt.Chart(long_df).mark_line().encode(
+        x="date:T", y="value:Q", color="series:N"))
+    downsample_spec(spec, 50)
+    (records,) = spec["datasets"].values()
+    assert len(records) == 300
+    assert {r["series"] for r in records} == {"UK", "US", "FR"}
+
+
+@pytest.mark.parametrize("chart", [
+    lambda df: alt.Chart(df).mark_line().encode(x="date:T", y="mean(value):Q"),
+    lambda df: alt.Chart(df).mark_point().encode(x="date:T", y="value:Q"),
+    lambda df: alt.Chart(df).mark_line().encode(x="date:T", y="value:Q")
+    .transform_filter("datum.value > 0"),
+    lambda df: alt.layer(alt.Chart(df).mark_line().encode(x="date:T", y="value:Q"),
+                         alt.Chart(df).mark_rule().encode(y="mean(value):Q")),
+    lambda df: alt.Chart(df).mark_line().encode(x="date:T", y="value:Q")
+    .facet(row="series:N"),
+    # Stacked areas (the default with a colour split) need shared x values.
+    lambda df: alt.Chart(df).mark_area().encode(x="date:T", y="value:Q", color="series:N"),
+    lambda df: alt.Chart(df).mark_line().encode(x="date:T", y=alt.Y("value:Q", stack=True),
+                                                color="series:N"),
+    # Drawn in another field's order.
+    lambda df: alt.Chart(df).mark_line().encode(x="date:T", y="value:Q", order="series:N"),
+    # Band edges.
+    lambda df: alt.Chart(df).mark_area().encode(x="date:T", y="value:Q", y2="value:Q"),
+    lambda df: alt.Chart(df).mark_area().encode(x="date:T", x2="date:T", y="value:Q"),
+])
+def test_downsample_spec_leaves_unsafe_views(long_df, chart):
+    spec = _spec(chart(long_df))
+    before = json.dumps(spec["datasets"])
+    downsample_spec(spec, 50)
+    assert json.dumps(spec["datasets"]) == before
+
+
+def test_downsample_spec_unstacked_area(long_df):
+    spec = _spec(alt.Chart(long_df).mark_area().encode(
+        x="date:T", y=alt.Y("value:Q", stack=None), color="series:N"))
+    downsample_spec(spec, 50)
+    (records,) = spec["datasets"].values()
+    assert len(records) == 300
+
+
+def test_downsample_spec_layer_inherits_encoding(long_df):
+    base = alt.Chart(long_df).encode(x="date:T", y=alt.Y("value:Q", stack=None),
+                                     color="series:N")
+    spec = _spec(base.mark_line() + base.mark_area(opacity=0.2))
+    downsample_spec(spec, 50)
+    (records,) = spec["datasets"].values()
+    assert len(records) == 300
+
+
+def test_save_chart_downsample(tmp_path, long_df):
+    chart = alt.Chart(long_df).mark_line().encode(x="date:T", y="value:Q", color="series:N")
+    save_chart(chart, str(tmp_path), "full", width=100)
+    save_chart(chart, str(tmp_path), "thin", width=100, downsample=True)
+    full = json.loads((tmp_path / "full.json").read_text())
+    thin = json.loads((tmp_path / "thin.json").read_text())
+    assert len(next(iter(full["datasets"].values()))) == 3000
+    assert len(next(iter(thin["datasets"].values()))) == 600
+    assert (tmp_path / "thin.png").stat().st_size > 0
@@ -1,5 +1,7 @@
 """Unit tests for ecostyles.utils.file_operations."""
 
+import copy
+import io
 import json
 
 import altair as alt
@@ -7,8 +9,12 @@ import pandas as pd
 import pytest
 
 from ecostyles.utils.file_operations import (
-    _strip_midnight_timestamps, add_source, modify_dimensions, save_chart,
+    _spec_for_save, _strip_midnight_timestamps, _strip_midnight_values, add_source, dump_spec,
+    modify_dimensions, dedupe_datasets, externalise_data, prune_unused_columns, save_chart,
+    save_many, themed,
 )
+from ecostyles import EcoStyles
+from ecostyles.themes import get_theme
 
 
 @pytest.fixture
@@ -108,6 +114,104 @@ def test_save_chart_source_writes_extra_png(line_chart, tmp_path):
     assert (tmp_path / "chart_source.png").exists()
 
 
+def test_save_chart_pdf_and_extra_scales(line_chart, tmp_path):
+    save_chart(line_chart, str(tmp_path), "chart", width=200, height=150, pdf=True, scale=(4, 1))
+    assert (tmp_path / "chart.pdf").read_bytes()[:5] == b"%PDF-"
+    # The 1x PNG is a quarter the linear size of the 4x one, so a far smaller file.
+    assert (tmp_path / "chart@1x.png").stat().st_size < (tmp_path / "chart.png").stat().st_size
+
+
+def test_render_compiles_once_for_every_format(line_chart, monkeypatch):
+    import ecostyles.utils.file_operations as fo
+
+    calls = []
+    compile_ = fo.vlc.vegalite_to_vega
+    monkeypatch.setattr(fo.vlc, "vegalite_to_vega", lambda spec: calls.append(1) or compile_(spec))
+    outputs = fo._render(line_chart.to_json(), scales=(1, 2), svg=True, pdf=True)
+
+    assert len(calls) == 1
+    assert set(outputs) == {"png", "svg", "pdf"} and set(outputs["png"]) == {1, 2}
+    # Rasterising the shared SVG gives the same pixels as a direct PNG render.
+    assert outputs["png"][1] == fo.vlc.vegalite_to_png(line_chart.to_json(), scale=1)
+
+
+def test_save_chart_cache_hit_skips_render_and_rewrite(line_chart, tmp_path, monkeypatch):
+    import ecostyles.utils.file_operations as fo
+    from ecostyles.utils.cache import RenderCache
+
+    cache = RenderCache(tmp_path / "cache")
+    out = tmp_path / "out"
+    save_chart(line_chart, str(out), "chart", width=200, height=150, svg=True, cache=cache)
+    assert cache.stats == {"hits": 0, "misses": 2}
+    mtimes = {p.name: p.stat().st_mtime_ns for p in out.iterdir()}
+
+    def no_render(*args, **kwargs):
+        raise AssertionError("expected a cache hit")
+
+    monkeypatch.setattr(fo, "_render", no_render)
+    save_chart(line_chart, str(out), "chart", width=200, height=150, svg=True, cache=cache)
+    assert cache.stats == {"hits": 2, "misses": 2}
+    # Byte-identical outputs are left alone, so their mtimes don't move.
+    assert {p.name: p.stat().st_mtime_ns for p in out.iterdir()} == mtimes
+
+
+def test_save_chart_cache_misses_when_spec_changes(line_chart, tmp_path):
+    from ecostyles.utils.cache import RenderCache
+
+    cache = RenderCache(tmp_path / "cache")
+    save_chart(line_chart, str(tmp_path), "chart", width=200, height=150, cache=cache)
+    save_chart(line_chart, str(tmp_path), "chart", width=201, height=150, cache=cache)
+    assert cache.stats == {"hits": 0, "misses": 2}
+
+
+# --------------------------------------------------------------------- save_many
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_save_many_saves_every_job(line_chart, tmp_path, executor):
+    jobs = [(line_chart, str(tmp_path), f"c{i}") for i in range(3)]
+    jobs.append((line_chart, str(tmp_path / "svg"), "c3", {"svg": True}))
+    results = save_many(jobs, executor=executor, max_workers=2, width=100, height=80)
+
+    assert [r.name for r in results] == ["c0", "c1", "c2", "c3"]
+    assert all(r.ok for r in results)
+    for i in range(3):
+        assert (tmp_path / f"c{i}.png").exists()
+    assert (tmp_path / "svg" / "c3.svg").exists()  # per-job options applied
+
+
+def test_save_many_process_output_matches_save_chart(tmp_path):
+    # 8,000 rows: over Altair's default row limit, within the ecostyles transformer's budget.
+    df = pd.DataFrame({"x": range(8000), "y": [i % 7 + 0.5 for i in range(8000)],
+                       "day": pd.date_range("2000-01-01", periods=8000, freq="D")})
+    chart = alt.Chart(df).mark_line().encode(x="day:T", y="y:Q")
+    previous = alt.data_transformers.active, dict(alt.data_transformers.options)
+    try:
+        EcoStyles(compact_data={"max_rows": 10_000})
+        save_chart(chart, str(tmp_path / "serial"), "c", width=100, height=80)
+        [result] = save_many([(chart, str(tmp_path / "pool"), "c")], executor="process",
+                             max_workers=2, width=100, height=80)
+    finally:
+        alt.data_transformers.enable(previous[0], **previous[1])
+
+    assert result.ok, result.error
+    serial = (tmp_path / "serial" / "c.json").read_text()
+    assert (tmp_path / "pool" / "c.json").read_text() == serial
+    assert '"2000-01-01"' in serial  # compacted by the transformer
+
+
+def test_save_many_reports_errors_without_stopping(line_chart, tmp_path):
+    jobs = [(line_chart, str(tmp_path), None), (line_chart, str(tmp_path), "good")]
+    results = save_many(jobs, executor="thread", width=100, height=80)
+
+    assert isinstance(results[0].error, ValueError) and not results[0].ok
+    assert results[1].ok
+    assert (tmp_path / "good.png").exists()
+
+
+def test_save_many_rejects_unknown_executor(line_chart):
+    with pytest.raises(ValueError):
+        save_many([], executor="gpu")
+
+
 # ---------------------------------------------------------------- modify_dimensions
 def test_modify_dimensions_sets_width_height(line_chart):
     spec = json.loads(modify_dimensions(line_chart, 111, 222))
@@ -130,6 +234,26 @@ def test_strip_midnight_timestamps(raw, expected):
     assert _strip_midnight_timestamps(raw) == expected
 
 
+def test_strip_midnight_values_after_leading_nulls():
+    records = [{"d": None}] * 150 + [{"d": f"2020-01-{i % 28 + 1:02d}T00:00:00"} for i in range(50)]
+    out = _strip_midnight_values(records)
+    assert all(r["d"] is None for r in out[:150])
+    assert all(len(r["d"]) == 10 for r in out[150:])
+
+
+def test_strip_midnight_values_after_non_midnight_times():
+    records = ([{"t": "2020-01-01T12:30:00"}] * 100
+               + [{"t": "2020-01-02T00:00:00", "n": 1}] * 50)
+    out = _strip_midnight_values(records)
+    assert out[0] == {"t": "2020-01-01T12:30:00"}
+    assert out[100:] == [{"t": "2020-01-02", "n": 1}] * 50
+
+
+def test_strip_midnight_values_returns_unchanged_input():
+    records = [{"t": "2020-01-01T12:30:00", "s": "text"}]
+    assert _strip_midnight_values(records) is records
+
+
 def _dated_chart():
     df = pd.DataFrame({"date": pd.to_datetime(["2020-01-01", "2020-02-01"]), "v": [1, 2]})
     return alt.Chart(df).mark_line().encode(x="date:T", y="v:Q")
@@ -145,3 +269,197 @@ def test_save_chart_strips_midnight_timestamps(tmp_path):
 def test_save_chart_can_keep_timestamps(tmp_path):
     save_chart(_dated_chart(), str(tmp_path), "c", width=100, height=80, strip_timestamps=False)
     assert "T00:00:00" in (tmp_path / "c.json").read_text()
+
+
+def test_strip_leaves_chart_data_untouched():
+    vals = [{"date": "2020-01-01T00:00:00", "v": 1}]
+    chart = alt.Chart(alt.InlineData(values=vals)).mark_line().encode(x="date:T", y="v:Q")
+    assert '"2020-01-01"' in _spec_for_save(chart, 100, 80, True)
+    assert vals == [{"date": "2020-01-01T00:00:00", "v": 1}]  # Altair shares this list
+
+
+# ---------------------------------------------------------------- single-pass serialiser
+@pytest.mark.parametrize("fp", [io.BytesIO(), io.StringIO()], ids=["binary", "text"])
+def test_dump_spec_matches_saved_spec(fp):
+    dump_spec(_dated_chart(), fp, width=100, height=80)
+    written = fp.getvalue()
+    written = written.decode() if isinstance(written, bytes) else written
+    assert written == _spec_for_save(_dated_chart(), 100, 80, True)
+    spec = json.loads(written)
+    assert spec["width"] == 100 and "T00:00:00" not in written
+
+
+def test_serialiser_without_orjson(monkeypatch):
+    import ecostyles.utils.file_operations as fo
+
+    expected = json.loads(_spec_for_save(_dated_chart(), 100, 80, True))
+    monkeypatch.setattr(fo, "orjson", None)
+    fp = io.BytesIO()
+    dump_spec(_dated_chart(), fp, width=100, height=80)
+    assert json.loads(fp.getvalue()) == expected
+    assert json.loads(_spec_for_save(_dated_chart(), 100, 80, True)) == expected
+
+
+# ---------------------------------------------------------------- column pruning
+def _wide():
+    return pd.DataFrame({"date": pd.to_datetime(["2008-01-01", "2009-01-01"]), "v": [1, 2],
+                         "label": ["a", "b"], "junk": [9, 9], "more junk": [0, 0]})
+
+
+def _columns(spec):
+    return [sorted(records[0]) for records in spec["datasets"].values()]
+
+
+def test_prune_keeps_only_referenced_columns():
+    chart = alt.Chart(_wide()).mark_line().encode(x="date:T", y="v:Q", tooltip=["label:N"])
+    assert _columns(prune_unused_columns(chart.to_dict())) == [["date", "label", "v"]]
+
+
+def test_prune_follows_layers_and_transform_expressions():
+    styles = EcoStyles()
+    base = (alt.Chart(_wide()).mark_line().encode(x="date:T", y="v:Q")
+            .transform_filter("datum['more junk'] == 0"))
+    chart = add_source(base + styles.add_shaded_area(periods=styles.get_recessions("uk")), "ONS")
+    columns = _columns(prune_unused_columns(chart.to_dict()))
+    assert ["date", "more junk", "v"] in columns  # line layer, incl. the filter's field
+    assert ["end", "start"] in columns            # shaded-area layer
+    assert ["_source"] in columns                 # caption layer
+
+
+def test_prune_leaves_data_shown_wholesale():
+    chart = alt.Chart(_wide()).mark_point(tooltip=True).encode(x="date:T", y="v:Q")
+    assert _columns(prune_unused_columns(chart.to_dict())) == [sorted(_wide().columns)]
+
+
+def test_prune_does_not_mutate_chart_data():
+    vals = [{"x": 1, "junk": 2}]
+    chart = alt.Chart(alt.InlineData(values=vals)).mark_point().encode(x="x:Q")
+    assert _columns(prune_unused_columns(chart.to_dict())) == [["x"]]
+    assert vals == [{"x": 1, "junk": 2}]
+
+
+def test_save_chart_prune_columns(tmp_path):
+    chart = alt.Chart(_wide()).mark_line().encode(x="date:T", y="v:Q")
+    save_chart(chart, str(tmp_path), "c", width=100, height=80, prune_columns=True)
+    assert "junk" not in (tmp_path / "c.json").read_text()
+
+
+# ---------------------------------------------------------------- dataset dedupe
+def _names(spec):
+    """Dataset names referenced by each leaf view, in layer order."""
+    return [layer["data"]["name"] for layer in spec["layer"]]
+
+
+def test_dedupe_hoists_and_collapses_identical_inline_data():
+    values = [{"x": 1, "y": 2}, {"x": 2, "y": 3}]
+    spec = {"layer": [{"data": {"values": values}, "mark": "line"},
+                      {"data": {"values": [dict(reversed(r.items())) for r in values]},
+                       "mark": "point"}]}
+    dedupe_datasets(spec)
+    assert len(spec["datasets"]) == 1
+    assert _names(spec) == list(spec["datasets"]) * 2
+
+
+def test_dedupe_collapses_frames_identical_after_pruning():
+    df = _wide()
+    line = alt.Chart(df[["date", "v", "junk"]]).mark_line().encode(x="date:T", y="v:Q")
+    points = alt.Chart(df[["date", "v", "label"]]).mark_point().encode(x="date:T", y="v:Q")
+    spec = dedupe_datasets(prune_unused_columns((line + points).to_dict()))
+    assert len(spec["datasets"]) == 1
+    assert len(set(_names(spec))) == 1
+
+
+def test_dedupe_merges_column_subsets():
+    df = _wide()
+    line = alt.Chart(df[["date", "v"]]).mark_line().encode(x="date:T", y="v:Q")
+    text = alt.Chart(df).mark_text().encode(x="date:T", y="v:Q", text="label:N")
+    spec = dedupe_datasets((line + text).to_dict())
+    assert len(spec["datasets"]) == 1
+    assert "label" in next(iter(spec["datasets"].values()))[0]  # the larger one survives
+    assert len(set(_names(spec))) == 1
+
+
+def test_dedupe_keeps_subset_shown_wholesale():
+    df = _wide()
+    line = alt.Chart(df[["date", "v"]]).mark_line(tooltip=True).encode(x="date:T", y="v:Q")
+    text = alt.Chart(df).mark_text().encode(x="date:T", y="v:Q", text="label:N")
+    spec = dedupe_datasets((line + text).to_dict())
+    assert len(spec["datasets"]) == 2
+
+
+def test_save_chart_dedupe_data_renders(tmp_path):
+    df = _wide()
+    chart = (alt.Chart(df[["date", "v"]]).mark_line().encode(x="date:T", y="v:Q")
+             + alt.Chart(df).mark_point().encode(x="date:T", y="v:Q"))
+    save_chart(chart, str(tmp_path), "c", width=100, height=80, dedupe_data=True)
+    assert len(json.loads((tmp_path / "c.json").read_text())["datasets"]) == 1
+    assert (tmp_path / "c.png").exists()
+
+
+# ---------------------------------------------------------------- externalised data
+def test_externalise_data_shares_files_between_charts(tmp_path):
+    data_dir = tmp_path / "data"
+    df = _wide()
+    line = alt.Chart(df).mark_line().encode(x="date:T", y="v:Q")
+    bar = alt.Chart(df).mark_bar().encode(x="date:T", y="v:Q")
+    save_chart(line, str(tmp_path), "line", width=100, height=80, data_dir=str(data_dir))
+    save_chart(bar, str(tmp_path), "bar", width=100, height=80, data_dir=str(data_dir))
+
+    files = [p.name for p in data_dir.glob("*.json") if p.name != "manifest.json"]
+    assert len(files) == 1
+    spec = json.loads((tmp_path / "line.json").read_text())
+    assert "datasets" not in spec
+    assert spec["data"] == {"url": f"data/{files[0]}", "format": {"type": "json"}}
+    manifest = json.loads((data_dir / "manifest.json").read_text())
+    assert manifest["files"][files[0]]["charts"] == ["bar", "line"]
+    assert (tmp_path / "line.png").exists()  # rendered from the inline data
+
+
+def test_externalise_data_csv_with_base_url(tmp_path):
+    spec = alt.Chart(pd.DataFrame({"x": [1, 2], "ok": [True, None]})).mark_point().to_dict()
+    (filename,) = externalise_data(spec, tmp_path, "https://cdn.example/data/", "csv")
+    assert filename.endswith(".csv")
+    assert (tmp_path / filename).read_text() == "x,ok\n1,true\n2,\n"
+    assert spec["data"]["url"] == f"https://cdn.example/data/{filename}"
+    assert spec["data"]["format"] == {"type": "csv"}
+
+
+def test_externalise_data_unchanged_is_noop(tmp_path):
+    spec = alt.Chart(_wide()).mark_point().to_dict()
+    (filename,) = externalise_data(dict(spec), tmp_path)
+    mtime = (tmp_path / filename).stat().st_mtime_ns
+    externalise_data(dict(spec), tmp_path)
+    assert (tmp_path / filename).stat().st_mtime_ns == mtime
+
+
+def test_externalise_data_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        externalise_data({}, tmp_path, fmt="xlsx")
+
+
+# -------------------------------------------------------------------------- themed
+def test_themed_merges_config_without_touching_global_theme(line_chart):
+    active = alt.theme.active
+    spec = themed(line_chart.configure_view(stroke="red"), "cotd", dark_mode=True)
+    expected = copy.deepcopy(get_theme("cotd", dark_mode=True)["config"])
+    expected["view"]["stroke"] = "red"  # the chart's own config wins
+    assert spec["config"] == expected  # and nothing from the active theme leaks in
+    assert alt.theme.active == active
+    assert get_theme("cotd", dark_mode=True)["config"]["view"]["stroke"] is None  # not mutated
+
+
+def test_themed_threads_keep_their_own_theme(line_chart):
+    from concurrent.futures import ThreadPoolExecutor
+
+    jobs = [("article", False), ("cotd", True)] * 50
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        specs = list(pool.map(lambda job: themed(line_chart, *job), jobs))
+    for (name, dark), spec in zip(jobs, specs):
+        assert spec["config"] == get_theme(name, dark)["config"]
+
+
+def test_save_chart_theme_argument(line_chart, tmp_path):
+    save_chart(line_chart, str(tmp_path), "c", theme="newsletter")
+    saved = json.loads((tmp_path / "c.json").read_text())
+    assert saved["config"]["font"] == get_theme("newsletter")["config"]["font"]
+    assert (tmp_path / "c.png").read_bytes()[:4] == b"\x89PNG"
@@ -0,0 +1,69 @@
+"""Unit tests for ecostyles.utils.fonts."""
+
+import threading
+import zipfile
+
+import vl_convert
+
+from ecostyles import EcoStyles
+from ecostyles.utils import fonts
+
+
+def test_registers_from_the_package_directory():
+    directory = fonts.setup_fonts()
+    assert directory == fonts._font_files()  # no copy for an on-disk install
+    assert sorted(p.name for p in directory.iterdir()) == [
+        "CircularStd-Black.otf", "CircularStd-Bold.otf", "CircularStd-Book.otf",
+        "CircularStd-Medium.otf"]
+
+
+def test_registers_once_per_process(monkeypatch):
+    calls = []
+    monkeypatch.setattr(fonts, "_registered", None)
+    monkeypatch.setattr(vl_convert, "register_font_directory", calls.append)
+
+    threads = [threading.Thread(target=fonts.setup_fonts) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    fonts.setup_fonts()
+    assert len(calls) == 1
+
+
+def test_repeated_instantiation_registers_fonts_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(fonts, "_registered", None)
+    monkeypatch.setattr(vl_convert, "register_font_directory", calls.append)
+
+    for _ in range(50):
+        EcoStyles(compact_data=False)
+    assert len(calls) == 1
+
+
+def test_zipped_fonts_extract_to_a_stable_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ECOSTYLES_CACHE_DIR", str(tmp_path / "cache"))
+    archive = tmp_path / "fonts.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for fp in fonts._font_files().iterdir():
+            zf.write(fp, f"circular-std/{fp.name}")
+        zf.writestr("circular-std/LICENSE.txt", "not a font")
+    source = zipfile.Path(archive, "circular-std/")
+
+    first = fonts._extract_fonts(source)
+    assert first.parent == tmp_path / "cache" / "fonts"
+    assert len(list(first.glob("*.otf"))) == 4 and not (first / "LICENSE.txt").exists()
+    assert fonts._extract_fonts(source) == first  # reused, not copied again
+
+
+def test_extraction_falls_back_to_a_temp_dir_removed_at_exit(tmp_path, monkeypatch):
+    def unwritable(*parts):
+        raise PermissionError("read-only cache")
+
+    cleanups = []
+    monkeypatch.setattr(fonts, "default_cache_dir", unwritable)
+    monkeypatch.setattr(fonts.atexit, "register", lambda *args, **kw: cleanups.append(args))
+    directory = fonts._extract_fonts(fonts._font_files())
+    assert len(list(directory.glob("*.otf"))) == 4
+    assert cleanups and cleanups[0][1] == directory
+    fonts.shutil.rmtree(directory)
@@ -0,0 +1,43 @@
+"""Import-time regression tests: heavy dependencies load on first use, not on import.
+
+Each case runs in a fresh interpreter under ``python -X importtime`` and checks which
+modules were imported.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = {"altair", "pandas", "numpy", "vl_convert", "country_converter"}
+
+
+def _imported(code: str) -> dict[str, int]:
+    """Run ``code`` in a new interpreter; return ``{module: cumulative import time (us)}``."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         capture_output=True, text=True, check=True)
+    times = {}
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("code, allowed", [
+    ("import ecostyles", set()),
+    ("import ecostyles.utils", set()),
+    ("from ecostyles.themes import article, cotd, newsletter; cotd.get_theme(True)", set()),
+    # Registering fonts needs vl-convert (a few ms); colours and palettes need nothing else.
+    ("from ecostyles import EcoStyles; EcoStyles(compact_data=False).eco_colours",
+     {"vl_convert"}),
+])
+def test_no_heavy_imports(code, allowed):
+    assert HEAVY & set(_imported(code)) <= allowed
+
+
+def test_heavy_imports_load_on_first_use():
+    code = "import ecostyles.utils as u; u.save_chart; u.add_population"
+    assert {"altair", "pandas", "vl_convert"} <= set(_imported(code))
+
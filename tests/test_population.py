@@ -1,10 +1,12 @@
 """Unit tests for ecostyles.utils.population.
 
-Both the bundled snapshot (``_load_bundled``) and the network (``_fetch_one``) are mocked,
-so these run offline and deterministically. The live World Bank path and the real bundled
-data are exercised separately during development / via scripts/fetch_population.py.
+Both the bundled snapshot (``_load_bundled``) and the network (``_fetch_population``) are
+mocked, so these run offline and deterministically. The World Bank client is tested against
+a local stand-in server in test_worldbank.py, and the real bundled data in
+test_population_data.py.
 """
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -27,13 +29,15 @@ FETCHABLE = {("GBR", 2026): 69_500_000}
 
 @pytest.fixture(autouse=True)
 def offline(monkeypatch):
-    monkeypatch.setattr(pop, "_load_bundled", lambda: (dict(BUNDLED), BUNDLED_MAX_YEAR))
+    table = pop.PopulationTable.from_mapping(BUNDLED)
+    monkeypatch.setattr(pop, "_load_bundled", lambda: (table, BUNDLED_MAX_YEAR))
 
-    def fake_fetch(iso3, year, timeout):
-        value = FETCHABLE.get((iso3, year))
-        return {(iso3, year): value} if value is not None else {}
+    def fake_fetch(pairs, timeout, allow_fetch=True):
+        # Nothing cached here: offline, every pair is a miss.
+        source = FETCHABLE if allow_fetch else {}
+        return {(iso3, int(year)): source.get((iso3, int(year))) for iso3, year in pairs}
 
-    monkeypatch.setattr(pop, "_fetch_one", fake_fetch)
+    monkeypatch.setattr(pop, "_fetch_population", fake_fetch)
 
 
 # ------------------------------------------------------------ bundled (offline) paths
@@ -61,6 +65,17 @@ def test_custom_population_column_name():
     assert "pop_total" in out.columns
 
 
+def test_result_dtype_is_integer_when_complete():
+    out = pop.add_population(pd.DataFrame({"country": ["GBR", "FRA"]}), "country", year=2023)
+    assert out["population"].dtype == "int64"
+
+
+def test_panel_mixes_bundled_and_fetched_years():
+    df = pd.DataFrame({"country": ["GBR", "GBR", "GBR"], "yr": [2026, 2020, 2026]})
+    out = pop.add_population(df, "country", year_column="yr")
+    assert out["population"].tolist() == [69_500_000, 67_100_000, 69_500_000]
+
+
 # --------------------------------------------------------------- fallback to live API
 def test_year_beyond_bundle_falls_back_to_api():
     # 2026 > BUNDLED_MAX_YEAR, so it comes from the (mocked) live API.
@@ -107,19 +122,20 @@ def test_missing_columns_raise_keyerror():
         pop.add_population(df, "country", year_column="missing")
 
 
-# ----------------------------------------------------------------- payload parser
-def test_parse_worldbank_payload_extracts_rows():
-    payload = [
-        {"page": 1, "pages": 1},
-        [{"countryiso3code": "GBR", "date": "2026", "value": 69_500_000}],
-    ]
-    assert pop._parse_worldbank_payload(payload) == {("GBR", 2026): 69_500_000}
+# ---------------------------------------------------------------- population table
+def test_population_table_reads_like_a_mapping():
+    table = pop.PopulationTable.from_mapping(BUNDLED)
+    assert len(table) == len(BUNDLED)
+    assert table["GBR", 2000] == 58_900_000
+    assert ("GBR", 2001) not in table
+    assert table.get(("XXX", 2020)) is None
+    assert table.last_year == 2023
+    with pytest.raises(KeyError):
+        table["GBR", 1800]
 
 
-@pytest.mark.parametrize("payload", [
-    [{"message": "no data"}, None],   # World Bank returns None rows when nothing matches
-    [],                                # malformed
-    {"unexpected": True},              # not even a list
-])
-def test_parse_worldbank_payload_handles_empty(payload):
-    assert pop._parse_worldbank_payload(payload) == {}
+def test_population_table_vectorised_lookup():
+    table = pop.PopulationTable.from_mapping(BUNDLED)
+    out = table.lookup(["GBR", None, "USA", "GBR", "ZZZ"], [2020, 2020, 2020, 1800, 2020])
+    assert out[0] == 67_100_000 and out[2] == 331_500_000
+    assert np.isnan(out[[1, 3, 4]]).all()
@@ -1,8 +1,10 @@
-"""Integration test for the bundled population dataset (uses the real packaged CSV).
+"""Integration tests for the bundled population dataset (the real packaged snapshot).
 
 Kept separate from test_population.py so the network/bundle mocks there don't apply here.
 """
 
+import numpy as np
+
 import ecostyles.utils.population as pop
 
 
@@ -14,3 +16,16 @@ def test_bundled_csv_loads_with_recent_data():
     assert max_year >= 2023, "bundle should be reasonably current"
     # A stable, well-known value from the World Bank series.
     assert data[("GBR", 2023)] == 68_526_000
+
+
+def test_binary_bundle_matches_csv():
+    binary = pop._load_bundled_binary()
+    assert binary is not None, "run scripts/fetch_population.py --from-csv to rebuild it"
+    table, max_year = binary
+    csv_table, csv_max_year = pop._load_bundled_csv()
+
+    assert max_year == csv_max_year
+    assert list(table.codes) == list(csv_table.codes)
+    assert table.first_year == csv_table.first_year
+    assert (table.values == csv_table.values).all()
+    assert isinstance(table.values, np.memmap)
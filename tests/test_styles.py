@@ -60,6 +60,39 @@ def test_add_colour_country_group_matches_literal(styles):
     assert result.loc[result.country == 'OECD', 'colour'].iloc[0] == '#123456'
     assert result.loc[result.country == 'GBR', 'colour'].iloc[0] == '#000000'
 
+def test_add_colour_returns_categorical(styles):
+    """The colour column is categorical over the distinct colours, input left alone."""
+    df = pd.DataFrame({'country': ['GBR', 'FRA'] * 500})
+    result = styles.add_colour(df, 'country')
+    assert isinstance(result['colour'].dtype, pd.CategoricalDtype)
+    assert list(result['colour'].cat.categories) == styles.category_palette[:2]
+    assert 'colour' not in df.columns
+
+def test_add_colour_spellings_share_a_colour_and_missing_gets_default(styles):
+    """Different spellings of a country share its colour; missing countries get the default."""
+    df = pd.DataFrame({'country': ['GBR', None, 'United Kingdom', 'FRA']})
+    result = styles.add_colour(df, 'country', default='#000000')
+    assert result['colour'].tolist() == [styles.category_palette[0], '#000000',
+                                         styles.category_palette[0], styles.category_palette[1]]
+
+def test_colour_scale_matches_add_colour(styles):
+    """colour_scale assigns the same colour per country as add_colour, as a scale."""
+    df = pd.DataFrame({'country': ['GBR', 'FRA', 'United Kingdom', 'OECD', 'FRA']})
+    for colour_map in (None, {'UK': '#e6224b', 'OECD': '#123456'}):
+        scale = styles.colour_scale(df, 'country', colour_map)
+        coloured = styles.add_colour(df, 'country', colour_map)
+        assert scale.domain == ['GBR', 'FRA', 'United Kingdom', 'OECD']
+        assert dict(zip(scale.domain, scale.range)) == dict(zip(coloured.country, coloured.colour))
+
+def test_colour_scale_keeps_colours_out_of_the_data(styles):
+    """The colours appear once, in the scale, rather than in every row."""
+    df = pd.DataFrame({'country': ['GBR', 'FRA'] * 50, 'v': range(100)})
+    chart = alt.Chart(df).mark_point().encode(
+        x='v:Q', color=alt.Color('country:N', scale=styles.colour_scale(df, 'country')))
+    spec = chart.to_dict()
+    assert '#' not in str(spec['datasets'])
+    assert spec['encoding']['color']['scale']['range'] == styles.category_palette[:2]
+
 def test_add_shaded_area(styles):
     """Test creating shaded area chart element."""
     start_date = '2020-01-01'
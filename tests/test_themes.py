@@ -2,6 +2,7 @@
 
 import pytest
 
+from ecostyles import themes
 from ecostyles.themes import article, cotd, newsletter
 
 # Each theme exposes get_theme(); cotd additionally accepts dark_mode.
@@ -39,3 +40,10 @@ def test_cotd_is_more_impactful_than_article():
     assert cotd_config["title"]["fontSize"] > article_config["title"]["fontSize"]
     assert cotd_config["line"].get("strokeWidth", 1) > article_config["line"].get("strokeWidth", 1)
     assert "background" in cotd_config  # cotd has a distinguishing background
+
+
+def test_get_theme_by_name_is_cached():
+    assert themes.get_theme("cotd", dark_mode=True) == THEME_CONFIGS["cotd_dark"]
+    assert themes.get_theme("article") is themes.get_theme("article")
+    with pytest.raises(ValueError):
+        themes.get_theme("unknown")
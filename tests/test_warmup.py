@@ -0,0 +1,78 @@
+"""Unit tests for ecostyles.utils.warmup."""
+
+import threading
+
+import pytest
+
+import ecostyles
+from ecostyles import EcoStyles
+from ecostyles.utils import file_operations, warmup
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """Forget any warm-up already run in this process."""
+    monkeypatch.setattr(warmup, "_current", None)
+
+
+def test_warmup_renders_each_theme_and_reports_duration(fresh):
+    durations = []
+    run = ecostyles.warmup(durations.append, background=False)
+    assert run.error is None and run.duration > 0
+    assert durations == [run.duration]
+
+
+def test_runs_once_per_process(fresh, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(file_operations, "_render", lambda spec, **kw: rendered.append(spec))
+    first = warmup.warmup(background=False)
+    assert warmup.warmup() is first
+    assert len(rendered) == len(warmup._theme_configs())
+
+    late = []
+    first.add_callback(late.append)  # already finished: called straight away
+    assert late == [first.duration]
+
+
+def test_runs_in_the_background(fresh, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(file_operations, "_render", lambda spec, **kw: release.wait(5))
+    run = warmup.warmup()
+    assert run.wait(timeout=0.01) is None and run.is_alive()
+    release.set()
+    assert run.wait(timeout=5) > 0
+
+
+def test_failures_are_kept_not_raised(fresh, monkeypatch):
+    def broken(spec, **kw):
+        raise RuntimeError("no runtime")
+
+    called = []
+    monkeypatch.setattr(file_operations, "_render", broken)
+    run = warmup.warmup(called.append)
+    with pytest.raises(RuntimeError, match="no runtime"):
+        run.wait(timeout=5)
+    assert called == []
+
+
+def test_failed_warmup_is_retried(fresh, monkeypatch):
+    def broken(spec, **kw):
+        raise RuntimeError("no runtime")
+
+    monkeypatch.setattr(file_operations, "_render", broken)
+    failed = warmup.warmup()
+    failed.join(timeout=5)
+    assert warmup._current is None
+
+    monkeypatch.setattr(file_operations, "_render", lambda spec, **kw: None)
+    retried = warmup.warmup(background=False)
+    assert retried is not failed and retried.error is None
+    assert warmup.warmup() is retried
+
+
+def test_styles_warm_option(fresh, monkeypatch):
+    monkeypatch.setattr(file_operations, "_render", lambda spec, **kw: None)
+    assert EcoStyles(compact_data=False).warmup is None
+    styles = EcoStyles(compact_data=False, warm=True)
+    assert styles.warmup is warmup._current
+    styles.warmup.wait(timeout=5)
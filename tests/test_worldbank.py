@@ -0,0 +1,247 @@
+"""Tests for ecostyles.utils.worldbank, against a local stand-in for the World Bank API."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+import ecostyles.utils.population as pop
+from ecostyles.utils import worldbank
+from ecostyles.utils.cache import IndicatorCache
+from ecostyles.utils.worldbank import WorldBankClient, WorldBankError, parse_payload
+
+VALUES = {("GBR", 2026): 69_500_000, ("FRA", 2026): 68_600_000, ("DEU", 2026): 83_500_000,
+          ("GBR", 2027): 69_800_000}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        codes = url.path.split("/")[3].split(";")
+        year = int(parse_qs(url.query)["date"][0])
+        with server.lock:
+            server.paths.append(self.path)
+            server.clients.add(self.client_address)
+            failing = server.fail_next > 0
+            server.fail_next -= failing
+        if failing:
+            return self._send(503, {"error": "busy"})
+        if len(codes) > 1 and server.block_batches:
+            return self._send(400, {"error": "blocked"})
+        if server.reject_codes & set(codes):
+            return self._send(400, {"error": "unknown code"})
+        rows = [{"countryiso3code": c, "date": str(year), "value": VALUES.get((c, year))}
+                for c in codes]
+        self._send(200, [{"page": 1, "pages": 1, "total": len(rows)}, rows])
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.lock = threading.Lock()
+    httpd.paths, httpd.clients = [], set()
+    httpd.fail_next, httpd.block_batches, httpd.reject_codes = 0, False, set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/v2"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _client(server, **options):
+    options = {"rate": None, "backoff": 0.01, **options}
+    return WorldBankClient(server.url, **options)
+
+
+def test_batches_countries_per_year(server):
+    client = _client(server)
+    out = client.fetch([("GBR", 2026), ("FRA", 2026), ("XXX", 2026), ("GBR", 2027)])
+    assert out == {("GBR", 2026): 69_500_000, ("FRA", 2026): 68_600_000,
+                   ("XXX", 2026): None, ("GBR", 2027): 69_800_000}
+    assert sorted(p.split("/")[3] for p in server.paths) == ["GBR", "GBR;FRA;XXX"]
+
+
+def test_falls_back_to_single_countries_when_batches_blocked(server):
+    server.block_batches = True
+    client = _client(server, retries=0)
+    out = client.fetch([("GBR", 2026), ("FRA", 2026)])
+    assert out == {("GBR", 2026): 69_500_000, ("FRA", 2026): 68_600_000}
+    client.fetch([("DEU", 2026), ("GBR", 2027)])  # remembers: no more batch attempts
+    assert [p.split("/")[3] for p in server.paths] == ["GBR;FRA", "GBR", "FRA", "DEU", "GBR"]
+
+
+def test_unknown_code_in_batch_keeps_batching(server):
+    server.reject_codes = {"XXX"}
+    client = _client(server, retries=0)
+    out = client.fetch([("GBR", 2026), ("XXX", 2026)])
+    assert out == {("GBR", 2026): 69_500_000, ("XXX", 2026): None}
+    client.fetch([("FRA", 2026), ("DEU", 2026)])
+    assert [p.split("/")[3] for p in server.paths] == ["GBR;XXX", "GBR", "XXX", "FRA;DEU"]
+
+
+def test_server_errors_raise_and_keep_batching(server):
+    server.fail_next = 1
+    client = _client(server, retries=0)
+    with pytest.raises(WorldBankError, match="503"):
+        client.fetch([("GBR", 2026), ("FRA", 2026)])
+    assert client.fetch([("GBR", 2026), ("FRA", 2026)])[("FRA", 2026)] == 68_600_000
+    assert [p.split("/")[3] for p in server.paths] == ["GBR;FRA", "GBR;FRA"]
+
+
+def test_retries_transient_errors(server):
+    server.fail_next = 2
+    client = _client(server, retries=3)
+    assert client.fetch([("GBR", 2026)]) == {("GBR", 2026): 69_500_000}
+    assert client.requests == 3
+
+
+def test_gives_up_after_retries(server):
+    server.fail_next = 5
+    with pytest.raises(WorldBankError, match="503"):
+        _client(server, retries=1).get_json("/country/GBR/indicator/X", {"date": 2026})
+
+
+def test_reuses_connections(server):
+    client = _client(server, batch_size=1, max_workers=2)
+    client.fetch([(code, 2026) for code in ("GBR", "FRA", "DEU")])
+    client.fetch([("GBR", 2027)])
+    assert len(server.paths) == 4
+    assert len(server.clients) <= 2  # one TCP connection per worker, kept alive
+
+
+def test_concurrent_requests_and_rate_limit(server):
+    client = _client(server, batch_size=1, max_workers=4, rate=1000)
+    pairs = [(f"C{i:02d}", 2026) for i in range(20)]
+    assert set(client.fetch(pairs)) == set(pairs)
+    assert len(server.paths) == 20
+
+
+def test_rejects_non_http_base_url():
+    with pytest.raises(ValueError):
+        WorldBankClient("ftp://example.com")
+
+
+@pytest.fixture
+def shared(server, tmp_path, monkeypatch):
+    """Point the shared client at the stand-in server, with a fresh on-disk cache."""
+    monkeypatch.setattr(worldbank, "_default", None)
+    monkeypatch.setattr(worldbank, "_cache", IndicatorCache(tmp_path / "wb.sqlite3"))
+    client = worldbank.configure(server.url, rate=None)
+    yield worldbank._cache
+    client.close()
+
+
+def test_add_population_fetches_through_configured_client(server, shared):
+    df = pd.DataFrame({"country": ["GBR", "FRA", "GBR"], "yr": [2026, 2026, 2027]})
+    out = pop.add_population(df, "country", year_column="yr")
+    assert out["population"].tolist() == [69_500_000, 68_600_000, 69_800_000]
+
+
+# ----------------------------------------------------------------- on-disk cache
+def test_fetch_indicator_serves_repeats_from_cache(server, shared):
+    pairs = [("GBR", 2026), ("XXX", 2026)]
+    first = worldbank.fetch_indicator(pairs)
+    assert first == {("GBR", 2026): 69_500_000, ("XXX", 2026): None}
+    assert len(server.paths) == 1
+
+    # Another process (a new cache object on the same file) needs no request, either
+    # for the value or for the cached "no data".
+    worldbank.configure_cache(shared.path)
+    assert worldbank.fetch_indicator(pairs) == first
+    assert len(server.paths) == 1
+
+    # Only the pair not cached yet is requested.
+    worldbank.fetch_indicator(pairs + [("FRA", 2026)])
+    assert server.paths[-1].split("/")[3] == "FRA"
+
+
+def test_expired_entries_are_refetched(server, shared, monkeypatch):
+    worldbank.fetch_indicator([("GBR", 2026), ("XXX", 2026)])
+    now = time.time()
+    monkeypatch.setattr("ecostyles.utils.cache.time.time", lambda: now + 2 * 86400)
+    # "No data" (negative TTL: 1 day) has expired; the value (30 days) hasn't.
+    worldbank.fetch_indicator([("GBR", 2026), ("XXX", 2026)])
+    assert server.paths[-1].split("/")[3] == "XXX"
+    assert len(server.paths) == 2
+
+
+def test_offline_replay(server, shared, monkeypatch):
+    worldbank.fetch_indicator([("GBR", 2026)])
+    monkeypatch.setattr("ecostyles.utils.cache.time.time", lambda: 4e9)  # long expired
+    out = worldbank.fetch_indicator([("GBR", 2026), ("FRA", 2026)], allow_fetch=False)
+    assert out == {("GBR", 2026): 69_500_000, ("FRA", 2026): None}
+    assert len(server.paths) == 1
+
+    with pytest.warns(UserWarning):  # FRA was never fetched
+        df = pop.add_population(pd.DataFrame({"c": ["GBR", "FRA"]}), "c", year=2026,
+                                allow_fetch=False)
+    assert df["population"].iloc[0] == 69_500_000 and pd.isna(df["population"].iloc[1])
+    assert len(server.paths) == 1
+
+
+def test_failed_fetch_is_not_cached(server, shared):
+    server.fail_next = 10
+    worldbank.configure(server.url, rate=None, retries=1, backoff=0.01)
+    with pytest.raises(WorldBankError):
+        worldbank.fetch_indicator([("GBR", 2026)])
+    server.fail_next = 0  # the server recovers: the next call asks again
+    assert worldbank.fetch_indicator([("GBR", 2026)]) == {("GBR", 2026): 69_500_000}
+    assert shared.get("SP.POP.TOTL", [("GBR", 2026)]) == {("GBR", 2026): 69_500_000}
+
+
+def test_offline_lookup_creates_no_cache_file(server, shared, tmp_path):
+    worldbank.configure_cache(tmp_path / "new.sqlite3")
+    assert worldbank.fetch_indicator([("GBR", 2026)], allow_fetch=False) == {("GBR", 2026): None}
+    assert not (tmp_path / "new.sqlite3").exists()
+
+
+def test_unusable_cache_acts_as_no_cache(server, shared, tmp_path):
+    (tmp_path / "file").write_text("")  # a file where the cache's directory should be
+    worldbank.configure_cache(tmp_path / "file" / "wb.sqlite3")
+    assert worldbank.fetch_indicator([("GBR", 2026)], allow_fetch=False) == {("GBR", 2026): None}
+    assert worldbank.fetch_indicator([("GBR", 2026)]) == {("GBR", 2026): 69_500_000}
+    assert len(server.paths) == 1
+
+
+def test_cache_can_be_disabled(server, shared):
+    assert worldbank.configure_cache(False) is None
+    worldbank.fetch_indicator([("GBR", 2026)])
+    worldbank.fetch_indicator([("GBR", 2026)])
+    assert len(server.paths) == 2
+
+
+# ----------------------------------------------------------------- payload parser
+def test_parse_payload_extracts_rows():
+    payload = [
+        {"page": 1, "pages": 1},
+        [{"countryiso3code": "GBR", "date": "2026", "value": 69_500_000}],
+    ]
+    assert parse_payload(payload) == {("GBR", 2026): 69_500_000}
+
+
+@pytest.mark.parametrize("payload", [
+    [{"message": "no data"}, None],   # World Bank returns None rows when nothing matches
+    [],                                # malformed
+    {"unexpected": True},              # not even a list
+])
+def test_parse_payload_handles_empty(payload):
+    assert parse_payload(payload) == {}